@@ -3,12 +3,23 @@
 # SPDX-License-Identifier: MIT
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 from urllib.error import URLError
 
-from artifactory import ArtifactoryException, ArtifactoryPath, sha256sum
 from loguru import logger
 from yaku.autopilot_utils.errors import AutopilotError
 
+# dohq-artifactory takes long to import, so it is only imported where it is used
+if TYPE_CHECKING:
+    from artifactory import ArtifactoryPath
+
+
+def sha256sum(filename: Path) -> str:
+    """Calculate the SHA-256 checksum of a file like dohq-artifactory does."""
+    from artifactory import sha256sum as artifactory_sha256sum
+
+    return artifactory_sha256sum(filename)
+
 
 def create_artifactory_client(
     artifactory_url: str,
@@ -16,13 +27,15 @@ def create_artifactory_client(
     repository_name: str,
     artifactory_username: str,
     artifactory_password: str,
-) -> ArtifactoryPath:
+) -> "ArtifactoryPath":
     """
     Login to artifactory.
 
     If successful, the url(path) will be returned otherwise exceptions will be
     thrown.
     """
+    from artifactory import ArtifactoryPath
+
     logger.debug("Logging in to Artifactory...")
     path = ArtifactoryPath(
         artifactory_url.rstrip("/")
@@ -41,9 +54,11 @@ def create_artifactory_client(
 
 
 def download_file(
-    path: ArtifactoryPath, artifactory_repository_path: str, destination_path: Path
+    path: "ArtifactoryPath", artifactory_repository_path: str, destination_path: Path
 ) -> str:
     """Download a single file from the Artifactory."""
+    from artifactory import ArtifactoryException
+
     logger.debug("Downloading file '{path}' from Artifactory", path=path)
     artifactory_repository_path = artifactory_repository_path.rstrip("/")
     returned_list = artifactory_repository_path.split("/")
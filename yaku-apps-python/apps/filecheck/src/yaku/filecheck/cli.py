@@ -2,26 +2,41 @@
 #
 # SPDX-License-Identifier: MIT
 
-from yaku.autopilot_utils.cli_base import make_autopilot_app, read_version_from_package
-from yaku.autopilot_utils.results import ResultsCollector
+from yaku.autopilot_utils.cli_base import (
+    LazySubcommand,
+    make_autopilot_app,
+    read_version_from_package,
+)
+from yaku.autopilot_utils.results import ResultsCollector, omitted_results_note
 
 from .commands import exists, size
 
 
+def load_batch():
+    from .commands import batch
+
+    return batch
+
+
 class CLI:
     click_name = "filecheck"
     click_command = None
-    click_subcommands = [exists, size]
+    click_subcommands = [exists, size, LazySubcommand("batch", load_batch)]
     click_help_text = "Generic file property checker"
 
     @staticmethod
     def click_evaluator_callback(results: ResultsCollector):
-        if any([not r.fulfilled for r in results]):
+        aggregate = results.aggregate
+        if aggregate.unfulfilled:
             return "RED", "\n".join(
-                [r.criterion + "\nBut: " + r.justification for r in results if not r.fulfilled]
+                [r.criterion + "\nBut: " + r.justification for r in aggregate.first_failures]
+                + omitted_results_note(aggregate.omitted_failures, "unfulfilled criteria")
             )
         else:
-            return "GREEN", "\n".join([r.justification for r in results])
+            return "GREEN", "\n".join(
+                [r.justification for r in aggregate.first_results]
+                + omitted_results_note(aggregate.omitted_results, "results")
+            )
 
 
 main = make_autopilot_app(
@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import fnmatch
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import click
+import yaml
+from loguru import logger
+from yaku.autopilot_utils.errors import AutopilotConfigurationError
+from yaku.autopilot_utils.results import RESULTS, Result
+
+from .exists import existence_result
+from .size import size_criterion, size_result
+
+# the pure Python YAML parser is slow for manifests with many checks
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+click_name = "batch"
+click_setup = [
+    click.argument(
+        "manifest",
+        required=True,
+        type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    ),
+    click.option(
+        "--directory",
+        default=".",
+        type=click.Path(exists=True, file_okay=False, path_type=Path),
+        help="Directory relative to which the files in the manifest are checked.",
+    ),
+]
+
+
+def click_command(manifest: Path, directory: Path) -> None:
+    r"""
+    Check existence and size of all files listed in a YAML or JSON manifest.
+
+    The manifest contains a list of checks, e.g.:
+
+    \b
+    - file: report.pdf
+    - file: logs/*.log
+      glob: true
+    - file: data.csv
+      min: 1
+      max: 1000000
+    """
+    checks = read_manifest(manifest)
+    logger.debug(
+        "Checking {n} files from manifest `{manifest}`...", n=len(checks), manifest=manifest
+    )
+    index = DirectoryIndex(directory)
+    for check in checks:
+        RESULTS.append(evaluate_check(check, index))
+
+
+@dataclass(frozen=True)
+class FileCheck:
+    file: Path
+    glob: bool = False
+    min_size: Optional[int] = None
+    max_size: Optional[int] = None
+
+    @property
+    def is_size_check(self) -> bool:
+        return self.min_size is not None or self.max_size is not None
+
+
+def _parse_check(item: Any) -> FileCheck:
+    if not isinstance(item, dict):
+        raise ValueError("must be a mapping with a `file` key")
+    unknown_keys = set(item) - {"file", "glob", "min", "max"}
+    if unknown_keys:
+        raise ValueError(f"has unknown keys: {', '.join(sorted(map(str, unknown_keys)))}")
+    file = item.get("file")
+    if not isinstance(file, str) or not file.strip():
+        raise ValueError("must have a non-empty `file`")
+    glob = item.get("glob", False)
+    if not isinstance(glob, bool):
+        raise ValueError("`glob` must be true or false")
+    for key in ("min", "max"):
+        value = item.get(key)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(f"`{key}` must be a number of bytes")
+    check = FileCheck(Path(file.strip()), glob, item.get("min"), item.get("max"))
+    if check.glob and check.is_size_check:
+        raise ValueError("can not check the size of files matching a glob pattern")
+    return check
+
+
+def read_manifest(manifest: Path) -> List[FileCheck]:
+    """Read the checks from a manifest file."""
+    text = manifest.read_text()
+    try:
+        if manifest.suffix == ".json":
+            content = json.loads(text)
+        else:
+            content = yaml.load(text, Loader=_YamlLoader)  # nosec B506 (is a safe loader)
+    except (json.JSONDecodeError, yaml.YAMLError) as e:
+        raise AutopilotConfigurationError(f"Could not parse manifest `{manifest}`: {e}") from e
+    if not isinstance(content, list):
+        raise AutopilotConfigurationError(
+            f"Manifest `{manifest}` must contain a list of checks!"
+        )
+    checks = []
+    for number, item in enumerate(content, start=1):
+        try:
+            checks.append(_parse_check(item))
+        except ValueError as e:
+            raise AutopilotConfigurationError(
+                f"Check {number} in manifest `{manifest}` {e}!"
+            ) from e
+    return checks
+
+
+class DirectoryIndex:
+    """
+    Entries of the directories below `base`, read on first access.
+
+    Every directory is only scanned once, no matter how many checks refer to
+    files in it, and the file sizes are taken from the directory entries.
+    """
+
+    def __init__(self, base: Path):
+        self._base = base
+        self._directories: Dict[str, Dict[str, os.DirEntry]] = {}
+
+    def _entries(self, directory: str) -> Dict[str, os.DirEntry]:
+        entries = self._directories.get(directory)
+        if entries is None:
+            try:
+                with os.scandir(self._base / directory) as iterator:
+                    entries = {entry.name: entry for entry in iterator}
+            except (FileNotFoundError, NotADirectoryError):
+                entries = {}
+            self._directories[directory] = entries
+        return entries
+
+    def size(self, file: Path) -> Optional[int]:
+        """Return the size of `file` or None if it doesn't exist."""
+        directory, name = os.path.split(file)
+        if not name or name in (".", ".."):
+            # not listed in the parent directory
+            path = self._base / file
+            return path.stat().st_size if path.exists() else None
+        entry = self._entries(directory).get(name)
+        if entry is None:
+            return None
+        try:
+            return entry.stat().st_size
+        except FileNotFoundError:
+            # broken symbolic link
+            return None
+
+    def count_matches(self, pattern: Path) -> int:
+        """Return the number of entries matching the glob `pattern` like `Path.glob`."""
+        if "**" in pattern.name:
+            return len(list((self._base / pattern.parent).glob(pattern.name)))
+        directory, name = os.path.split(pattern)
+        return len(fnmatch.filter(self._entries(directory), name))
+
+
+def evaluate_check(check: FileCheck, index: DirectoryIndex) -> Result:
+    if check.glob:
+        return existence_result(check.file, True, index.count_matches(check.file))
+    size = index.size(check.file)
+    if not check.is_size_check:
+        return existence_result(check.file, False, 0 if size is None else 1)
+    if size is None:
+        return Result(
+            criterion=size_criterion(check.file, check.min_size, check.max_size),
+            fulfilled=False,
+            justification=f"File `{check.file}` doesn't exist!",
+            metadata={"check": "size"},
+        )
+    return size_result(check.file, size, check.min_size, check.max_size)
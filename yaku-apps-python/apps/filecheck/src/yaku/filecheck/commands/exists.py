@@ -38,28 +38,35 @@ def verify_that_file_exists(file: Path, glob: bool) -> None:
     if glob:
         results = list(file.parent.glob(file.name))
         nr_of_results = len(results)
-        fulfilled = nr_of_results > 0
+        if nr_of_results > 0:
+            print(Output("files_found", [str(r) for r in results]).to_json())
+            print(Output("count", nr_of_results).to_json())
+    else:
+        nr_of_results = 1 if file.exists() else 0
+        if nr_of_results:
+            print(Output("file_found", str(file)).to_json())
+
+    RESULTS.append(existence_result(file, glob, nr_of_results))
+
+
+def existence_result(file: Path, glob: bool, nr_of_results: int) -> Result:
+    """Return the result for `file` (or glob pattern) which was found `nr_of_results` times."""
+    fulfilled = nr_of_results > 0
+    if glob:
         if fulfilled:
             justification = (
                 f"{nr_of_results} file(s) were found matching glob pattern `{file}`."
             )
-            print(Output("files_found", [str(r) for r in results]).to_json())
-            print(Output("count", nr_of_results).to_json())
         else:
             justification = f"No files were found matching glob pattern `{file}`!"
     else:
-        fulfilled = file.exists()
         if fulfilled:
             justification = f"File `{file}` exists."
-            print(Output("file_found", str(file)).to_json())
         else:
             justification = f"File `{file}` doesn't exist!"
-
-    RESULTS.append(
-        Result(
-            criterion=f"File `{file}` must exist.",
-            fulfilled=fulfilled,
-            justification=justification,
-            metadata={"check": "exist"},
-        )
+    return Result(
+        criterion=f"File `{file}` must exist.",
+        fulfilled=fulfilled,
+        justification=justification,
+        metadata={"check": "exist"},
     )
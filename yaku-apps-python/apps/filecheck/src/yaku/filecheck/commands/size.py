@@ -23,22 +23,27 @@ def click_command(file: Path, min: int, max: int) -> None:
 
 
 def verify_size_of_file(file: Path, min_size: int | None, max_size: int | None) -> None:
-    file_size = file.stat().st_size
+    RESULTS.append(size_result(file, file.stat().st_size, min_size, max_size))
+
+
+def size_criterion(file: Path, min_size: int | None, max_size: int | None) -> str:
     criteria = []
-    fulfilled = True
     if min_size is not None:
-        if file_size < min_size:
-            fulfilled = False
         criteria.append(f"should be at least {min_size} bytes large")
     if max_size is not None:
-        if file_size > max_size:
-            fulfilled = False
         criteria.append(f"should not be larger than {max_size} bytes")
-    RESULTS.append(
-        Result(
-            criterion=f"File `{file}` " + " and ".join(criteria) + ".",
-            fulfilled=fulfilled,
-            justification=f"File `{file}` has a size of {file_size} bytes.",
-            metadata={"check": "size"},
-        )
+    return f"File `{file}` " + " and ".join(criteria) + "."
+
+
+def size_result(
+    file: Path, file_size: int, min_size: int | None, max_size: int | None
+) -> Result:
+    fulfilled = (min_size is None or file_size >= min_size) and (
+        max_size is None or file_size <= max_size
+    )
+    return Result(
+        criterion=size_criterion(file, min_size, max_size),
+        fulfilled=fulfilled,
+        justification=f"File `{file}` has a size of {file_size} bytes.",
+        metadata={"check": "size"},
     )
@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+NUMBER_OF_INVOCATIONS = 20
+
+
+def run_filecheck(*args: str) -> str:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    process = subprocess.run(
+        [sys.executable, "-m", "yaku.filecheck.cli", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return process.stdout
+
+
+def make_evidence(directory: Path, number_of_files: int) -> list:
+    checks = []
+    for i in range(number_of_files):
+        folder = directory / f"folder{i % 20}"
+        folder.mkdir(exist_ok=True)
+        file = folder / f"file{i}.txt"
+        file.write_text("x" * (i % 100))
+        if i % 2:
+            checks.append({"file": str(file.relative_to(directory))})
+        else:
+            checks.append({"file": str(file.relative_to(directory)), "min": 10, "max": 90})
+    return checks
+
+
+def test_batch_is_faster_than_sequential_invocations(tmp_path: Path):
+    checks = make_evidence(tmp_path, NUMBER_OF_INVOCATIONS)
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps(checks))
+
+    start = time.perf_counter()
+    for check in checks:
+        file = str(tmp_path / check["file"])
+        if "min" in check:
+            run_filecheck("size", "--min", "10", "--max", "90", file)
+        else:
+            run_filecheck("exists", file)
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output = run_filecheck("batch", "--directory", str(tmp_path), str(manifest))
+    batch_time = time.perf_counter() - start
+
+    assert output.count('{"result": ') == len(checks)
+    print(
+        f"\n{NUMBER_OF_INVOCATIONS} checks: {NUMBER_OF_INVOCATIONS} invocations "
+        f"{sequential_time * 1e3:.0f}ms, one batch invocation {batch_time * 1e3:.0f}ms, "
+        f"speedup {sequential_time / batch_time:.1f}x"
+    )
+    assert batch_time < sequential_time
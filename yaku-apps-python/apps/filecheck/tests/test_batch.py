@@ -0,0 +1,194 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import os
+from pathlib import Path
+
+import mock
+import pytest
+from click.testing import CliRunner
+from yaku.autopilot_utils.errors import AutopilotConfigurationError
+from yaku.autopilot_utils.results import RESULTS, assert_result_status, protect_results
+from yaku.filecheck.cli import main
+from yaku.filecheck.commands.batch import (
+    DirectoryIndex,
+    FileCheck,
+    evaluate_check,
+    read_manifest,
+)
+from yaku.filecheck.commands.exists import verify_that_file_exists
+from yaku.filecheck.commands.size import verify_size_of_file
+
+
+@pytest.fixture
+def evidence(tmp_path: Path) -> Path:
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "reports" / "a.pdf").write_text("12345")
+    (tmp_path / "reports" / "b.pdf").write_text("1")
+    (tmp_path / "reports" / "notes.txt").write_text("")
+    (tmp_path / "broken").symlink_to(tmp_path / "missing")
+    return tmp_path
+
+
+def test_read_manifest_accepts_yaml_and_json(tmp_path: Path):
+    yaml_manifest = tmp_path / "manifest.yaml"
+    yaml_manifest.write_text(
+        "- file: a.txt\n- file: '*.pdf'\n  glob: true\n- file: b\n  max: 3\n"
+    )
+    json_manifest = tmp_path / "manifest.json"
+    json_manifest.write_text('[{"file": "a.txt"}, {"file": "b", "min": 1, "max": 3}]')
+
+    assert read_manifest(yaml_manifest) == [
+        FileCheck(Path("a.txt")),
+        FileCheck(Path("*.pdf"), glob=True),
+        FileCheck(Path("b"), max_size=3),
+    ]
+    assert read_manifest(json_manifest) == [
+        FileCheck(Path("a.txt")),
+        FileCheck(Path("b"), min_size=1, max_size=3),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        ("file: a.txt", "must contain a list of checks"),
+        ("- a.txt", "Check 1 .* must be a mapping"),
+        ("- file: a.txt\n- file: ' '", "Check 2 .* must have a non-empty `file`"),
+        ("- file: a.txt\n  size: 3", "unknown keys: size"),
+        ("- file: a.txt\n  glob: 'yes'", "`glob` must be true or false"),
+        ("- file: a.txt\n  min: 3kb", "`min` must be a number of bytes"),
+        ("- file: '*.txt'\n  glob: true\n  max: 3", "can not check the size"),
+        ("- [", "Could not parse manifest"),
+    ],
+)
+def test_read_manifest_rejects_invalid_checks(tmp_path: Path, content: str, message: str):
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(content)
+
+    with pytest.raises(AutopilotConfigurationError, match=message):
+        read_manifest(manifest)
+
+
+@protect_results
+@pytest.mark.parametrize(
+    "check",
+    [
+        FileCheck(Path("reports/a.pdf")),
+        FileCheck(Path("reports/c.pdf")),
+        FileCheck(Path("reports")),
+        FileCheck(Path("broken")),
+        FileCheck(Path("missing/a.pdf")),
+        FileCheck(Path("reports/a.pdf/x")),
+        FileCheck(Path("reports/*.pdf"), glob=True),
+        FileCheck(Path("reports/*.PDF"), glob=True),
+        FileCheck(Path("reports/[ab].*"), glob=True),
+        FileCheck(Path("*"), glob=True),
+        FileCheck(Path("missing/*"), glob=True),
+    ],
+)
+def test_existence_checks_give_same_results_as_exists_command(evidence: Path, check):
+    verify_that_file_exists(evidence / check.file, check.glob)
+    expected = RESULTS[0]
+
+    result = evaluate_check(check, DirectoryIndex(evidence))
+
+    assert result.fulfilled == expected.fulfilled
+    assert result.justification == expected.justification.replace(f"{evidence}/", "")
+    assert result.criterion == expected.criterion.replace(f"{evidence}/", "")
+
+
+@protect_results
+@pytest.mark.parametrize(
+    ("min_size", "max_size"),
+    [(5, None), (6, None), (None, 5), (None, 4), (1, 5), (2, 4)],
+)
+def test_size_checks_give_same_results_as_size_command(evidence: Path, min_size, max_size):
+    file = evidence / "reports" / "a.pdf"
+    verify_size_of_file(file, min_size, max_size)
+    expected = RESULTS[0]
+
+    result = evaluate_check(
+        FileCheck(Path("reports/a.pdf"), min_size=min_size, max_size=max_size),
+        DirectoryIndex(evidence),
+    )
+
+    assert result.to_dict() == {
+        **expected.to_dict(),
+        "criterion": expected.criterion.replace(f"{evidence}/", ""),
+        "justification": expected.justification.replace(f"{evidence}/", ""),
+    }
+
+
+def test_size_check_of_missing_file_is_not_fulfilled(evidence: Path):
+    result = evaluate_check(
+        FileCheck(Path("reports/c.pdf"), min_size=1), DirectoryIndex(evidence)
+    )
+
+    assert result.fulfilled is False
+    assert result.criterion == "File `reports/c.pdf` should be at least 1 bytes large."
+    assert result.justification == "File `reports/c.pdf` doesn't exist!"
+
+
+def test_directory_index_scans_every_directory_only_once(evidence: Path):
+    index = DirectoryIndex(evidence)
+    checks = [
+        FileCheck(Path("reports/a.pdf")),
+        FileCheck(Path("reports/b.pdf"), max_size=3),
+        FileCheck(Path("reports/*.txt"), glob=True),
+        FileCheck(Path("broken")),
+        FileCheck(Path("reports/c.pdf")),
+    ]
+
+    with mock.patch("os.scandir", wraps=os.scandir) as scandir:
+        results = [evaluate_check(check, index) for check in checks]
+
+    assert [r.fulfilled for r in results] == [True, True, True, False, False]
+    assert sorted(call.args[0] for call in scandir.call_args_list) == [
+        evidence / "",
+        evidence / "reports",
+    ]
+
+
+@protect_results
+def test_batch_command_emits_one_result_per_check(evidence: Path):
+    manifest = evidence / "manifest.yaml"
+    manifest.write_text(
+        "- file: reports/a.pdf\n"
+        "- file: reports/*.pdf\n  glob: true\n"
+        "- file: reports/b.pdf\n  min: 1\n"
+    )
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["batch", "--directory", str(evidence), str(manifest)])
+
+    assert_result_status(result.output, "GREEN", reason="File `reports/a.pdf` exists.")
+    assert result.output.count('{"result": ') == 3
+
+
+@protect_results
+def test_batch_command_is_red_if_a_check_fails(evidence: Path):
+    manifest = evidence / "manifest.json"
+    manifest.write_text('[{"file": "reports/a.pdf"}, {"file": "reports/c.pdf"}]')
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["batch", "--directory", str(evidence), str(manifest)])
+
+    assert_result_status(
+        result.output,
+        "RED",
+        reason="File `reports/c.pdf` must exist.\nBut: File `reports/c.pdf` doesn't exist!",
+    )
+
+
+@protect_results
+def test_batch_command_fails_for_invalid_manifest(tmp_path: Path):
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text("- file: a.txt\n  glob: 1\n")
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["batch", str(manifest)])
+
+    assert result.exit_code == 0
+    assert_result_status(result.output, "FAILED", reason="Check 1 in manifest .* `glob`")
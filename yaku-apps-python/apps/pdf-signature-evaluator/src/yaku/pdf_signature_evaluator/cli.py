@@ -78,7 +78,7 @@ class CLI:
 
     @staticmethod
     def click_evaluator_callback(results: ResultsCollector) -> tuple[str, str]:
-        if all([r.fulfilled for r in results]):
+        if results.aggregate.unfulfilled == 0:
             return "GREEN", "All criteria are fulfilled."
         return "RED", "Not all criteria are fulfilled!"
 
@@ -16,16 +16,10 @@ from typing import Optional
 from loguru import logger
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
 from yaku.autopilot_utils.results import RESULTS, Result
-from yaku.pdf_signature_evaluator.config import ConfigFile
 from yaku.pdf_signature_evaluator.filesystem_utils import (
     get_certificate_paths,
     get_file_list,
 )
-from yaku.pdf_signature_evaluator.rules import read_file_rules
-from yaku.pdf_signature_evaluator.signature_utils import validate_pdf_signatures
-from yaku.pdf_signature_evaluator.signer_utils import get_signers_dictionary
-
-from .signer_verification import SignatureComparison
 
 current_dir = os.path.dirname(__file__)
 expected_signers_information = None
@@ -38,6 +32,15 @@ def digital_signature_verification(
     configuration_file: Optional[Path] = None,
     strict: bool = True,
 ):
+    # pyhanko, asn1crypto and pydantic take long to import, so only import them
+    # when the evaluator runs and not already for `--version` or usage errors
+    from yaku.pdf_signature_evaluator.config import ConfigFile
+    from yaku.pdf_signature_evaluator.rules import read_file_rules
+    from yaku.pdf_signature_evaluator.signature_utils import validate_pdf_signatures
+    from yaku.pdf_signature_evaluator.signer_utils import get_signers_dictionary
+
+    from .signer_verification import SignatureComparison
+
     pdf_list = get_file_list(pdf_location, ".pdf")
     if len(pdf_list) == 0:
         raise AutopilotConfigurationError("No PDF files found in the given location.")
@@ -2,16 +2,40 @@
 #
 # SPDX-License-Identifier: MIT
 
-from yaku.autopilot_utils.cli_base import make_autopilot_app, read_version_from_package
+from yaku.autopilot_utils.cli_base import (
+    LazySubcommand,
+    make_autopilot_app,
+    read_version_from_package,
+)
+
+
+def load_get_wheels():
+    from .commands import get_wheels
+
+    return get_wheels
+
+
+def load_license_info():
+    from .commands import license_info
+
+    return license_info
+
+
+def load_find_deps():
+    from .commands import find_deps
 
-from .commands import find_deps, get_wheels, license_info
+    return find_deps
 
 
 class CLI:
     click_name = "pex-tool"
     click_help_text = ""
 
-    click_subcommands = [get_wheels, license_info, find_deps]
+    click_subcommands = [
+        LazySubcommand("get-wheels", load_get_wheels),
+        LazySubcommand("license-info", load_license_info),
+        LazySubcommand("find-deps", load_find_deps),
+    ]
 
 
 cli = make_autopilot_app(
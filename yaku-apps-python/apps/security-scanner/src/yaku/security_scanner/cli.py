@@ -27,19 +27,21 @@ class CLI:
 
     @classmethod
     def click_evaluator_callback(cls, results: ResultsCollector) -> Tuple[str, str]:
-        if any([not r.fulfilled for r in results]):
+        aggregate = results.aggregate
+        vulnerability_threshold = aggregate.first_results[0].metadata[
+            "vulnerability_threshold"
+        ]
+        if aggregate.unfulfilled:
             return (
                 cls.status_red,
                 cls.status_red_message.format(
-                    num_of_vulnerabilities=len(results),
-                    vulnerability_threshold=results[0].metadata["vulnerability_threshold"],
+                    num_of_vulnerabilities=aggregate.total,
+                    vulnerability_threshold=vulnerability_threshold,
                 ),
             )
         return (
             cls.status_green,
-            cls.status_green_message.format(
-                vulnerability_threshold=results[0].metadata["vulnerability_threshold"]
-            ),
+            cls.status_green_message.format(vulnerability_threshold=vulnerability_threshold),
         )
 
 
@@ -2,18 +2,19 @@
 #
 # SPDX-License-Identifier: MIT
 
+import functools
 import os
 
 import click
 from loguru import logger
-from yaku.autopilot_utils.checks import check
 from yaku.autopilot_utils.cli_base import make_autopilot_app, read_version_from_package
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
 from yaku.autopilot_utils.results import RESULTS, Result
 
 from .config import ConfigFile, Settings
+from .evaluation import FileIndex, RuleEvaluator, without_metadata_files
 from .rules import read_file_rules
-from .utils import PropertiesReader
+from .utils import PropertiesReader, PropertiesStore
 
 
 def configure_properties_reader(reader: PropertiesReader, mapping_config: str):
@@ -108,30 +109,47 @@ class CLI:
                 return "GREEN", "All configured checks are fulfilled!"
 
 
-def sharepoint_evaluator(settings: Settings, config_file: ConfigFile):
-    if not config_file.content:
-        raise AutopilotConfigurationError(f"Config file `{config_file.file_path}` is empty!")
-    file_rules = read_file_rules(config_file.content, base_path=settings.evidence_path)
-
+def create_properties_reader(settings: Settings) -> PropertiesReader:
     properties_file = settings.evidence_path / "__custom_property_definitions__.json"
-    reader = PropertiesReader(properties_file)
+    reader = PropertiesReader(
+        properties_file, properties_store=settings.evidence_path / PropertiesStore.filename
+    )
 
     # TODO: can't we store the custom_properties into the properties_file above?
     # so that the user doesn't have to provide them twice?
 
     if settings.custom_properties:
         configure_properties_reader(reader, settings.custom_properties)
+    return reader
+
 
-    # iterate over all files and check the rules
+def sharepoint_evaluator(settings: Settings, config_file: ConfigFile):
+    if not config_file.content:
+        raise AutopilotConfigurationError(f"Config file `{config_file.file_path}` is empty!")
+    file_rules = read_file_rules(config_file.content, base_path=settings.evidence_path)
+
+    # match all file filters against one index of the evidence path first
+    file_index = FileIndex()
+    # TODO: properly deal with wildcards in folder names
+    # TODO: find files for which only a properties json file was downloaded
+    matched_paths = [file_index.glob(file_rule.file) for file_rule in file_rules]
+    matched_files = [without_metadata_files(paths) for paths in matched_paths]
+
+    evaluator = RuleEvaluator(
+        file_rules, functools.partial(create_properties_reader, settings)
+    )
+    outcomes = evaluator.evaluate(matched_files)
+
+    # report the results in the order of the file rules, files and rules
     global all_green, some_yellow
     all_green = True
     some_yellow = False
-    for file_rule in file_rules:
+    for file_rule_index, (file_rule, found_paths, found_files) in enumerate(
+        zip(file_rules, matched_paths, matched_files)
+    ):
         file_filter = file_rule.file
-        # TODO: rewrite the glob here to properly deal with wildcards in folder names
-        # TODO: rewrite the glob here to find files for which only a properties json file was downloaded
-        found_files = list(file_filter.parent.glob(file_filter.name))
-        if not found_files:
+        # a filter which only matches properties files is no error, but gives no results
+        if not found_paths:
             msg = (
                 f"File filter `{file_filter.relative_to(settings.evidence_path)}` mentioned in the config file "
                 f"`{config_file.file_path}` did not match any files!"
@@ -145,9 +163,6 @@ def sharepoint_evaluator(settings: Settings, config_file: ConfigFile):
                 msg += ")"
             raise AutopilotConfigurationError(msg)
         for file in found_files:
-            if file.name.endswith(".__properties__.json"):
-                # TODO: remove once the TODOs above are resolved and new glob doesn't match properties json files
-                continue
             if not file_rule.rules:
                 some_yellow = True
                 logger.warning(
@@ -161,13 +176,11 @@ def sharepoint_evaluator(settings: Settings, config_file: ConfigFile):
                         justification=f"Config has no rules for file `{file.relative_to(settings.evidence_path)}`",
                     )
                 )
-            for rule in file_rule.rules:
-                property_value = reader.get_file_property(file, rule.property)
-                success = check(
-                    checked_value=property_value,
-                    operator=rule.operator,
-                    other_value=rule.other_value,
-                )
+            for rule_index, rule in enumerate(file_rule.rules):
+                outcome = outcomes[(file, (file_rule_index, rule_index))]
+                if isinstance(outcome, Exception):
+                    raise outcome
+                property_value, success = outcome
                 justification = f"Check of rule ({rule.nice()}) for `{file.relative_to(settings.evidence_path)}` with value `{property_value}` "
                 fulfilled = False
                 if not success:
@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import fnmatch
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from .rules import FileRules, Outcome, RulePlan, RuleRef
+from .utils import FETCHER_METADATA_FILENAMES, PROPERTIES_FILE_SUFFIX, PropertiesReader
+
+
+def _has_magic(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+class FileIndex:
+    """
+    In-memory index of the directory listings of the evidence path.
+
+    Every directory is listed at most once and only when a file filter
+    refers to it, so file rules with overlapping filters don't list the
+    same directories again. The file filters are matched like by
+    `Path.glob`: only the last path segment may contain wildcards.
+    """
+
+    def __init__(self):
+        self._listings: Dict[Path, Tuple[List[str], FrozenSet[str]]] = {}
+
+    def _listing(self, directory: Path) -> Tuple[List[str], FrozenSet[str]]:
+        listing = self._listings.get(directory)
+        if listing is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = sorted(entry.name for entry in entries)
+            except OSError:
+                names = []
+            listing = (names, frozenset(names))
+            self._listings[directory] = listing
+        return listing
+
+    def glob(self, file_filter: Path) -> List[Path]:
+        """
+        Return the paths matching `file_filter` in a stable order.
+
+        Like `Path.glob`, this includes properties files and the fetcher's
+        other metadata files, see :py:func:`without_metadata_files`.
+        """
+        pattern = file_filter.name
+        if "**" in pattern:
+            # recursive patterns are rare, so they are left to pathlib
+            return sorted(file_filter.parent.glob(pattern))
+        names, name_set = self._listing(file_filter.parent)
+        if not _has_magic(pattern):
+            matching_names = [pattern] if pattern in name_set else []
+        else:
+            matching_names = fnmatch.filter(names, pattern)
+        return [file_filter.parent / name for name in matching_names]
+
+
+def without_metadata_files(paths: List[Path]) -> List[Path]:
+    """
+    Leave out the properties files and the fetcher's bookkeeping files.
+
+    They describe the fetched files, but are no evidence themselves, so
+    they are never checked, not even for filters like `*`.
+    """
+    return [
+        path
+        for path in paths
+        if not path.name.endswith(PROPERTIES_FILE_SUFFIX)
+        and path.name not in FETCHER_METADATA_FILENAMES
+    ]
+
+
+class FileTask(NamedTuple):
+    """All rules which must be checked for a file."""
+
+    file: Path
+    rule_refs: List[RuleRef]
+
+
+def _check_file(reader: PropertiesReader, plan: RulePlan, task: FileTask) -> List[Outcome]:
+    """Check all rules of `task`, with the properties of the file loaded only once."""
+    try:
+        properties = reader.load_properties(task.file)
+    except Exception as e:
+        return [e] * len(task.rule_refs)
+    return plan.check(reader, properties, task.file, task.rule_refs)
+
+
+_worker_reader: Optional[PropertiesReader] = None
+_worker_plan: Optional[RulePlan] = None
+
+
+def _initialize_worker(
+    create_reader: Callable[[], PropertiesReader], file_rules: List[FileRules]
+):
+    # the compiled checks can't be sent to the worker, so every worker compiles its own plan
+    global _worker_reader, _worker_plan
+    _worker_reader = create_reader()
+    _worker_plan = RulePlan(file_rules)
+
+
+def _check_files(tasks: List[FileTask]) -> List[List[Outcome]]:
+    assert _worker_reader is not None and _worker_plan is not None, (
+        "The worker must be initialized first!"
+    )
+    return [_check_file(_worker_reader, _worker_plan, task) for task in tasks]
+
+
+class RuleEvaluator:
+    """
+    Check the rules of all files matched by the file rules.
+
+    The rules are grouped by file, so that the properties of every file are
+    loaded only once, even if the file is matched by several file rules, and
+    checked with a compiled `RulePlan`.
+    For large evidence sets with at least `min_files_for_parallel_evaluation`
+    files, the files are checked by a pool of processes, each with its own
+    `PropertiesReader` created by `create_reader`.
+
+    Errors which occur while checking a rule are not raised, but returned
+    as outcome, so that the caller can handle them in the same order as
+    the results.
+    """
+
+    min_files_for_parallel_evaluation = 2000
+
+    # number of chunks of files per worker process
+    chunks_per_worker = 4
+
+    def __init__(
+        self,
+        file_rules: List[FileRules],
+        create_reader: Callable[[], PropertiesReader],
+        max_workers: Optional[int] = None,
+    ):
+        self._file_rules = file_rules
+        self._create_reader = create_reader
+        self._max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+
+    def evaluate(self, matched_files: List[List[Path]]) -> Dict[Tuple[Path, RuleRef], Outcome]:
+        """
+        Check the rules of the files which were matched by each of the file rules.
+
+        `matched_files` contains the matched files of every file rule. Returns
+        the outcome by file and rule reference.
+        """
+        rule_refs_by_file: Dict[Path, List[RuleRef]] = {}
+        for file_rule_index, (file_rule, files) in enumerate(
+            zip(self._file_rules, matched_files)
+        ):
+            for file in files:
+                rule_refs_by_file.setdefault(file, []).extend(
+                    (file_rule_index, rule_index) for rule_index in range(len(file_rule.rules))
+                )
+        tasks = [FileTask(file, refs) for file, refs in rule_refs_by_file.items() if refs]
+
+        if self._max_workers > 1 and len(tasks) >= self.min_files_for_parallel_evaluation:
+            task_outcomes = self._check_in_parallel(tasks)
+        else:
+            reader = self._create_reader()
+            plan = RulePlan(self._file_rules)
+            task_outcomes = [_check_file(reader, plan, task) for task in tasks]
+
+        outcomes: Dict[Tuple[Path, RuleRef], Outcome] = {}
+        for task, file_outcomes in zip(tasks, task_outcomes):
+            for rule_ref, outcome in zip(task.rule_refs, file_outcomes):
+                outcomes[(task.file, rule_ref)] = outcome
+        return outcomes
+
+    def _check_in_parallel(self, tasks: List[FileTask]) -> List[List[Outcome]]:
+        chunk_size = max(1, -(-len(tasks) // (self._max_workers * self.chunks_per_worker)))
+        chunks = [tasks[i : i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            initializer=_initialize_worker,
+            initargs=(self._create_reader, self._file_rules),
+        ) as executor:
+            return [
+                outcomes
+                for chunk_outcomes in executor.map(_check_files, chunks)
+                for outcomes in chunk_outcomes
+            ]
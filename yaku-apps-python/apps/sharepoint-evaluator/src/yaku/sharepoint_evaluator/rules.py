@@ -2,14 +2,15 @@
 #
 # SPDX-License-Identifier: MIT
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
-from yaku.autopilot_utils.checks import checks_dict
+from yaku.autopilot_utils.checks import CompiledCheck, checks_dict, compile_check
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
 
 from .config import ConfigFileContent
+from .utils import PropertiesReader
 
 
 @dataclass
@@ -17,6 +18,10 @@ class Rule:
     property: str
     operator: str
     other_value: Optional[Union[str, int, float]] = None
+    _compiled_check: Optional[CompiledCheck] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _nice: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.operator not in checks_dict:
@@ -27,14 +32,28 @@ class Rule:
     def __str__(self):
         return f"Rule({self.property}=>{self.operator}=>{self.other_value})"
 
+    def matches(self, value) -> bool:
+        """
+        Check if `value` fulfills this rule.
+
+        The rule's operator and value are compiled on first use and then reused.
+        """
+        if self._compiled_check is None:
+            self._compiled_check = compile_check(self.operator, self.other_value)
+        return self._compiled_check(value)
+
     def nice(self) -> str:
         """Provide a nice string representation of the rule."""
-        try:
-            check_fn = checks_dict[self.operator]
-            check_fn_string: str = check_fn._nice
-            return f"Property `{self.property}` {check_fn_string} `{self.other_value}`"
-        except Exception:
-            return str(self)
+        if self._nice is None:
+            try:
+                check_fn = checks_dict[self.operator]
+                check_fn_string: str = check_fn._nice
+                self._nice = (
+                    f"Property `{self.property}` {check_fn_string} `{self.other_value}`"
+                )
+            except Exception:
+                self._nice = str(self)
+        return self._nice
 
 
 @dataclass
@@ -81,3 +100,113 @@ def read_file_rules(config_file_data: ConfigFileContent, base_path: Path) -> Lis
             rules.append(Rule(property=property, operator=operator, other_value=other_value))
         result.append(FileRules(base_path / file_entry.file, rules))
     return result
+
+
+# reference to the rule with the given index in the file rules with the given index
+RuleRef = Tuple[int, int]
+
+
+class RuleCheck(NamedTuple):
+    """Result of checking a rule against the property value of a file."""
+
+    property_value: Any
+    success: bool
+
+
+# outcome of a rule check, or the error which prevented it
+Outcome = Union[RuleCheck, Exception]
+
+
+class RulePlan:
+    """
+    Compiled checks of all file rules of a config file.
+
+    Rules with the same property, operator and value, e.g. in several file
+    rules, share one check, whose operator and value are compiled only once
+    (see `compile_check`). When the rules for a file are checked, the checks
+    are grouped by property, so that every property is only looked up once
+    per file, and every check is only run once per file.
+
+    If a rule cannot be compiled, e.g. because its value is not a number,
+    the error is returned as outcome of the rule, like any other error
+    which occurs while checking it.
+    """
+
+    def __init__(self, file_rules: Sequence[FileRules]):
+        self._properties: List[str] = []
+        self._checks: List[Union[CompiledCheck, Exception]] = []
+        self._check_of_rule: Dict[RuleRef, int] = {}
+        # groups of checks of each list of rules, see `_schedule`
+        self._schedules: Dict[
+            Tuple[RuleRef, ...], Tuple[List[int], List[Tuple[str, List[int]]]]
+        ] = {}
+
+        check_ids: Dict[Tuple[str, str, type, str], int] = {}
+        for file_rule_index, file_rule in enumerate(file_rules):
+            for rule_index, rule in enumerate(file_rule.rules):
+                # the type is part of the key, as e.g. `1` and `1.0` are compared differently
+                key = (
+                    rule.property,
+                    rule.operator,
+                    type(rule.other_value),
+                    repr(rule.other_value),
+                )
+                check_id = check_ids.get(key)
+                if check_id is None:
+                    check_id = check_ids[key] = len(self._checks)
+                    self._properties.append(rule.property)
+                    try:
+                        self._checks.append(compile_check(rule.operator, rule.other_value))
+                    except Exception as e:
+                        self._checks.append(e)
+                self._check_of_rule[(file_rule_index, rule_index)] = check_id
+
+    @property
+    def number_of_checks(self) -> int:
+        return len(self._checks)
+
+    def _schedule(
+        self, rule_refs: Sequence[RuleRef]
+    ) -> Tuple[List[int], List[Tuple[str, List[int]]]]:
+        """
+        Return the check of every rule and the distinct checks grouped by property.
+
+        Files which are matched by the same file rules share the schedule.
+        """
+        key = tuple(rule_refs)
+        schedule = self._schedules.get(key)
+        if schedule is None:
+            check_ids = [self._check_of_rule[rule_ref] for rule_ref in rule_refs]
+            checks_by_property: Dict[str, List[int]] = {}
+            for check_id in dict.fromkeys(check_ids):
+                checks_by_property.setdefault(self._properties[check_id], []).append(check_id)
+            schedule = (check_ids, list(checks_by_property.items()))
+            self._schedules[key] = schedule
+        return schedule
+
+    def check(
+        self,
+        reader: PropertiesReader,
+        properties: Dict[str, Any],
+        file_path: Path,
+        rule_refs: Sequence[RuleRef],
+    ) -> List[Outcome]:
+        """Check the rules given by `rule_refs` against the loaded `properties` of a file."""
+        check_ids, checks_by_property = self._schedule(rule_refs)
+        outcomes: Dict[int, Outcome] = {}
+        for property_name, property_check_ids in checks_by_property:
+            try:
+                property_value = reader.get_property(properties, property_name, file_path)
+            except Exception as e:
+                outcomes.update((check_id, e) for check_id in property_check_ids)
+                continue
+            for check_id in property_check_ids:
+                check = self._checks[check_id]
+                if isinstance(check, Exception):
+                    outcomes[check_id] = check
+                    continue
+                try:
+                    outcomes[check_id] = RuleCheck(property_value, check(property_value))
+                except Exception as e:
+                    outcomes[check_id] = e
+        return [outcomes[check_id] for check_id in check_ids]
@@ -0,0 +1,133 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import functools
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+from yaku.autopilot_utils.checks import check
+from yaku.sharepoint_evaluator.evaluation import FileIndex, RuleEvaluator
+from yaku.sharepoint_evaluator.rules import FileRules, Rule, RuleCheck
+from yaku.sharepoint_evaluator.utils import PropertiesReader
+
+FOLDERS = 20
+FILES_PER_FOLDER = 100
+
+# the same rules are used for several file filters, like in typical configs
+RULES = [
+    Rule("Status", "equals", "Final"),
+    Rule("Status", "is-not-empty"),
+    Rule("Size", "is-larger-than", 10),
+    Rule("Size", "is-less-equal-than", 5000),
+    Rule("Version", "is-larger-equal-than", "2.0"),
+    Rule("Modified", "is-not-older-than", "52w"),
+    Rule("Modified", "is-older-than", "2020-01-01"),
+    Rule("Title", "contains", "Report"),
+    Rule("Title", "equals", "Report 1"),
+    Rule("Owner", "equals", "someone"),
+]
+
+
+@pytest.fixture(scope="module")
+def evidence_path(tmp_path_factory) -> Path:
+    """Create an evidence tree with properties files like the fetcher writes them."""
+    evidence_path = tmp_path_factory.mktemp("evidence")
+    for folder_index in range(FOLDERS):
+        folder = evidence_path / f"folder{folder_index}"
+        folder.mkdir()
+        for file_index in range(FILES_PER_FOLDER):
+            file = folder / f"Report {file_index}.docx"
+            file.touch()
+            properties = {
+                "Status": "Final" if file_index % 3 else "Draft",
+                "Size": file_index * 50,
+                "Version": f"{file_index % 4}.0",
+                "Modified": f"20{10 + file_index % 15}-0{1 + file_index % 9}-01T12:00:00Z",
+                "Title": f"Report {file_index}",
+                "Owner": "someone",
+                "Description": "x" * 2000,
+            }
+            (folder / (file.name + ".__properties__.json")).write_text(json.dumps(properties))
+    return evidence_path
+
+
+def make_file_rules(evidence_path: Path):
+    """Check every folder with all rules, and the files of every folder with a number twice."""
+    file_rules = []
+    for folder_index in range(FOLDERS):
+        folder = evidence_path / f"folder{folder_index}"
+        file_rules.append(FileRules(folder / "*.docx", list(RULES)))
+        file_rules.append(FileRules(folder / "Report 1*.docx", list(RULES)))
+    return file_rules
+
+
+def create_reader(evidence_path: Path) -> PropertiesReader:
+    return PropertiesReader(evidence_path / "__custom_property_definitions__.json")
+
+
+def evaluate_rule_by_rule(evidence_path: Path):
+    """Evaluate the rules like earlier evaluator versions, one glob and lookup per rule."""
+    reader = create_reader(evidence_path)
+    outcomes = []
+    for file_rule in make_file_rules(evidence_path):
+        file_filter = file_rule.file
+        for file in sorted(file_filter.parent.glob(file_filter.name)):
+            if file.name.endswith(".__properties__.json"):
+                continue
+            for rule in file_rule.rules:
+                property_value = reader.get_file_property(file, rule.property)
+                outcomes.append(
+                    RuleCheck(
+                        property_value, check(property_value, rule.operator, rule.other_value)
+                    )
+                )
+    return outcomes
+
+
+def evaluate_with_rule_plan(evidence_path: Path, max_workers: int):
+    file_rules = make_file_rules(evidence_path)
+    file_index = FileIndex()
+    matched_files = [file_index.glob(file_rule.file) for file_rule in file_rules]
+    evaluator = RuleEvaluator(
+        file_rules, functools.partial(create_reader, evidence_path), max_workers=max_workers
+    )
+    outcomes = evaluator.evaluate(matched_files)
+    return [
+        outcomes[(file, (file_rule_index, rule_index))]
+        for file_rule_index, (file_rule, files) in enumerate(zip(file_rules, matched_files))
+        for file in files
+        for rule_index in range(len(file_rule.rules))
+    ]
+
+
+def measure(evaluate, *args):
+    start = time.perf_counter()
+    outcomes = evaluate(*args)
+    return time.perf_counter() - start, outcomes
+
+
+def test_rule_plan_is_faster_than_rule_by_rule_evaluation(evidence_path, monkeypatch):
+    baseline_time, expected_outcomes = measure(evaluate_rule_by_rule, evidence_path)
+
+    print(
+        f"\n{FOLDERS * FILES_PER_FOLDER} files, {len(expected_outcomes)} rule checks:"
+        f"\nrule by rule: {baseline_time * 1e3:.0f}ms"
+    )
+    plan_time, outcomes = measure(evaluate_with_rule_plan, evidence_path, 1)
+    assert outcomes == expected_outcomes
+    print(f"rule plan: {plan_time * 1e3:.0f}ms, speedup {baseline_time / plan_time:.1f}x")
+    assert plan_time < baseline_time
+
+    cpu_count = os.cpu_count() or 1
+    if cpu_count > 1:
+        monkeypatch.setattr(RuleEvaluator, "min_files_for_parallel_evaluation", 1)
+        parallel_time, outcomes = measure(evaluate_with_rule_plan, evidence_path, cpu_count)
+        assert outcomes == expected_outcomes
+        print(
+            f"rule plan with {cpu_count} processes: {parallel_time * 1e3:.0f}ms, "
+            f"speedup {baseline_time / parallel_time:.1f}x"
+        )
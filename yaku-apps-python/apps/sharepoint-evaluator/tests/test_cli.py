@@ -487,3 +487,133 @@ def test_cli_treats_as_failure_if_wildcard_does_not_match_anything(tmp_path: Pat
     assert "did not match any files" in result.output
     assert "prop1" in result.output
     assert "value1" in result.output
+
+
+def test_cli_ignores_file_filter_matching_only_properties_files(tmp_path: Path):
+    (tmp_path / "some.docx").touch()
+    (tmp_path / "some.docx.__properties__.json").write_text(json.dumps({"prop1": "value1"}))
+
+    props_file = tmp_path / "__custom_property_definitions__.json"
+    props_file.write_text("{}")
+
+    rule_file = tmp_path / "config.yaml"
+    rule_file.write_text(
+        """\
+        - file: "*.__properties__.json"
+          rules:
+            - property: prop1
+              equals: value1
+    """
+    )
+
+    options = [
+        "--config-file",
+        str(rule_file),
+        "--evidence-path",
+        str(tmp_path),
+    ]
+    runner = click.testing.CliRunner()
+    app = make_autopilot_app(
+        version_callback=read_version_from_package(__package__),
+        provider=CLI,
+    )
+
+    result = runner.invoke(app, options)
+    assert result.exit_code == 0
+    assert "did not match any files" not in result.output
+    assert '"status": "GREEN"' in result.output
+
+
+def test_cli_skips_fetcher_metadata_files_for_root_wildcard(tmp_path: Path):
+    evidence_path = tmp_path / "evidence"
+    evidence_path.mkdir()
+    (evidence_path / "a.pdf").touch()
+    (evidence_path / "a.pdf.__properties__.json").write_text(json.dumps({"Status": "Final"}))
+    for name in ["__properties__.sqlite", "__manifest__.json", "__checkpoint__.jsonl"]:
+        (evidence_path / name).write_text("{}")
+
+    rule_file = tmp_path / "config.yaml"
+    rule_file.write_text(
+        """\
+        - file: "*"
+          rules:
+            - property: Status
+              equals: Final
+    """
+    )
+
+    options = [
+        "--config-file",
+        str(rule_file),
+        "--evidence-path",
+        str(evidence_path),
+    ]
+    runner = click.testing.CliRunner()
+    app = make_autopilot_app(
+        version_callback=read_version_from_package(__package__),
+        provider=CLI,
+    )
+
+    result = runner.invoke(app, options)
+    assert result.exit_code == 0
+    assert '"status": "GREEN"' in result.output
+    justifications = [
+        json.loads(line)["result"]["justification"]
+        for line in result.output.splitlines()
+        if line.startswith('{"result"')
+    ]
+    # the results of earlier tests are also part of the output
+    assert justifications[-1] == (
+        "Check of rule (Property `Status` is equal to `Final`) for `a.pdf` with value `Final` was successful."
+    )
+    assert "__properties__.sqlite.__properties__.json" not in result.output
+
+
+def test_cli_reports_results_of_overlapping_file_filters_in_config_order(tmp_path: Path):
+    for name, status in [("b.docx", "Draft"), ("a.docx", "Final")]:
+        (tmp_path / name).touch()
+        (tmp_path / (name + ".__properties__.json")).write_text(json.dumps({"Status": status}))
+
+    props_file = tmp_path / "__custom_property_definitions__.json"
+    props_file.write_text("{}")
+
+    rule_file = tmp_path / "config.yaml"
+    rule_file.write_text(
+        """\
+        - file: "b.docx"
+          rules:
+            - property: Status
+              equals: Draft
+        - file: "*.docx"
+          rules:
+            - property: Status
+              equals: Final
+    """
+    )
+
+    options = [
+        "--config-file",
+        str(rule_file),
+        "--evidence-path",
+        str(tmp_path),
+    ]
+    runner = click.testing.CliRunner()
+    app = make_autopilot_app(
+        version_callback=read_version_from_package(__package__),
+        provider=CLI,
+    )
+
+    result = runner.invoke(app, options)
+    assert result.exit_code == 0
+    assert '"status": "RED"' in result.output
+    justifications = [
+        json.loads(line)["result"]["justification"]
+        for line in result.output.splitlines()
+        if line.startswith('{"result"')
+    ]
+    # the results of earlier tests are also part of the output
+    assert justifications[-3:] == [
+        "Check of rule (Property `Status` is equal to `Draft`) for `b.docx` with value `Draft` was successful.",
+        "Check of rule (Property `Status` is equal to `Final`) for `a.docx` with value `Final` was successful.",
+        "Check of rule (Property `Status` is equal to `Final`) for `b.docx` with value `Draft` was not successful!",
+    ]
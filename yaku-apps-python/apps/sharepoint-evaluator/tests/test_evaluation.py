@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import functools
+import json
+import os
+from pathlib import Path
+
+import pytest
+from yaku.autopilot_utils.errors import AutopilotConfigurationError
+from yaku.sharepoint_evaluator.evaluation import (
+    FileIndex,
+    RuleEvaluator,
+    without_metadata_files,
+)
+from yaku.sharepoint_evaluator.rules import FileRules, Rule, RuleCheck
+from yaku.sharepoint_evaluator.utils import PropertiesReader
+
+
+@pytest.fixture
+def evidence_path(tmp_path: Path) -> Path:
+    (tmp_path / "folder").mkdir()
+    for name, status in [("b.docx", "Draft"), ("a.docx", "Final"), ("folder/c.txt", "Final")]:
+        (tmp_path / name).touch()
+        (tmp_path / (name + ".__properties__.json")).write_text(
+            json.dumps({"Status": status, "Size": 5})
+        )
+    return tmp_path
+
+
+def _create_reader(evidence_path: Path) -> PropertiesReader:
+    return PropertiesReader(evidence_path / "__custom_property_definitions__.json")
+
+
+def test_file_index_matches_file_filters(evidence_path: Path):
+    index = FileIndex()
+
+    assert index.glob(evidence_path / "*.docx") == [
+        evidence_path / "a.docx",
+        evidence_path / "b.docx",
+    ]
+    assert index.glob(evidence_path / "a.docx") == [evidence_path / "a.docx"]
+    assert index.glob(evidence_path / "folder" / "?.txt") == [evidence_path / "folder/c.txt"]
+    assert index.glob(evidence_path / "missing.docx") == []
+    assert index.glob(evidence_path / "missing" / "*") == []
+    assert index.glob(evidence_path / "folder" / "*") == [
+        evidence_path / "folder/c.txt",
+        evidence_path / "folder/c.txt.__properties__.json",
+    ]
+
+
+def test_without_metadata_files(evidence_path: Path):
+    assert without_metadata_files(FileIndex().glob(evidence_path / "folder" / "*")) == [
+        evidence_path / "folder/c.txt"
+    ]
+    for name in ["__properties__.sqlite", "__manifest__.json", "__checkpoint__.jsonl"]:
+        (evidence_path / name).touch()
+    assert without_metadata_files(FileIndex().glob(evidence_path / "*")) == [
+        evidence_path / "a.docx",
+        evidence_path / "b.docx",
+        evidence_path / "folder",
+    ]
+
+
+def test_file_index_lists_every_directory_once(evidence_path: Path, mocker):
+    scandir = mocker.patch(
+        "yaku.sharepoint_evaluator.evaluation.os.scandir", side_effect=os.scandir
+    )
+    index = FileIndex()
+
+    index.glob(evidence_path / "*.docx")
+    index.glob(evidence_path / "a.docx")
+    index.glob(evidence_path / "folder" / "*")
+
+    assert scandir.call_count == 2
+
+
+def test_rule_evaluator_loads_properties_once_per_file(evidence_path: Path, mocker):
+    load_properties = mocker.spy(PropertiesReader, "load_properties")
+    file_rules = [
+        FileRules(evidence_path / "*.docx", [Rule("Status", "equals", "Final")]),
+        FileRules(
+            evidence_path / "a.docx",
+            [Rule("Status", "equals", "Draft"), Rule("Size", "is-less-than", 10)],
+        ),
+    ]
+    index = FileIndex()
+    matched_files = [without_metadata_files(index.glob(f.file)) for f in file_rules]
+
+    outcomes = RuleEvaluator(
+        file_rules, functools.partial(_create_reader, evidence_path)
+    ).evaluate(matched_files)
+
+    assert load_properties.call_count == 2
+    assert outcomes == {
+        (evidence_path / "a.docx", (0, 0)): RuleCheck("Final", True),
+        (evidence_path / "b.docx", (0, 0)): RuleCheck("Draft", False),
+        (evidence_path / "a.docx", (1, 0)): RuleCheck("Final", False),
+        (evidence_path / "a.docx", (1, 1)): RuleCheck(5, True),
+    }
+
+
+def test_rule_evaluator_returns_errors_as_outcomes(evidence_path: Path):
+    file_rules = [
+        FileRules(
+            evidence_path / "a.docx",
+            [Rule("Unknown", "equals", "x"), Rule("Status", "equals", "Final")],
+        )
+    ]
+
+    outcomes = RuleEvaluator(
+        file_rules, functools.partial(_create_reader, evidence_path)
+    ).evaluate([[evidence_path / "a.docx"]])
+
+    assert isinstance(
+        outcomes[(evidence_path / "a.docx", (0, 0))], AutopilotConfigurationError
+    )
+    assert outcomes[(evidence_path / "a.docx", (0, 1))] == RuleCheck("Final", True)
+
+
+def test_rule_evaluator_gives_same_outcomes_in_parallel(evidence_path: Path, monkeypatch):
+    file_rules = [
+        FileRules(evidence_path / "*.docx", [Rule("Status", "equals", "Final")]),
+        FileRules(evidence_path / "folder" / "*", [Rule("Unknown", "equals", "x")]),
+    ]
+    index = FileIndex()
+    matched_files = [without_metadata_files(index.glob(f.file)) for f in file_rules]
+    create_reader = functools.partial(_create_reader, evidence_path)
+
+    sequential_outcomes = RuleEvaluator(file_rules, create_reader, max_workers=1).evaluate(
+        matched_files
+    )
+    monkeypatch.setattr(RuleEvaluator, "min_files_for_parallel_evaluation", 1)
+    parallel_outcomes = RuleEvaluator(file_rules, create_reader, max_workers=2).evaluate(
+        matched_files
+    )
+
+    assert list(parallel_outcomes) == list(sequential_outcomes)
+    for key, outcome in sequential_outcomes.items():
+        if isinstance(outcome, Exception):
+            assert str(parallel_outcomes[key]) == str(outcome)
+        else:
+            assert parallel_outcomes[key] == outcome
@@ -5,9 +5,17 @@
 from pathlib import Path
 
 import pytest
+from yaku.autopilot_utils import checks
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
 from yaku.sharepoint_evaluator.config import ConfigFile
-from yaku.sharepoint_evaluator.rules import Rule, read_file_rules
+from yaku.sharepoint_evaluator.rules import (
+    FileRules,
+    Rule,
+    RuleCheck,
+    RulePlan,
+    read_file_rules,
+)
+from yaku.sharepoint_evaluator.utils import PropertiesReader
 
 DATA_PATH = Path(__file__).parent / "data"
 
@@ -150,3 +158,87 @@ def test_read_file_rules(tmp_path: Path):
 )
 def test_nice_representation_of_rules(operator, phrase):
     assert Rule("A", operator, "B").nice() == f"Property `A` {phrase} `B`"
+
+
+def test_rule_matches_values_like_check():
+    rule = Rule("Size", "is-larger-than", 10)
+    assert rule.matches("11")
+    assert not rule.matches("10")
+
+
+def test_rule_with_invalid_value_fails_on_first_use():
+    rule = Rule("Size", "is-larger-than", "B")
+    with pytest.raises(AutopilotConfigurationError, match="Could not convert `B`"):
+        rule.matches("11")
+
+
+def test_rule_plan_shares_checks_of_identical_rules(mocker):
+    compile_check = mocker.patch(
+        "yaku.sharepoint_evaluator.rules.compile_check", side_effect=checks.compile_check
+    )
+    file_rules = [
+        FileRules(Path("a"), [Rule("Size", "is-larger-than", 10), Rule("Title", "equals", 1)]),
+        FileRules(
+            Path("b"), [Rule("Size", "is-larger-than", 10), Rule("Title", "equals", 1.0)]
+        ),
+    ]
+
+    plan = RulePlan(file_rules)
+
+    assert plan.number_of_checks == 3
+    assert compile_check.call_count == 3
+
+
+def test_rule_plan_reads_every_property_once_per_file(mocker):
+    reader = PropertiesReader(DATA_PATH / "__custom_property_definitions__.json")
+    get_property = mocker.spy(reader, "get_property")
+    file_rules = [
+        FileRules(Path("a"), [Rule("Size", "is-larger-than", 10), Rule("Size", "less", 20)]),
+        FileRules(
+            Path("b"), [Rule("Size", "is-larger-than", 10), Rule("Title", "equals", "x")]
+        ),
+    ]
+    plan = RulePlan(file_rules)
+
+    outcomes = plan.check(
+        reader, {"Size": 15, "Title": "y"}, Path("file"), [(0, 0), (0, 1), (1, 0), (1, 1)]
+    )
+
+    assert outcomes == [
+        RuleCheck(15, True),
+        RuleCheck(15, True),
+        RuleCheck(15, True),
+        RuleCheck("y", False),
+    ]
+    assert [c.args[1] for c in get_property.call_args_list] == ["Size", "Title"]
+
+
+def test_rule_plan_returns_errors_as_outcomes():
+    reader = PropertiesReader(DATA_PATH / "__custom_property_definitions__.json")
+    file_rules = [
+        FileRules(
+            Path("a"),
+            [
+                Rule("Size", "is-larger-than", "B"),
+                Rule("Unknown", "equals", "x"),
+                Rule("Title", "is-larger-than", 1),
+                Rule("Size", "equals", 5),
+            ],
+        )
+    ]
+    plan = RulePlan(file_rules)
+
+    outcomes = plan.check(
+        reader, {"Size": 5, "Title": "y"}, Path("file"), [(0, 0), (0, 1), (0, 2), (0, 3)]
+    )
+
+    assert "Could not convert `B`" in str(outcomes[0])
+    assert "Could not get property `Unknown`" in str(outcomes[1])
+    assert "Could not convert `y`" in str(outcomes[2])
+    assert outcomes[3] == RuleCheck(5, True)
+
+
+def test_nice_representation_is_rendered_once():
+    rule = Rule("A", "equals", "B")
+
+    assert rule.nice() is rule.nice()
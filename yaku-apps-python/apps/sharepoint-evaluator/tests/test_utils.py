@@ -2,11 +2,16 @@
 #
 # SPDX-License-Identifier: MIT
 
+import json
 from pathlib import Path
 
 import pytest
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
-from yaku.sharepoint_evaluator.utils import PropertiesReader
+from yaku.sharepoint_evaluator.utils import (
+    PROPERTIES_FILE_SUFFIX,
+    PropertiesReader,
+    PropertiesStore,
+)
 
 DATA_PATH = Path(__file__).parent / "data"
 
@@ -51,3 +56,96 @@ def test_get_file_custom_property_with_invalid_property_value(reader: Properties
     reader.add_list_to_property_mapping("Some Status", "SomeStatusId")
     assert reader.get_file_property(DATA_PATH / "ProcessStatus.docx", "SomeStatusId") == ""
     reader.get_file_property(DATA_PATH / "ProcessStatus.docx", "Some Status")
+
+
+def _write_file_with_properties(path: Path, properties: dict) -> Path:
+    path.write_bytes(b"")
+    properties_file = path.with_name(path.name + PROPERTIES_FILE_SUFFIX)
+    properties_file.write_text(json.dumps(properties))
+    return properties_file
+
+
+def test_get_file_properties_returns_only_requested_properties(reader: PropertiesReader):
+    reader.add_list_to_property_mapping("RevisionStatus", "RevisionStatusId")
+
+    assert reader.get_file_properties(
+        DATA_PATH / "ProcessStatus.docx", ["CSC", "RevisionStatus"]
+    ) == {"CSC": "1", "RevisionStatus": "Draft"}
+
+
+def test_get_file_property_from_properties_store(tmp_path: Path):
+    properties_file = _write_file_with_properties(tmp_path / "a.docx", {"Title": "file"})
+    store = PropertiesStore(tmp_path / PropertiesStore.filename)
+    with store.writing():
+        store.put(tmp_path / "a.docx", properties_file, json.dumps({"Title": "store"}))
+
+    reader = PropertiesReader(
+        tmp_path / "__custom_property_definitions__.json",
+        properties_store=tmp_path / PropertiesStore.filename,
+    )
+
+    assert reader.get_file_property(tmp_path / "a.docx", "Title") == "store"
+
+
+def test_get_file_property_falls_back_to_changed_properties_file(tmp_path: Path):
+    properties_file = _write_file_with_properties(tmp_path / "a.docx", {"Title": "old"})
+    store = PropertiesStore(tmp_path / PropertiesStore.filename)
+    with store.writing():
+        store.put(tmp_path / "a.docx", properties_file, json.dumps({"Title": "old"}))
+    properties_file.write_text(json.dumps({"Title": "changed"}))
+
+    reader = PropertiesReader(
+        tmp_path / "__custom_property_definitions__.json",
+        properties_store=tmp_path / PropertiesStore.filename,
+    )
+
+    assert reader.get_file_property(tmp_path / "a.docx", "Title") == "changed"
+
+
+def test_get_file_property_without_properties_store(tmp_path: Path):
+    _write_file_with_properties(tmp_path / "a.docx", {"Title": "file"})
+
+    reader = PropertiesReader(
+        tmp_path / "__custom_property_definitions__.json",
+        properties_store=tmp_path / PropertiesStore.filename,
+    )
+
+    assert reader.get_file_property(tmp_path / "a.docx", "Title") == "file"
+    assert not (tmp_path / PropertiesStore.filename).exists()
+
+
+def test_get_file_property_with_invalid_properties_store(tmp_path: Path):
+    _write_file_with_properties(tmp_path / "a.docx", {"Title": "file"})
+    (tmp_path / PropertiesStore.filename).write_text("not a database")
+
+    reader = PropertiesReader(
+        tmp_path / "__custom_property_definitions__.json",
+        properties_store=tmp_path / PropertiesStore.filename,
+    )
+
+    assert reader.get_file_property(tmp_path / "a.docx", "Title") == "file"
+
+
+def test_properties_cache_is_bounded(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(PropertiesReader, "cache_size", 2)
+    for name in ["a", "b", "c"]:
+        _write_file_with_properties(tmp_path / name, {"Title": name})
+    reader = PropertiesReader(tmp_path / "__custom_property_definitions__.json")
+
+    for name in ["a", "b", "c"]:
+        assert reader.get_file_property(tmp_path / name, "Title") == name
+
+    assert len(reader._cache) == 2
+
+
+def test_non_existing_file_error_lists_limited_number_of_files(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(PropertiesReader, "max_listed_alternatives", 3)
+    for i in range(5):
+        (tmp_path / f"file-{i}").write_bytes(b"")
+    reader = PropertiesReader(tmp_path / "__custom_property_definitions__.json")
+
+    with pytest.raises(AutopilotConfigurationError) as e:
+        reader.get_file_property(tmp_path / "non-existing-file", "Title")
+
+    assert str(e.value).count("- ") == 4
+    assert str(e.value).endswith("- ...\n")
@@ -0,0 +1,149 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, ItemsView, Optional, Set, TextIO
+
+from loguru import logger
+from yaku.sharepoint_fetcher.downloads import TEMPORARY_FILE_PATTERN, write_atomically
+from yaku.sharepoint_fetcher.manifest import ManifestEntry, is_complete
+
+
+class Checkpoint:
+    """
+    Journal of the folders and files which a folder download has completed.
+
+    While a folder is downloaded, the journal is kept in the destination path,
+    one JSON object per line: a header with the `run_key`, which identifies
+    the fetched SharePoint folder and the filters, and then one line for every
+    completed file (with its manifest entry, see `ManifestEntry`) and for
+    every completed folder, i.e. a folder whose files and subfolders are all
+    done. Every line is flushed when it is written, so if the fetcher dies,
+    the journal still contains everything up to the last completed file. An
+    incomplete last line is ignored.
+
+    If the journal of an interrupted run with the same `run_key` exists, the
+    fetchers skip completed folders without listing them and completed files
+    without requesting their properties, as long as their local copies are
+    complete.
+    Files whose local copies are missing or only partially written are
+    fetched again. The journal is removed when the download completes.
+    """
+
+    filename = "__checkpoint__.jsonl"
+
+    version = 1
+
+    def __init__(self, destination_path: Path, metadata_file_suffix: str, run_key: str):
+        self._destination_path = destination_path
+        self._metadata_file_suffix = metadata_file_suffix
+        self._run_key = run_key
+        self._files: Dict[str, ManifestEntry] = {}
+        self._folders: Set[str] = set()
+        self._journal: Optional[TextIO] = None
+        self.was_interrupted = self.path.exists()
+        if self.was_interrupted:
+            self._load()
+
+    @property
+    def path(self) -> Path:
+        return self._destination_path / self.filename
+
+    def _header(self) -> Dict[str, object]:
+        return {"version": self.version, "run_key": self._run_key}
+
+    def _load(self):
+        files: Dict[str, ManifestEntry] = {}
+        folders: Set[str] = set()
+        try:
+            lines = self.path.read_text().splitlines()
+            if not lines or json.loads(lines[0]) != self._header():
+                logger.warning(
+                    "Not resuming from checkpoint `{}`, because it belongs to a different "
+                    "SharePoint folder, filter config or fetcher version",
+                    self.path,
+                )
+                return
+            for line in lines[1:]:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # the fetcher died while writing this line
+                    continue
+                if "folder" in record:
+                    folders.add(record["folder"])
+                else:
+                    files[record["file"]] = ManifestEntry(**record["entry"])
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            logger.warning(
+                "Ignoring invalid checkpoint `{}`, all files will be fetched again: {}",
+                self.path,
+                e,
+            )
+            return
+        self._files = files
+        self._folders = folders
+        logger.info(
+            "Resuming interrupted run with {} completed folders and {} completed files",
+            len(folders),
+            len(files),
+        )
+
+    def open(self):
+        """
+        Start writing the journal.
+
+        The journal is rewritten with the loaded entries first, which also
+        drops an incomplete last line. Temporary files which were left
+        behind by an interrupted run are removed.
+        """
+        if self.was_interrupted:
+            for temporary_path in self._destination_path.rglob(TEMPORARY_FILE_PATTERN):
+                logger.debug("Removing temporary file `{}`", temporary_path)
+                temporary_path.unlink(missing_ok=True)
+        lines = [self._header()]
+        lines.extend({"folder": folder} for folder in sorted(self._folders))
+        lines.extend(
+            {"file": key, "entry": asdict(entry)} for key, entry in self._files.items()
+        )
+        write_atomically(self.path, "".join(json.dumps(line) + "\n" for line in lines))
+        self._journal = open(self.path, "a", encoding="utf-8")
+
+    def close(self, completed: bool):
+        """Stop writing the journal and remove it if the download is `completed`."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if completed:
+            self.path.unlink(missing_ok=True)
+
+    def _append(self, record: Dict[str, object]):
+        assert self._journal is not None, "The checkpoint must be opened first!"
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+
+    def files(self) -> ItemsView[str, ManifestEntry]:
+        return self._files.items()
+
+    def completed_file(self, key: str, with_contents: bool) -> Optional[ManifestEntry]:
+        """Return the entry of a completed file if its local copy is complete."""
+        entry = self._files.get(key)
+        if entry is None or not is_complete(
+            self._destination_path, self._metadata_file_suffix, entry, with_contents
+        ):
+            return None
+        return entry
+
+    def completed_folder(self, remote_path: str) -> bool:
+        return remote_path in self._folders
+
+    def record_file(self, key: str, entry: ManifestEntry):
+        self._files[key] = entry
+        self._append({"file": key, "entry": asdict(entry)})
+
+    def record_folder(self, remote_path: str):
+        self._folders.add(remote_path)
+        self._append({"folder": remote_path})
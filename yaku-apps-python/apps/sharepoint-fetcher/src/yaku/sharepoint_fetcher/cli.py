@@ -8,7 +8,6 @@ import warnings
 from typing import Any, Dict, Optional
 
 import click
-import requests
 from loguru import logger
 from yaku.autopilot_utils.cli_base import make_autopilot_app, read_version_from_package
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
@@ -16,7 +15,6 @@ from yaku.autopilot_utils.errors import AutopilotConfigurationError
 from .config import ConfigFile, FilterConfigFile, FilterConfigFileContent, Settings
 from .config_file_utils import merge_cli_and_file_params
 from .selectors import parse_filter_config_file_data
-from .sharepoint_factory import SharePointFetcherFactory
 from .utils import PropertiesReader
 
 warnings.filterwarnings("ignore")
@@ -141,6 +139,26 @@ class CLI:
             help="Path to the filter config file",
         ),
         click.option("--config-file", required=False, help="Path to the config file"),
+        click.option(
+            "--max-parallel-requests",
+            required=False,
+            help="Maximum number of requests sent at the same time when downloading a folder (on-premise only)",
+        ),
+        click.option(
+            "--max-requests-per-second",
+            required=False,
+            help="Maximum number of requests sent to SharePoint per second",
+        ),
+        click.option(
+            "--incremental",
+            required=False,
+            help="Only fetch files which changed since the last run into the same destination path",
+        ),
+        click.option(
+            "--resume",
+            required=False,
+            help="Keep a checkpoint and skip the folders and files which an interrupted run into the same destination path already fetched (the interrupted run must also have been started with --resume)",
+        ),
     ]
 
     @staticmethod
@@ -161,6 +179,10 @@ class CLI:
         download_properties_only: bool,
         filter_config_file: str,
         config_file: str,
+        max_parallel_requests: str,
+        max_requests_per_second: str,
+        incremental: bool,
+        resume: bool,
     ):
         logger.info("Configuring SharePoint Fetcher")
         extracted_fields: Dict[str, Any] = {}
@@ -188,6 +210,10 @@ class CLI:
             "download_properties_only": download_properties_only,
             "filter_config_file": filter_config_file,
             "config_file": config_file,
+            "max_parallel_requests": max_parallel_requests,
+            "max_requests_per_second": max_requests_per_second,
+            "incremental": incremental,
+            "resume": resume,
         }
         merged_params = merge_cli_and_file_params(cli_arguments, extracted_fields)
         settings = Settings(
@@ -205,6 +231,10 @@ class CLI:
             custom_properties=merged_params.get("custom_properties"),
             download_properties_only=merged_params.get("download_properties_only"),
             sharepoint_file=merged_params.get("file"),
+            max_parallel_requests=merged_params.get("max_parallel_requests"),
+            max_requests_per_second=merged_params.get("max_requests_per_second"),
+            incremental=merged_params.get("incremental"),
+            resume=merged_params.get("resume"),
         )
         parsed_filter_config_file = FilterConfigFile(
             file_path=merged_params.get("filter_config_file")
@@ -214,6 +244,12 @@ class CLI:
 
 def trigger_fetcher(filter_config_file: FilterConfigFile, settings: Settings):
     """Triggers the fetching action."""
+    # requests and the SharePoint clients take long to import, so they are only
+    # imported when fetching and not already for `--version` or usage errors
+    import requests
+
+    from .sharepoint_factory import SharePointFetcherFactory
+
     filter_config_file_data = None
     if filter_config_file and filter_config_file.content:
         filter_config_file_data = parse_filter_config_file_data(filter_config_file.content)
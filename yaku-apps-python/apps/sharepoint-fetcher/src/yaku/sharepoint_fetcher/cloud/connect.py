@@ -2,16 +2,22 @@
 #
 # SPDX-License-Identifier: MIT
 
-from typing import Any, Dict, List, Tuple
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 from urllib.parse import quote, urlparse
 
 import requests
+from loguru import logger
 from yaku.autopilot_utils.errors import (
     AutopilotConfigurationError,
     AutopilotError,
     AutopilotFileNotFoundError,
 )
+from yaku.autopilot_utils.throttling import ThrottledTransport
+from yaku.sharepoint_fetcher.downloads import DownloadedFile, download_to_temporary_file
 
+GRAPH_API = "https://graph.microsoft.com/v1.0"
 RESOURCE = "https://graph.microsoft.com/"
 GRANT_TYPE = "client_credentials"
 SCOPE = "Sites.Selected"
@@ -31,21 +37,82 @@ class Connect:
 
     Provide functionality for both default root SharePoint documents at "Shared Documents"
     and also custom document libraries.
+
+    The ids of the site and of the document libraries (drives) are only
+    requested once, and the ids of the last `folder_id_cache_size` folders
+    are kept, so that they don't need to be requested again for every file.
+
+    Folder listings follow all result pages and only request the drive item
+    properties in `children_properties`. The properties of many files can be
+    requested with few JSON batch requests (see `get_files_properties`).
+
+    The number of requests sent to the servers is counted in `request_count`.
+    Requests are sent through a :py:class:`ThrottledTransport`, which keeps
+    at most `max_requests_per_second` requests per second (if given) and
+    retries requests which were throttled by the server or failed with a
+    connection error.
+
+    Downloaded files are stored in temporary files in `download_directory`
+    (or the default temporary directory).
     """
 
-    def __init__(self, sharepoint_site, tenant_id, client_id, client_secret, force_ip=None):
+    folder_id_cache_size = 1024
+
+    # drive item properties which are requested when listing the items of a folder
+    children_properties = "name,id,file,folder,size,eTag,lastModifiedDateTime"
+
+    children_page_size = 999
+
+    # maximum number of requests in a JSON batch request
+    batch_size = 20
+
+    batch_retries = 3
+
+    def __init__(
+        self,
+        sharepoint_site,
+        tenant_id,
+        client_id,
+        client_secret,
+        force_ip=None,
+        download_directory: Optional[Path] = None,
+        max_requests_per_second: Optional[float] = None,
+    ):
         if sharepoint_site.endswith("/"):
             sharepoint_site = sharepoint_site[:-1]
         self._sharepoint_site = sharepoint_site
 
+        self._transport = ThrottledTransport(
+            requests_per_second=max_requests_per_second,
+            retry_exceptions=(requests.ConnectionError,),
+        )
         session = requests.Session()
         self._force_ip = force_ip
+        self.download_directory = download_directory
         session.headers = self._sharepoint_cloud_instance_connect(
             client_id, tenant_id, client_secret
         )
         session.verify = True
         session.auth = None
         self._session = session
+        self.request_count = 0
+        self._site_id: Optional[str] = None
+        self._drive_ids: Dict[str, str] = {}
+        # folder ids keyed by (library_name, folder), least recently used first
+        self._folder_ids: OrderedDict[Tuple[Optional[str], str], str] = OrderedDict()
+        # download URLs and sizes which were returned together with the file
+        # properties, keyed by (relative_url, file_name, library_name)
+        self._downloads: Dict[Tuple[str, str, Optional[str]], Tuple[str, int]] = {}
+
+    def _send(self, send: Callable[[], requests.Response]) -> requests.Response:
+        def counted_send() -> requests.Response:
+            self.request_count += 1
+            return send()
+
+        return self._transport.request(counted_send)
+
+    def _get(self, url: str) -> requests.Response:
+        return self._send(lambda: self._session.get(url))
 
     def _sharepoint_cloud_instance_connect(self, client_id, tenant_id, client_secret):
         """
@@ -85,14 +152,17 @@ class Connect:
         It requires an authorized header. For more information,
         check the official Microsoft Graph Api Documentation.
         """
+        if self._site_id is not None:
+            return self._site_id
         host, site_name = self._exchange_url_by_domain_and_site_name(self._sharepoint_site)
-        response = self._session.get(
+        response = self._get(
             f"https://graph.microsoft.com/v1.0/sites/{host}:/sites/{site_name}",
         )
         response.raise_for_status()
         json_data = response.json()
         response_id = json_data["id"].split(",")
         site_id = response_id[1]
+        self._site_id = site_id
         return site_id
 
     def get_drive_id(self, headers, library_name):
@@ -102,9 +172,11 @@ class Connect:
         For more information about document libraries on
         SharePoint, check the official Microsoft Graph Api Documentation.
         """
+        if library_name in self._drive_ids:
+            return self._drive_ids[library_name]
         site_id = self.get_site_id(self._session.headers)
         url = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives"
-        response = self._session.get(url)  # nosec B113
+        response = self._get(url)  # nosec B113
         drive_id = None
         if response.status_code == 200:
             drives = response.json().get("value", [])
@@ -116,6 +188,8 @@ class Connect:
                     raise AutopilotFileNotFoundError(
                         f"SharePoint document library {library_name} does not exist"
                     )
+        if drive_id is not None:
+            self._drive_ids[library_name] = drive_id
         return drive_id
 
     def _exchange_hostname_by_forced_ip_address(self, url: str) -> Tuple[str, str]:
@@ -147,7 +221,7 @@ class Connect:
             drive_id = self.get_drive_id(self._session.headers, library_name)
             api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root:/{encoded_path}"
 
-        response = self._session.get(api)
+        response = self._get(api)
         if response.status_code == 200:
             data = response.json()
             if not data.get("name"):
@@ -185,6 +259,10 @@ class Connect:
 
         It requires an authorized header and the site id.
         """
+        cache_key = (library_name, folder)
+        if cache_key in self._folder_ids:
+            self._folder_ids.move_to_end(cache_key)
+            return self._folder_ids[cache_key]
         site_id = self.get_site_id(self._session.headers)
         if library_name is None:
             api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{folder}"
@@ -192,142 +270,192 @@ class Connect:
             drive_id = self.get_drive_id(self._session.headers, library_name)
             api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root:/{folder}"
 
-        response = self._session.get(api)
+        response = self._get(api)
         response.raise_for_status()
         response_data = response.json()
         id = response_data["id"]
+        self._folder_ids[cache_key] = id
+        if len(self._folder_ids) > self.folder_id_cache_size:
+            self._folder_ids.popitem(last=False)
         return id
 
-    def get_folders(self, relative_url, library_name) -> List[str]:
+    def _get_paged_items(self, url: str) -> Iterator[Dict[str, Any]]:
         """
-        Get JSON structure of subfolders of given folder.
+        Yield the items of a paged Graph collection.
 
-        It requires the site id and the folder id for a given SharePoint
-        relative url.
+        The pages are requested one after another while the items are
+        consumed, following the `@odata.nextLink` of every page.
+        """
+        next_url: Optional[str] = url
+        while next_url is not None:
+            response = self._get(next_url)
+            response.raise_for_status()
+            response_data = response.json()
+            yield from response_data["value"]
+            next_url = response_data.get("@odata.nextLink")
+
+    def get_children(
+        self, relative_url: Optional[str], library_name
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the files and subfolders of the given folder.
+
+        If `relative_url` is empty, the items in the root of the document
+        library are returned. Each drive item only contains the properties
+        in `children_properties`, i.e. files have a `file` property and
+        folders have a `folder` property. The items are requested page by
+        page with up to `children_page_size` items per page.
 
         For info on `relative_url`, see class docs.
         """
         site_id = self.get_site_id(self._session.headers)
-        folder_id = self.get_folder_id(relative_url, library_name)
+        if library_name == "Shared Documents":
+            library_name = None
         if library_name is None:
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/items/{folder_id}/children?$filter=folder ne null"
+            drive_api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive"
         else:
             drive_id = self.get_drive_id(self._session.headers, library_name)
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/items/{folder_id}/children?$filter=folder ne null"
+            drive_api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}"
+        if relative_url:
+            folder_id = self.get_folder_id(relative_url, library_name)
+            api = f"{drive_api}/items/{folder_id}/children"
+        else:
+            api = f"{drive_api}/root/children"
+        return self._get_paged_items(
+            f"{api}?$select={self.children_properties}&$top={self.children_page_size}"
+        )
 
-        response = self._session.get(api)
-        response.raise_for_status()
-        response_data = response.json()
-        subfolders = []
-        subfolders_path = []
-        for subfolder in response_data["value"]:
-            subfolder_name = subfolder["name"]
-            subfolder_path = f"{relative_url}/{subfolder_name}"
-            subfolders_path.append(subfolder_path)
-            subfolders.append(subfolder_name)
-        return subfolders_path
+    def get_folders(self, relative_url, library_name) -> List[str]:
+        """
+        Get paths of the subfolders of given folder.
+
+        For info on `relative_url`, see class docs.
+        """
+        return [
+            f"{relative_url}/{item['name']}"
+            for item in self.get_children(relative_url, library_name)
+            if "folder" in item
+        ]
 
     def get_folders_root(self, library_name) -> List[str]:
         """
-        Get JSON structure of subfolders for the root.
+        Get names of the subfolders for the root.
 
         The root level of a cloud SharePoint site
         is "Shared Documents".
         """
-        site_id = self.get_site_id(self._session.headers)
-        if library_name is None:
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root/children?$filter=folder ne null"
-        else:
-            drive_id = self.get_drive_id(self._session.headers, library_name)
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root/children?$filter=folder ne null"
-
-        response = self._session.get(api)
-        response.raise_for_status()
-        response_data = response.json()
-        subfolders_path = []
-        for subfolder in response_data["value"]:
-            subfolder_name = subfolder["name"]
-            subfolders_path.append(subfolder_name)
-        return subfolders_path
+        return [
+            item["name"] for item in self.get_children(None, library_name) if "folder" in item
+        ]
 
     def get_files(self, relative_url, library_name) -> List[str]:
         """
-        Get JSON structure of files in the given folder.
+        Get names of the files in the given folder.
 
         For info on `relative_url`, see class docs.
         """
-        site_id = self.get_site_id(self._session.headers)
-        folder_id = self.get_folder_id(relative_url, library_name)
-        if library_name is None:
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/items/{folder_id}/children"
-        else:
-            drive_id = self.get_drive_id(self._session.headers, library_name)
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/items/{folder_id}/children"
-
-        response = self._session.get(api)
-        response.raise_for_status()
-        response_data = response.json()
-
-        files = []
-        for file in response_data["value"]:
-            if file.get("file"):
-                file_name = file["name"]
-                files.append(file_name)
-
-        return files
+        return [
+            item["name"]
+            for item in self.get_children(relative_url, library_name)
+            if "file" in item
+        ]
 
     def get_files_root(self, library_name) -> List[str]:
         """
-        Get JSON structure of files in the root folder.
+        Get names of the files in the root folder.
 
         The root folder is "Shared Documents" for the default document.
         """
+        return [
+            item["name"] for item in self.get_children(None, library_name) if "file" in item
+        ]
+
+    def get_changed_item_ids(
+        self, library_name, delta_link: Optional[str]
+    ) -> Tuple[Optional[Set[str]], str]:
+        """
+        Get the ids of all drive items which changed since `delta_link` was returned.
+
+        This uses a delta query on the document library. Returns the ids of
+        the changed (including deleted) items together with the delta link
+        for the next call. If no `delta_link` is given or the server no
+        longer accepts it, the ids are None and all items must be treated
+        as changed.
+        """
         site_id = self.get_site_id(self._session.headers)
-        if library_name is None or library_name == "Shared Documents":
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root/children"
+        if library_name is None:
+            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root/delta"
         else:
             drive_id = self.get_drive_id(self._session.headers, library_name)
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root/children"
-
-        response = self._session.get(api)
-        response.raise_for_status()
-        response_data = response.json()
-
-        files = []
-        for file in response_data["value"]:
-            if file.get("file"):
-                file_name = file["name"]
-                files.append(file_name)
+            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root/delta"
+        latest_api = api + "?token=latest"
+
+        changed_ids: Optional[Set[str]] = None
+        url = latest_api
+        if delta_link is not None:
+            changed_ids = set()
+            url = delta_link
+        while True:
+            response = self._get(url)
+            if response.status_code == 410 and changed_ids is not None:
+                # the delta link expired, so all items must be checked again
+                changed_ids = None
+                url = latest_api
+                continue
+            response.raise_for_status()
+            response_data = response.json()
+            if changed_ids is not None:
+                changed_ids.update(item["id"] for item in response_data.get("value", []))
+            if "@odata.nextLink" in response_data:
+                url = response_data["@odata.nextLink"]
+                continue
+            return changed_ids, response_data["@odata.deltaLink"]
+
+    def _file_item_api(self, relative_url: str, file_name: str, library_name) -> str:
+        """Return the Graph API path of a file's drive item, relative to the API version."""
+        encoded_file_name = quote(file_name)
+        site_id = self.get_site_id(self._session.headers)
+        if library_name is None:
+            return f"/sites/{site_id}/drive/root:/{relative_url}/{encoded_file_name}?$expand=listItem"
+        drive_id = self.get_drive_id(self._session.headers, library_name)
+        return f"/sites/{site_id}/drives/{drive_id}/root:/{relative_url}/{encoded_file_name}?$expand=listItem"
 
-        return files
+    def _remember_download(
+        self, relative_url: str, file_name: str, library_name, properties: Dict[str, Any]
+    ):
+        if "@microsoft.graph.downloadUrl" in properties and "size" in properties:
+            self._downloads[(relative_url, file_name, library_name)] = (
+                properties["@microsoft.graph.downloadUrl"],
+                properties["size"],
+            )
 
-    def get_file_object(self, relative_url: str, file_name: str, library_name) -> bytes:
+    def get_file_object(
+        self, relative_url: str, file_name: str, library_name
+    ) -> DownloadedFile:
         """
         Get file from given relative path and under the given file name.
 
+        The file is streamed into a temporary file (see `download_to_temporary_file`).
+        If the properties of the file were just fetched, their download URL is
+        used, otherwise the download URL is requested first.
+
         For info on `relative_url`, see class docs.
         """
-        encoded_file_name = quote(file_name)
-        site_id = self.get_site_id(self._session.headers)
-        if library_name is None:
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{relative_url}/{encoded_file_name}?$expand=listItem"
-        else:
-            drive_id = self.get_drive_id(self._session.headers, library_name)
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root:/{relative_url}/{encoded_file_name}?$expand=listItem"
-
-        response = self._session.get(api)
-        response.raise_for_status()
-        response_data = response.json()
-        download_url = response_data["@microsoft.graph.downloadUrl"]
-        actual_size = response_data["size"]
-        download_file = requests.get(download_url)  # nosec B113
-        download_file_size = len(download_file.content)
-        if actual_size != download_file_size:
-            raise AutopilotError(
-                f"The downloaded file does not have the proper size: expected {actual_size} bytes, got {download_file_size} bytes! One reason could be "
-                + "that you are behind a proxy/restricted firewall!"
+        download = self._downloads.pop((relative_url, file_name, library_name), None)
+        if download is None:
+            response = self._get(
+                GRAPH_API + self._file_item_api(relative_url, file_name, library_name)
             )
-        return download_file.content
+            response.raise_for_status()
+            response_data = response.json()
+            download = (response_data["@microsoft.graph.downloadUrl"], response_data["size"])
+        download_url, expected_size = download
+        download_file = self._send(
+            lambda: requests.get(download_url, stream=True)  # nosec B113
+        )
+        return download_to_temporary_file(
+            download_file, expected_size, self.download_directory
+        )
 
     def get_file_properties(
         self, relative_url: str, file_name: str, library_name
@@ -339,15 +467,76 @@ class Connect:
 
         For info on `relative_url`, see class docs.
         """
-        encoded_file_name = quote(file_name)
-        site_id = self.get_site_id(self._session.headers)
-        if library_name is None:
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root:/{relative_url}/{encoded_file_name}?$expand=listItem"
-        else:
-            drive_id = self.get_drive_id(self._session.headers, library_name)
-            api = f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root:/{relative_url}/{encoded_file_name}?$expand=listItem"
-
-        response = self._session.get(api)
+        response = self._get(
+            GRAPH_API + self._file_item_api(relative_url, file_name, library_name)
+        )
         response.raise_for_status()
         json_response = response.json()
+        self._remember_download(relative_url, file_name, library_name, json_response)
         return json_response  # type: ignore
+
+    def get_files_properties(
+        self, relative_url: str, file_names: Sequence[str], library_name
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get properties for several files in the same folder with JSON batch requests.
+
+        Up to `batch_size` files are requested with one request. Files whose
+        requests were throttled are requested again after the time given by
+        the server, at most `batch_retries` times. Returns the properties by
+        file name; files whose properties couldn't be fetched are left out,
+        so that they can be requested one by one with `get_file_properties`.
+
+        For info on `relative_url`, see class docs.
+        """
+        pending = list(file_names)
+        result: Dict[str, Dict[str, Any]] = {}
+        retries = 0
+        while pending:
+            batch, pending = pending[: self.batch_size], pending[self.batch_size :]
+            requests_by_id = {
+                str(index): file_name for index, file_name in enumerate(batch, start=1)
+            }
+            batch_request = {
+                "requests": [
+                    {
+                        "id": request_id,
+                        "method": "GET",
+                        "url": self._file_item_api(relative_url, file_name, library_name),
+                    }
+                    for request_id, file_name in requests_by_id.items()
+                ]
+            }
+            # the batch only contains GET requests, so it can be sent again
+            response = self._send(
+                lambda: self._session.post(GRAPH_API + "/$batch", json=batch_request)
+            )
+            response.raise_for_status()
+            throttled = []
+            retry_after = 0.0
+            for item in response.json()["responses"]:
+                file_name = requests_by_id[item["id"]]
+                if item["status"] == 429:
+                    throttled.append(file_name)
+                    headers = {k.lower(): v for k, v in (item.get("headers") or {}).items()}
+                    retry_after = max(
+                        retry_after,
+                        self._transport.retry_delay(retries, headers.get("retry-after")),
+                    )
+                elif 200 <= item["status"] < 300:
+                    result[file_name] = item["body"]
+                    self._remember_download(
+                        relative_url, file_name, library_name, item["body"]
+                    )
+            if throttled:
+                self._transport.limiter.on_throttled()
+            if throttled and retries < self.batch_retries:
+                retries += 1
+                logger.debug(
+                    "{} requests were throttled, retrying after {:.1f} seconds",
+                    len(throttled),
+                    retry_after,
+                )
+                self._transport.wait(retry_after)
+                pending = throttled + pending
+        return result
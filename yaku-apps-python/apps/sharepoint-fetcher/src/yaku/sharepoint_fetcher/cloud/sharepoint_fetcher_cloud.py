@@ -3,14 +3,15 @@
 # SPDX-License-Identifier: MIT
 
 import itertools
-import json
 import os
+from dataclasses import replace
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from loguru import logger
 from yaku.autopilot_utils.errors import AutopilotConfigurationError, AutopilotError
+from yaku.sharepoint_fetcher.manifest import ManifestEntry
 from yaku.sharepoint_fetcher.sharepoint_fetcher import SharepointFetcher
 
 from ..selectors import FilesSelectors
@@ -34,9 +35,21 @@ class SharepointFetcherCloud(SharepointFetcher):
 
     It is also possible to download only the property files and no file contents.
     This can be enabled by providing `download_properties_only=True`.
-    """
 
-    metadata_file_suffix = ".__properties__.json"
+    With `incremental=True`, the fetched files are recorded in a manifest in
+    the destination path (see `Manifest`). Later runs use a delta query to
+    find out which files changed since the last run and only fetch the
+    properties of changed files. Their contents are only downloaded again if
+    the content tag (cTag) or size changed. Files which no longer exist on
+    the server are removed from the destination path.
+
+    When downloading folders, the properties of the files are fetched with
+    JSON batch requests for up to `Connect.batch_size` files at once.
+
+    With `resume=True`, folder downloads keep a checkpoint journal in the
+    destination path (see `Checkpoint`), and the folders and files which an
+    interrupted run with `resume=True` already completed are not fetched again.
+    """
 
     def __init__(
         self,
@@ -51,6 +64,9 @@ class SharepointFetcherCloud(SharepointFetcher):
         list_title_property_map: Optional[Dict[str, str]] = None,
         download_properties_only: Optional[bool] = False,
         filter_config: Optional[List[FilesSelectors]] = None,
+        max_requests_per_second: Optional[float] = None,
+        incremental: Optional[bool] = False,
+        resume: Optional[bool] = False,
     ):
         super().__init__(
             sharepoint_dir,
@@ -59,6 +75,8 @@ class SharepointFetcherCloud(SharepointFetcher):
             download_properties_only,
             list_title_property_map,
             filter_config,
+            incremental,
+            resume,
         )
 
         if tenant_id is None:
@@ -79,8 +97,23 @@ class SharepointFetcherCloud(SharepointFetcher):
                 + "variable SHAREPOINT_FETCHER_CLIENT_SECRET or as command line argument --client-secret."
             )
         self._connect = Connect(
-            self._sharepoint_site, tenant_id, client_id, client_secret, force_ip
+            self._sharepoint_site,
+            tenant_id,
+            client_id,
+            client_secret,
+            force_ip,
+            download_directory=self._destination_path,
+            max_requests_per_second=max_requests_per_second,
         )
+        # ids of the drive items which changed since the last incremental run,
+        # None if every file must be checked
+        self._changed_item_ids: Optional[Set[str]] = None
+        # names of the files of folders which were listed together with their
+        # subfolders, keyed by the folder path
+        self._listed_files: Dict[str, List[str]] = {}
+        # file properties which were fetched by batch requests, keyed by
+        # (folder path, file name)
+        self._batched_properties: Dict[Tuple[str, str], Dict[str, Any]] = {}
 
     def download_file(self, remote_path: str, file_name: str):
         """
@@ -91,9 +124,10 @@ class SharepointFetcherCloud(SharepointFetcher):
         output_path = self._destination_path
 
         os.makedirs(output_path, exist_ok=True)
-        self._download_file(
-            output_path, self._relative_url_prefix + "/" + remote_path, file_name
-        )
+        with self._incremental_run(), self._properties_run():
+            self._download_file(
+                output_path, self._relative_url_prefix + "/" + remote_path, file_name
+            )
 
     def download_folder(self, remote_path=None):
         """
@@ -104,33 +138,63 @@ class SharepointFetcherCloud(SharepointFetcher):
         if remote_path is None:
             remote_path = self._relative_url_prefix + "/" + self._sharepoint_dir
 
-        assert remote_path.endswith("/"), f"{remote_path} should end with a /, but doesn't!"
+        with self._incremental_run(), self._checkpointed_run(), self._properties_run():
+            delta_link = self._read_changed_item_ids()
+            self._download_folder(remote_path)
+            if self._manifest is not None:
+                self._manifest.delta_link = delta_link
+
+    def _read_changed_item_ids(self) -> Optional[str]:
+        """
+        Find out which files changed since the last incremental run.
 
-        output_path = self._destination_path.joinpath(
-            self._remove_sharepoint_dir_prefix(self._remove_url_prefix(remote_path))
+        The ids of the changed drive items are stored in `_changed_item_ids`.
+        Returns the delta link for the next run.
+        """
+        self._changed_item_ids = None
+        if self._manifest is None:
+            return None
+        self._changed_item_ids, delta_link = self._connect.get_changed_item_ids(
+            self._library_name(), self._manifest.delta_link
         )
-        os.makedirs(output_path, exist_ok=True)
-        if remote_path.startswith("/sites/") or "Shared Documents" in remote_path:
-            folder_path = self.get_path(remote_path)
-        else:
-            folder_path = remote_path
-        subfolders_path = self._fetch_subfolders(folder_path)
-        if subfolders_path == []:
-            pass
-        else:
-            for subfolder_path in subfolders_path:
-                self.download_folder(subfolder_path + "/")
+        return delta_link
+
+    def _download_folder(self, remote_path: str):
+        assert remote_path.endswith("/"), f"{remote_path} should end with a /, but doesn't!"
+        # folders which an interrupted run completed don't need to be listed again
+        if self._is_completed_folder(remote_path):
+            return
+
         short_remote_path = self._remove_sharepoint_dir_prefix(
             self._remove_url_prefix(remote_path)
         )
-        if self._folder_filters and not any(
+        output_path = self._destination_path.joinpath(short_remote_path)
+        # only create local folders which can receive files
+        is_included = not self._folder_filters or any(
             [fnmatch(short_remote_path, filter) for filter in self._folder_filters]
-        ):
+        )
+        if is_included:
+            os.makedirs(output_path, exist_ok=True)
+        folder_path = self._folder_path(remote_path)
+        # skip subfolders which can't contain any folder matching the folder filters
+        if self._folder_filter_trie.could_match_below(short_remote_path):
+            for subfolder_path in self._fetch_subfolders(folder_path):
+                if self._folder_filter_trie.could_match(
+                    self._remove_sharepoint_dir_prefix(
+                        self._remove_url_prefix(subfolder_path + "/")
+                    )
+                ):
+                    self._download_folder(subfolder_path + "/")
+        if not is_included:
+            self._listed_files.pop(folder_path, None)
+            self._record_completed_folder(remote_path)
             return
         files = self._fetch_files(remote_path)
 
         files_selectors = self._get_files_selectors_for_file_path(short_remote_path)
+        files_to_download = []
         downloaded_files_per_selector: List[List[str]] = [[] for _ in files_selectors]
+        file_folder_path = self._folder_path(remote_path.removesuffix("/"))
         for file in files:
             matching_files_selector_index = None
             if files_selectors:
@@ -140,6 +204,27 @@ class SharepointFetcherCloud(SharepointFetcher):
                         break
                 else:
                     continue
+            if (
+                self._completed_file(self._server_relative_url(file_folder_path, file))
+                is not None
+            ):
+                logger.info(
+                    "File `{}` in path `{}` was already fetched by the interrupted run",
+                    file,
+                    output_path,
+                )
+                if matching_files_selector_index is not None:
+                    downloaded_files_per_selector[matching_files_selector_index].append(file)
+                continue
+            files_to_download.append((file, matching_files_selector_index))
+
+        batch_size = self._connect.batch_size
+        for position, (file, matching_files_selector_index) in enumerate(files_to_download):
+            if position % batch_size == 0:
+                self._fetch_files_properties(
+                    remote_path,
+                    [next_file for next_file, _ in files_to_download[position:][:batch_size]],
+                )
 
             did_download_file = self._download_file(
                 output_path, remote_path, file, files_selectors=files_selectors
@@ -158,6 +243,8 @@ class SharepointFetcherCloud(SharepointFetcher):
                 ", ".join([str(f) for f in selectors_with_no_files]),
             )
 
+        self._record_completed_folder(remote_path)
+
     def download_custom_property_definitions(self):
         pass
 
@@ -178,31 +265,156 @@ class SharepointFetcherCloud(SharepointFetcher):
         if remote_path.endswith("/"):
             remote_path = remote_path[:-1]
 
-        if remote_path.startswith("/sites") or "Shared Documents" in remote_path:
-            path = self.get_path(remote_path)
-        else:
-            path = remote_path
+        path = self._folder_path(remote_path)
+
+        manifest_key = self._server_relative_url(path, file_name)
+        if self._is_unchanged_drive_item(manifest_key):
+            assert self._manifest is not None
+            self._manifest.keep(manifest_key)
+            unchanged_item_entry = self._manifest.get(manifest_key)
+            assert unchanged_item_entry is not None
+            self._record_completed_file(manifest_key, unchanged_item_entry)
+            logger.info(
+                "File `{}` in path `{}` is unchanged and was not fetched again",
+                file_name,
+                output_path,
+            )
+            return True
+
+        file_properties = self._batched_properties.pop((path, file_name), None)
         if "Shared Documents" in self._sharepoint_dir:
-            file_properties = self._connect.get_file_properties(path, file_name, None)
+            if file_properties is None:
+                file_properties = self._connect.get_file_properties(path, file_name, None)
         else:
             library_name = self._sharepoint_dir.split("/")[0]
-            file_properties = self._connect.get_file_properties(path, file_name, library_name)
-
-        self.save_file(
-            output_path,
-            file_name + self.metadata_file_suffix,
-            json.dumps(file_properties, indent=2),
-            False,
-        )
+            if file_properties is None:
+                file_properties = self._connect.get_file_properties(
+                    path, file_name, library_name
+                )
 
-        if not self._download_properties_only:
+        manifest_entry = None
+        if self._is_recording_files():
+            manifest_entry = self._manifest_entry(output_path, file_name, file_properties)
+        if self._download_properties_only:
+            self.save_properties(output_path, file_name, file_properties, False)
+            if manifest_entry is not None:
+                if self._manifest is not None:
+                    self._manifest.record(manifest_key, manifest_entry)
+                self._record_completed_file(manifest_key, manifest_entry)
+            return True
+
+        unchanged_entry = None
+        if self._manifest is not None and manifest_entry is not None:
+            unchanged_entry = self._manifest.unchanged(manifest_key, manifest_entry)
+        if unchanged_entry is not None:
+            sha256 = unchanged_entry.sha256
+        else:
             if "Shared Documents" in self._sharepoint_dir:
                 file_contents = self._connect.get_file_object(path, file_name, None)
             else:
                 file_contents = self._connect.get_file_object(path, file_name, library_name)
+            sha256 = file_contents.sha256
+        # the properties are only saved once the hash of the contents is known
+        self.save_properties(
+            output_path, file_name, {**file_properties, self.sha256_property: sha256}, True
+        )
+        if unchanged_entry is not None:
+            logger.info(
+                "File `{}` in path `{}` is unchanged and was not downloaded again",
+                file_name,
+                output_path,
+            )
+        else:
             self.save_file(output_path, file_name, file_contents, False)
+        if manifest_entry is not None:
+            manifest_entry = replace(manifest_entry, sha256=sha256)
+            if self._manifest is not None:
+                self._manifest.record(manifest_key, manifest_entry)
+            self._record_completed_file(manifest_key, manifest_entry)
         return True
 
+    def _fetch_files_properties(self, remote_path: str, file_names: List[str]):
+        """
+        Fetch the properties of several files of a folder with batch requests.
+
+        The properties are kept for `_download_file`. Files which are known to
+        be unchanged since the last incremental run are left out. If there is
+        only one file left, `_download_file` fetches its properties itself.
+        """
+        path = self._folder_path(remote_path.removesuffix("/"))
+        file_names = [
+            file_name
+            for file_name in file_names
+            if not self._is_unchanged_drive_item(self._server_relative_url(path, file_name))
+        ]
+        if len(file_names) < 2:
+            return
+        for file_name, properties in self._connect.get_files_properties(
+            path, file_names, self._library_name()
+        ).items():
+            self._batched_properties[(path, file_name)] = properties
+
+    def _library_name(self) -> Optional[str]:
+        if "Shared Documents" in self._sharepoint_dir:
+            return None
+        return self._sharepoint_dir.split("/")[0]
+
+    def _server_relative_url(self, path: str, file_name: str) -> str:
+        library_name = self._sharepoint_dir.split("/")[0]
+        return "/".join(
+            part for part in (self._relative_url_prefix, library_name, path, file_name) if part
+        )
+
+    def _manifest_entry(
+        self, output_path: Path, file_name: str, file_properties: Dict[str, Any]
+    ) -> ManifestEntry:
+        return ManifestEntry(
+            path=(output_path / file_name).relative_to(self._destination_path).as_posix(),
+            etag=file_properties.get("cTag"),
+            modified=None,
+            size=file_properties.get("size"),
+            id=file_properties.get("id"),
+        )
+
+    def _is_unchanged_drive_item(self, manifest_key: str) -> bool:
+        """Check whether a file is known to be unchanged since the last incremental run."""
+        if self._manifest is None or self._changed_item_ids is None:
+            return False
+        entry = self._manifest.get(manifest_key)
+        return (
+            entry is not None
+            and entry.id is not None
+            and entry.id not in self._changed_item_ids
+            and self._manifest.is_complete(
+                entry, with_contents=not self._download_properties_only
+            )
+        )
+
+    def _folder_path(self, remote_path: str) -> str:
+        """Return the path of a folder relative to its document library."""
+        if remote_path.startswith("/sites") or "Shared Documents" in remote_path:
+            return self.get_path(remote_path)
+        return remote_path
+
+    def _fetch_children(self, folder_path: str) -> Tuple[List[str], List[str]]:
+        """
+        Fetch the subfolders and the file names of a folder with one listing.
+
+        Returns the paths of the subfolders (like `Connect.get_folders`) and
+        the names of the files.
+        """
+        subfolders = []
+        files = []
+        for item in self._connect.get_children(folder_path, self._library_name()):
+            if "folder" in item:
+                if folder_path:
+                    subfolders.append(f"{folder_path}/{item['name']}")
+                else:
+                    subfolders.append(item["name"])
+            elif "file" in item:
+                files.append(item["name"])
+        return subfolders, files
+
     def _fetch_subfolders(self, remote_path: str) -> List[str]:
         """
         Fetch list of all subfolders of a given path.
@@ -212,42 +424,26 @@ class SharepointFetcherCloud(SharepointFetcher):
         For example: if called with `/sites/123456/Documents/Some/Path/` it
         might return a list with entries like
         `/sites/123456/Documents/Some/Path/WithSubFolder`.
+
+        The files of the folder are part of the same listing, so they are kept
+        for the next `_fetch_files` call for this folder.
         """
-        if remote_path == "":
-            if "Shared Documents" in self._sharepoint_dir:
-                folders_path = self._connect.get_folders_root(None)
-            else:
-                library_name = self._sharepoint_dir.split("/")[0]
-                folders_path = self._connect.get_folders_root(library_name)
-        elif "Shared Documents" in self._sharepoint_dir:
-            folders_path = self._connect.get_folders(remote_path, None)
-        else:
-            library_name = self._sharepoint_dir.split("/")[0]
-            folders_path = self._connect.get_folders(remote_path, library_name)
-        return folders_path
+        subfolders, self._listed_files[remote_path] = self._fetch_children(remote_path)
+        return subfolders
 
     def _fetch_files(self, remote_path: str) -> List[str]:
         """
         Fetch list of file names.
 
         Fetches list of names of all files present inside the folder passed
-        through parameter.
+        through parameter. If the folder was already listed by
+        `_fetch_subfolders`, no further request is made.
         """
-        if remote_path.startswith("/sites") or "Shared Documents" in remote_path:
-            remote_path = self.get_path(remote_path)
-        url_parts = remote_path.split("/")
-        if len(url_parts) == 1:
-            if remote_path == "Shared Documents":
-                result = self._connect.get_files_root(None)
-            else:
-                library_name = self._sharepoint_dir.split("/")[0]
-                result = self._connect.get_files_root(library_name)
-        elif "Shared Documents" in self._sharepoint_dir:
-            result = self._connect.get_files(remote_path, None)
-        else:
-            library_name = self._sharepoint_dir.split("/")[0]
-            result = self._connect.get_files(remote_path, library_name)
-        return result
+        folder_path = self._folder_path(remote_path)
+        if folder_path in self._listed_files:
+            return self._listed_files.pop(folder_path)
+        _, files = self._fetch_children(folder_path)
+        return files
 
     def get_path(self, path):
         url_parts = path.split("/")
@@ -37,6 +37,10 @@ class FileConfiguration(BaseModel):
     download_properties_only: Optional[bool]
     sharepoint_file: Optional[str]
     filter_config_file: Optional[str]
+    max_parallel_requests: Optional[int]
+    max_requests_per_second: Optional[float]
+    incremental: Optional[bool]
+    resume: Optional[bool]
 
     @root_validator(pre=True)
     def validate_path_options(cls, values):
@@ -147,6 +151,10 @@ class Settings(BaseSettings):
     custom_properties: Optional[str] = Field(None)
     download_properties_only: Optional[bool] = False
     sharepoint_file: Optional[str] = Field(None)
+    max_parallel_requests: Optional[int] = 1
+    max_requests_per_second: Optional[float] = None
+    incremental: Optional[bool] = False
+    resume: Optional[bool] = False
 
     def require_env_var(cls, v, values, config, field):
         if not v:
@@ -263,6 +271,60 @@ class Settings(BaseSettings):
                 "It must be a boolean value.",
             )
 
+    @validator("incremental", always=True)
+    def validate_incremental(cls, v: Any):
+        if v is None or v == False or v == "false" or v == 0:
+            return False
+        elif v == True or v == "true" or v == 1:
+            return True
+        else:
+            raise AutopilotConfigurationError(
+                f"Could not parse SHAREPOINT_FETCHER_INCREMENTAL parameter: {v}. "
+                "It must be a boolean value.",
+            )
+
+    @validator("resume", always=True)
+    def validate_resume(cls, v: Any):
+        if v is None or v == False or v == "false" or v == 0:
+            return False
+        elif v == True or v == "true" or v == 1:
+            return True
+        else:
+            raise AutopilotConfigurationError(
+                f"Could not parse SHAREPOINT_FETCHER_RESUME parameter: {v}. "
+                "It must be a boolean value.",
+            )
+
+    @validator("max_parallel_requests", always=True, pre=True)
+    def validate_max_parallel_requests(cls, v: Any):
+        if v is None:
+            return 1
+        try:
+            value = int(v)
+        except (TypeError, ValueError):
+            value = 0
+        if value < 1:
+            raise AutopilotConfigurationError(
+                f"Could not parse SHAREPOINT_FETCHER_MAX_PARALLEL_REQUESTS parameter: {v}. "
+                "It must be a positive number.",
+            )
+        return value
+
+    @validator("max_requests_per_second", always=True, pre=True)
+    def validate_max_requests_per_second(cls, v: Any):
+        if v is None or v == "":
+            return None
+        try:
+            value = float(v)
+        except (TypeError, ValueError):
+            value = 0
+        if not value > 0:
+            raise AutopilotConfigurationError(
+                f"Could not parse SHAREPOINT_FETCHER_MAX_REQUESTS_PER_SECOND parameter: {v}. "
+                "It must be a positive number.",
+            )
+        return value
+
     @validator("is_cloud", always=True)
     def validate_is_cloud(cls, v: Any):
         if v is None or v == False or v == "false" or v == 0:
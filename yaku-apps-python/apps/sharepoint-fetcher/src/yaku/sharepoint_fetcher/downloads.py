@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import requests
+from yaku.autopilot_utils.errors import AutopilotError
+
+CHUNK_SIZE = 1024 * 1024
+
+TEMPORARY_FILE_PREFIX = "."
+TEMPORARY_FILE_SUFFIX = ".download"
+# glob pattern of the temporary files, e.g. for removing the leftovers of an interrupted run
+TEMPORARY_FILE_PATTERN = TEMPORARY_FILE_PREFIX + "*" + TEMPORARY_FILE_SUFFIX
+
+
+def _read_umask() -> int:
+    # the umask can only be read by setting it, so this is done once at import time,
+    # before any download threads are started
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# `tempfile.mkstemp` creates files which only the owner can read, but the fetched
+# files should get the same permissions as files created with `open`
+FILE_MODE = 0o666 & ~_read_umask()
+
+
+@dataclass(frozen=True)
+class DownloadedFile:
+    """
+    A completely downloaded file with verified size.
+
+    The contents are stored in a temporary file, which is moved to its final
+    place by `SharepointFetcher.save_file`.
+    """
+
+    temporary_path: Path
+    size: int
+    sha256: str
+
+
+def _size_error(expected_size: int, actual_size: str) -> AutopilotError:
+    return AutopilotError(
+        f"The downloaded file does not have the proper size: expected {expected_size} bytes, got {actual_size} bytes! One reason could be "
+        + "that you are behind a proxy/restricted firewall!"
+    )
+
+
+def download_to_temporary_file(
+    response: requests.Response, expected_size: int, directory: Optional[Path] = None
+) -> DownloadedFile:
+    """
+    Write the body of a streamed `response` chunk by chunk into a temporary file.
+
+    The temporary file is created in `directory`, which should be on the same
+    file system as the final place of the file, so that it can be moved there
+    atomically. The size of the file is checked and its SHA-256 hash is
+    computed while the chunks arrive, so memory use doesn't depend on the
+    file size.
+    """
+    if directory is not None:
+        directory = Path.cwd().joinpath(directory)
+    fd, name = tempfile.mkstemp(
+        prefix=TEMPORARY_FILE_PREFIX, suffix=TEMPORARY_FILE_SUFFIX, dir=directory
+    )
+    temporary_path = Path(name)
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with response, os.fdopen(fd, "wb") as f:
+            os.chmod(name, FILE_MODE)
+            for chunk in response.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if size > expected_size:
+                    raise _size_error(expected_size, f"more than {expected_size}")
+                sha256.update(chunk)
+                f.write(chunk)
+        if size != expected_size:
+            raise _size_error(expected_size, str(size))
+    except BaseException:
+        temporary_path.unlink(missing_ok=True)
+        raise
+    return DownloadedFile(temporary_path, size, sha256.hexdigest())
+
+
+def write_atomically(path: Path, contents: Union[bytes, str]):
+    """
+    Write `contents` to a temporary file next to `path` and then move it to `path`.
+
+    Other processes (and a later run after a crash) either see the old file
+    or the complete new file, but never a partially written file.
+    """
+    if isinstance(contents, str):
+        contents = contents.encode("utf-8")
+    fd, name = tempfile.mkstemp(
+        prefix=TEMPORARY_FILE_PREFIX, suffix=TEMPORARY_FILE_SUFFIX, dir=path.parent
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.chmod(name, FILE_MODE)
+            f.write(contents)
+        os.replace(name, path)
+    except BaseException:
+        Path(name).unlink(missing_ok=True)
+        raise
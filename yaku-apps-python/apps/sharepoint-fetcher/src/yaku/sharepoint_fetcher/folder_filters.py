@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+def _has_magic(segment: str) -> bool:
+    return any(c in segment for c in "*?[")
+
+
+def _split(path: str) -> List[str]:
+    path = path.strip("/")
+    return path.split("/") if path else []
+
+
+@dataclass
+class _Node:
+    children: Dict[str, "_Node"] = field(default_factory=dict)
+
+
+class FolderFilterTrie:
+    """
+    Prefix trie of the folder filter expressions, split into path segments.
+
+    Folder filters are glob expressions for folder paths relative to the
+    fetched SharePoint directory, e.g. `2024/*/` (see
+    `SharepointFetcher._generate_filters_and_selectors`). The trie answers
+    whether a folder or any of its subfolders can possibly match one of the
+    filters, so that the fetchers don't need to list folders whose whole
+    subtree is excluded.
+
+    The answers are conservative: as `fnmatch` wildcards can also match
+    slashes, every folder below a segment with wildcards is assumed to match.
+    Without any filters, every folder matches.
+    """
+
+    def __init__(self, folder_filters: List[str]):
+        self._root: Optional[_Node] = None
+        if folder_filters:
+            self._root = _Node()
+        for folder_filter in folder_filters:
+            node = self._root
+            for segment in _split(folder_filter):
+                node = node.children.setdefault(segment, _Node())
+
+    def _walk(self, path: str) -> Optional[List[_Node]]:
+        """
+        Return the trie nodes which correspond to `path`.
+
+        Returns None if a wildcard segment was reached, i.e. if any folder
+        below `path` might match.
+        """
+        assert self._root is not None
+        nodes = [self._root]
+        for segment in _split(path):
+            next_nodes: List[_Node] = []
+            for node in nodes:
+                for child_segment, child in node.children.items():
+                    if _has_magic(child_segment):
+                        return None
+                    if child_segment == segment:
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                break
+        return nodes
+
+    def could_match(self, path: str) -> bool:
+        """Check whether the folder `path` or one of its subfolders might match a filter."""
+        if self._root is None:
+            return True
+        nodes = self._walk(path)
+        return nodes is None or bool(nodes)
+
+    def could_match_below(self, path: str) -> bool:
+        """Check whether one of the subfolders of `path` might match a filter."""
+        if self._root is None:
+            return True
+        nodes = self._walk(path)
+        return nodes is None or any(node.children for node in nodes)
@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from loguru import logger
+from yaku.sharepoint_fetcher.downloads import write_atomically
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """
+    State of a fetched file at the time it was fetched.
+
+    `path` is the local path of the file relative to the destination path.
+    `etag`, `modified` and `size` describe the remote version of the file
+    contents, `sha256` is the hash of the downloaded contents (or None if
+    only the file properties were downloaded). `id` is the drive item id of
+    cloud files.
+    """
+
+    path: str
+    etag: Optional[str]
+    modified: Optional[str]
+    size: Optional[int]
+    sha256: Optional[str] = None
+    id: Optional[str] = None
+
+    def has_same_version(self, other: "ManifestEntry") -> bool:
+        return (self.etag, self.modified, self.size) == (
+            other.etag,
+            other.modified,
+            other.size,
+        )
+
+
+def is_complete(
+    destination_path: Path,
+    metadata_file_suffix: str,
+    entry: ManifestEntry,
+    with_contents: bool,
+) -> bool:
+    """Check that the local copy of a file (and its properties) in `destination_path` exists."""
+    properties_path = destination_path / (entry.path + metadata_file_suffix)
+    if not properties_path.is_file():
+        return False
+    if not with_contents:
+        return True
+    if entry.sha256 is None:
+        return False
+    contents_path = destination_path / entry.path
+    return contents_path.is_file() and (
+        entry.size is None or contents_path.stat().st_size == entry.size
+    )
+
+
+class Manifest:
+    """
+    Record of the files which were fetched into a destination path.
+
+    The manifest is stored in the destination path and keeps an entry for
+    every fetched file, keyed by the server-relative URL of the file. This
+    allows later fetches into the same destination path to skip files which
+    haven't changed on the server since they were fetched.
+
+    Every file which is fetched or found unchanged during a run must be
+    recorded with `record` or `keep`. At the end of a complete run,
+    `remove_unseen` deletes the local copies of all files which were not
+    seen during the run, e.g. because they were deleted on the server.
+    """
+
+    filename = "__manifest__.json"
+
+    version = 1
+
+    def __init__(self, destination_path: Path, metadata_file_suffix: str):
+        self._destination_path = destination_path
+        self._metadata_file_suffix = metadata_file_suffix
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._seen: Set[str] = set()
+        self.delta_link: Optional[str] = None
+        self._load()
+
+    @property
+    def path(self) -> Path:
+        return self._destination_path / self.filename
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            content: Dict[str, Any] = json.loads(self.path.read_text())
+            if content.get("version") != self.version:
+                raise ValueError(f"unsupported version {content.get('version')}")
+            entries = {key: ManifestEntry(**entry) for key, entry in content["files"].items()}
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            logger.warning(
+                "Ignoring invalid manifest `{}`, all files will be fetched again: {}",
+                self.path,
+                e,
+            )
+            return
+        self._entries = entries
+        self.delta_link = content.get("delta_link")
+
+    def save(self):
+        """
+        Store the manifest, leaving out files which were removed locally.
+
+        The manifest is replaced atomically, so that a crash while saving
+        doesn't leave a truncated manifest, which would make the next run
+        fetch all files again.
+        """
+        files = {
+            key: asdict(entry)
+            for key, entry in self._entries.items()
+            if self._local_path(entry).exists()
+        }
+        write_atomically(
+            self.path,
+            json.dumps(
+                {"version": self.version, "delta_link": self.delta_link, "files": files},
+                indent=2,
+            ),
+        )
+
+    def _local_path(self, entry: ManifestEntry) -> Path:
+        if entry.sha256 is None:
+            return self._destination_path / (entry.path + self._metadata_file_suffix)
+        return self._destination_path / entry.path
+
+    def get(self, key: str) -> Optional[ManifestEntry]:
+        return self._entries.get(key)
+
+    def is_complete(self, entry: ManifestEntry, with_contents: bool) -> bool:
+        """Check that the local copy of a file (and its properties) still exists."""
+        return is_complete(
+            self._destination_path, self._metadata_file_suffix, entry, with_contents
+        )
+
+    def unchanged(self, key: str, current: ManifestEntry) -> Optional[ManifestEntry]:
+        """
+        Return the recorded entry if the file contents didn't change since then.
+
+        The contents are unchanged if the recorded entry has the same version
+        as `current` and the downloaded contents are still there.
+        """
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or entry.path != current.path
+            or not entry.has_same_version(current)
+            or not self.is_complete(entry, with_contents=True)
+        ):
+            return None
+        return entry
+
+    def record(self, key: str, entry: ManifestEntry):
+        self._entries[key] = entry
+        self._seen.add(key)
+
+    def keep(self, key: str):
+        self._seen.add(key)
+
+    def remove_unseen(self):
+        """Delete the local copies of all files which were not seen in this run."""
+        for key in sorted(set(self._entries) - self._seen):
+            entry = self._entries.pop(key)
+            logger.info(
+                "Removing local file `{}` because it is no longer fetched from `{}`",
+                entry.path,
+                key,
+            )
+            for path in (
+                self._destination_path / entry.path,
+                self._destination_path / (entry.path + self._metadata_file_suffix),
+            ):
+                path.unlink(missing_ok=True)
@@ -2,13 +2,18 @@
 #
 # SPDX-License-Identifier: MIT
 
-from typing import Any, Dict, List, Tuple
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from urllib.parse import quote, urlparse
 
 import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
 from requests_ntlm import HttpNtlmAuth
 from yaku.autopilot_utils.errors import AutopilotConfigurationError, AutopilotError
+from yaku.autopilot_utils.throttling import ThrottledTransport
+from yaku.sharepoint_fetcher.downloads import DownloadedFile, download_to_temporary_file
 
 
 class Connect:
@@ -22,19 +27,64 @@ class Connect:
 
     Files and folders are always given as relative URLs. The URL must include
     the site prefix, e.g. `/sites/012345/Documents/myFolder/myFile.txt`.
+
+    The methods may be called from several threads at once. As NTLM
+    authenticates connections and not single requests, every thread uses its
+    own session with its own (kept-alive) connection to the server.
+
+    The number of requests sent to the server is counted in `request_count`.
+    Requests are sent through a :py:class:`ThrottledTransport`, which keeps
+    at most `max_requests_per_second` requests per second (if given) and at
+    most `max_parallel_requests` concurrent requests, and retries requests
+    which were throttled by the server or failed with a connection error.
+
+    Downloaded files are stored in temporary files in `download_directory`
+    (or the default temporary directory).
     """
 
-    def __init__(self, sharepoint_site, username, password, force_ip=None):
+    def __init__(
+        self,
+        sharepoint_site,
+        username,
+        password,
+        force_ip=None,
+        download_directory: Optional[Path] = None,
+        max_parallel_requests: int = 1,
+        max_requests_per_second: Optional[float] = None,
+    ):
         if sharepoint_site.endswith("/"):
             sharepoint_site = sharepoint_site[:-1]
         self._sharepoint_site = sharepoint_site
 
-        session = requests.Session()
-        session.headers = {"Accept": "application/json;odata=verbose"}
+        self._transport = ThrottledTransport(
+            requests_per_second=max_requests_per_second,
+            max_concurrency=max_parallel_requests,
+            retry_exceptions=(requests.ConnectionError,),
+        )
         self._force_ip = force_ip
-        session.auth = HttpNtlmAuth(username, password)
-        session.verify = False
-        self._session = session
+        self.download_directory = download_directory
+        self._username = username
+        self._password = password
+        self._thread_local = threading.local()
+        self._request_count_lock = threading.Lock()
+        self.request_count = 0
+        # file sizes which were returned together with the file properties,
+        # keyed by (relative_url, file_name)
+        self._file_sizes: Dict[Tuple[str, str], int] = {}
+
+    @property
+    def _session(self) -> requests.Session:
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers = {"Accept": "application/json;odata=verbose"}
+            session.auth = HttpNtlmAuth(self._username, self._password)
+            session.verify = False
+            # a session is only used by one thread, so it needs only one connection
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            self._thread_local.session = session
+        return session
 
     def _exchange_hostname_by_forced_ip_address(self, url: str) -> Tuple[str, str]:
         """
@@ -47,14 +97,23 @@ class Connect:
         url = parts._replace(netloc=self._force_ip).geturl()
         return url, host
 
-    def _get(self, url: str) -> requests.Response:
+    def _get(self, url: str, stream: bool = False) -> requests.Response:
         assert url.count("//") == 1, f"Duplicate slashes detected: {url}"
         headers = {}
         if self._force_ip:
             url, host = self._exchange_hostname_by_forced_ip_address(url)
             headers["Host"] = host
         logger.debug("GET {url}", url=url)
-        return self._session.get(url, verify=False, headers=headers)
+        session = self._session
+
+        def send() -> requests.Response:
+            with self._request_count_lock:
+                self.request_count += 1
+            if stream:
+                return session.get(url, verify=False, headers=headers, stream=True)
+            return session.get(url, verify=False, headers=headers)
+
+        return self._transport.request(send)
 
     def _get_paginated_results(self, url: str) -> List[Dict[str, Any]]:
         results = []
@@ -122,43 +181,77 @@ class Connect:
         response = self._get_paginated_results(url)
         return response
 
-    def get_files(self, relative_url) -> List[Dict[str, Any]]:
+    def get_files(
+        self,
+        relative_url,
+        list_item_fields: Optional[Sequence[str]] = None,
+        odata_filter: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Get JSON structure of files in the given folder.
 
+        If `list_item_fields` are given, only the file names are requested,
+        together with the given fields of the files' list items (i.e. of their
+        properties) under `ListItemAllFields`.
+
+        If an `odata_filter` is given, e.g. `ListItemAllFields/Status eq 'Final'`,
+        only the files matching this OData `$filter` expression are returned.
+
         For info on `relative_url`, see class docs.
         """
         url = (
             self._sharepoint_site
             + f"/_api/web/GetFolderByServerRelativeUrl('{relative_url}')/files"
         )
+        query = []
+        if list_item_fields:
+            query.append(
+                "$select=Name,"
+                + ",".join(f"ListItemAllFields/{field}" for field in list_item_fields)
+            )
+            query.append("$expand=ListItemAllFields")
+        if odata_filter:
+            query.append("$filter=" + quote(odata_filter, safe="/'(),:"))
+        if query:
+            url += "?" + "&".join(query)
         response = self._get_paginated_results(url)
         return response
 
-    def get_file_object(self, relative_url: str, file_name: str) -> bytes:
+    def get_file_object(self, relative_url: str, file_name: str) -> DownloadedFile:
         """
         Get file from given relative path and under the given file name.
 
         For info on `relative_url`, see class docs.
+
+        The file is streamed into a temporary file (see `download_to_temporary_file`).
+        Its size is checked against the size which was returned by
+        `get_file_properties` for the same file. Only if the properties weren't
+        fetched before, the size is requested separately.
         """
+        expected_size = self._file_sizes.get((relative_url, file_name))
+        if expected_size is None:
+            additional_file_properties = self._get_additional_file_properties(
+                relative_url, file_name
+            )
+            expected_size = int(
+                self._get_file_size_from_properties(additional_file_properties)
+            )
         encoded_file_name = quote(file_name)
         url = (
             self._sharepoint_site
             + f"/_api/web/GetFileByServerRelativePath(decodedurl='{relative_url}/{encoded_file_name}')/$value"
         )
-        response = self._get(url)
+        response = self._get(url, stream=True)
         response.raise_for_status()
-        additional_file_properties = self._get_additional_file_properties(
-            relative_url, file_name
-        )
-        actual_size = self._get_file_size_from_properties(additional_file_properties)
-        file_size = len(response.content)
-        if actual_size != file_size:
-            raise AutopilotError(
-                f"The downloaded file does not have the proper size: expected {actual_size} bytes, got {file_size} bytes! One reason could be "
-                + "that you are behind a proxy/restricted firewall!"
-            )
-        return response.content
+        return download_to_temporary_file(response, expected_size, self.download_directory)
+
+    def get_file_size(self, relative_url: str, file_name: str) -> Optional[int]:
+        """Return the file size which was returned by `get_file_properties`, if any."""
+        return self._file_sizes.get((relative_url, file_name))
+
+    def forget_file_size(self, relative_url: str, file_name: str):
+        """Drop the remembered size of a file once it is no longer needed."""
+        self._file_sizes.pop((relative_url, file_name), None)
 
     def _get_file_size_from_properties(self, properties):
         return properties["vti_x005f_filesize"]
@@ -187,17 +280,24 @@ class Connect:
 
         The properties are returned as JSON structure.
 
+        The size of the file is requested in the same request and remembered
+        for checking the size in a later `get_file_object` call.
+
         For info on `relative_url`, see class docs.
         """
         encoded_file_name = quote(file_name)
         url = (
             self._sharepoint_site
             + f"/_api/web/GetFileByServerRelativePath(decodedurl='{relative_url}/{encoded_file_name}')/ListItemAllFields"
+            + "?$select=*,File/Length&$expand=File"
         )
         response = self._get(url)
         response.raise_for_status()
-        json_response = response.json()
-        return json_response["d"]  # type: ignore
+        properties = response.json()["d"]
+        file = properties.pop("File", None)
+        if isinstance(file, dict) and file.get("Length") is not None:
+            self._file_sizes[(relative_url, file_name)] = int(file["Length"])
+        return properties  # type: ignore
 
     def verify_site_lists(self, titles: List[str], must_have_items=False) -> List[str]:
         """
@@ -9,12 +9,14 @@ import shutil
 import urllib.parse
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import requests
 from loguru import logger
-from yaku.autopilot_utils.checks import check
 from yaku.autopilot_utils.errors import AutopilotConfigurationError, AutopilotError
-from yaku.sharepoint_fetcher.selectors import FilesSelectors
+from yaku.sharepoint_fetcher.manifest import ManifestEntry
+from yaku.sharepoint_fetcher.prefetcher import Prefetcher
+from yaku.sharepoint_fetcher.selectors import FilesSelectors, files_selectors_to_odata_filter
 from yaku.sharepoint_fetcher.sharepoint_fetcher import SharepointFetcher
 from yaku.sharepoint_fetcher.utils import PropertiesReader
 
@@ -50,10 +52,28 @@ class SharepointFetcherOnPremise(SharepointFetcher):
 
     It is also possible to download only the property files and no file contents.
     This can be enabled by providing `download_properties_only=True`.
-    """
 
-    # used for storing the file metadata in a JSON file next to the downloaded file
-    metadata_file_suffix = ".__properties__.json"
+    When downloading folders, up to `max_parallel_requests` requests are sent
+    to the server at the same time: the listings of subfolders and the
+    properties of files are fetched ahead of time while the folder tree is
+    walked in the usual depth-first order (see `Prefetcher`).
+
+    If selectors need to check file properties, the properties used by the
+    selectors are requested together with the list of files of a folder, so
+    that files which don't match the selectors are skipped without any
+    further request. Where possible, the selectors are also sent to the
+    server as OData `$filter`, so that these files aren't even listed.
+
+    With `incremental=True`, the fetched files are recorded in a manifest in
+    the destination path (see `Manifest`). In later runs, the contents of a
+    file are only downloaded again if the `Modified` date, the ETag or the
+    size in its properties changed, and files which no longer exist on the
+    server are removed from the destination path.
+
+    With `resume=True`, folder downloads keep a checkpoint journal in the
+    destination path (see `Checkpoint`), and the folders and files which an
+    interrupted run with `resume=True` already completed are not fetched again.
+    """
 
     # used to store mapping of file property value IDs to their titles
     custom_property_definitions_filename = "__custom_property_definitions__.json"
@@ -70,6 +90,10 @@ class SharepointFetcherOnPremise(SharepointFetcher):
         list_title_property_map: Optional[Dict[str, str]] = None,
         download_properties_only: Optional[bool] = False,
         filter_config: Optional[List[FilesSelectors]] = None,
+        max_parallel_requests: int = 1,
+        max_requests_per_second: Optional[float] = None,
+        incremental: Optional[bool] = False,
+        resume: Optional[bool] = False,
     ):
         super().__init__(
             sharepoint_dir,
@@ -78,6 +102,8 @@ class SharepointFetcherOnPremise(SharepointFetcher):
             download_properties_only,
             list_title_property_map,
             filter_config,
+            incremental,
+            resume,
         )
         if username is None:
             raise AutopilotConfigurationError(
@@ -91,10 +117,22 @@ class SharepointFetcherOnPremise(SharepointFetcher):
                 + "variable SHAREPOINT_FETCHER_PASSWORD or as command line argument --password."
             )
 
-        self._connect = Connect(self._sharepoint_site, username, password, force_ip)
+        self._connect = Connect(
+            self._sharepoint_site,
+            username,
+            password,
+            force_ip,
+            download_directory=self._destination_path,
+            max_parallel_requests=max_parallel_requests,
+            max_requests_per_second=max_requests_per_second,
+        )
+        self._prefetcher = Prefetcher(max_parallel_requests)
         self._properties_reader = PropertiesReader(
             self._destination_path / self.custom_property_definitions_filename
         )
+        # list item fields which were listed together with the files of a
+        # folder, keyed by (remote_path, file_name)
+        self._listed_fields: Dict[Tuple[str, str], Dict[str, Any]] = {}
 
     def download_file(self, remote_path, file_name):
         """
@@ -105,9 +143,10 @@ class SharepointFetcherOnPremise(SharepointFetcher):
         output_path = self._destination_path
 
         os.makedirs(output_path, exist_ok=True)
-        self._download_file(
-            output_path, self._relative_url_prefix + "/" + remote_path, file_name
-        )
+        with self._incremental_run(), self._properties_run():
+            self._download_file(
+                output_path, self._relative_url_prefix + "/" + remote_path, file_name
+            )
 
     def download_folder(self, remote_path=None):
         """
@@ -119,38 +158,78 @@ class SharepointFetcherOnPremise(SharepointFetcher):
         if remote_path is None:
             remote_path = self._relative_url_prefix + "/" + self._sharepoint_dir
 
-        assert remote_path.endswith("/"), f"{remote_path} should end with a /, but doesn't!"
+        with (
+            self._incremental_run(),
+            self._checkpointed_run(),
+            self._properties_run(),
+            self._prefetcher.running(),
+        ):
+            self._download_folder(remote_path)
 
-        output_path = self._destination_path.joinpath(
-            self._remove_sharepoint_dir_prefix(self._remove_url_prefix(remote_path))
+    def _is_included_by_folder_filters(self, short_remote_path: str) -> bool:
+        return not self._folder_filters or any(
+            [fnmatch(short_remote_path, filter) for filter in self._folder_filters]
         )
-        os.makedirs(output_path, exist_ok=True)
 
-        # we first dive into all subfolders (not using any folder filters here!)
-        # TODO: use filter to prevent creating subfolders which eventually don't contain any file
-        subfolders = self._fetch_subfolders(remote_path)
+    def _download_folder(self, remote_path: str):
+        assert remote_path.endswith("/"), f"{remote_path} should end with a /, but doesn't!"
+        if self._is_completed_folder(remote_path):
+            return
+
+        short_remote_path = self._remove_sharepoint_dir_prefix(
+            self._remove_url_prefix(remote_path)
+        )
+        output_path = self._destination_path.joinpath(short_remote_path)
+        # only create local folders which can receive files
+        is_included = self._is_included_by_folder_filters(short_remote_path)
+        if is_included:
+            os.makedirs(output_path, exist_ok=True)
+
+        # we first dive into the subfolders, skipping subfolders which can't
+        # contain any folder matching the folder filters
+        subfolders = []
+        if self._folder_filter_trie.could_match_below(short_remote_path):
+            subfolders = [
+                subfolder
+                for subfolder in self._prefetcher.get(self._fetch_subfolders, remote_path)
+                if self._folder_filter_trie.could_match(
+                    self._remove_sharepoint_dir_prefix(
+                        self._remove_url_prefix(subfolder + "/")
+                    )
+                )
+                # folders which an interrupted run completed don't need to be listed again
+                and not self._is_completed_folder(subfolder + "/")
+            ]
+        for subfolder in subfolders:
+            short_subfolder_path = self._remove_sharepoint_dir_prefix(
+                self._remove_url_prefix(subfolder + "/")
+            )
+            if self._folder_filter_trie.could_match_below(short_subfolder_path):
+                self._prefetcher.prefetch(self._fetch_subfolders, subfolder + "/")
+            if self._is_included_by_folder_filters(short_subfolder_path):
+                self._prefetcher.prefetch(self._fetch_files, subfolder + "/")
         for subfolder in subfolders:
             assert subfolder.startswith(
                 self._relative_url_prefix + "/" + self._sharepoint_dir
             ), (
                 f"{subfolder} should start with {self._relative_url_prefix + '/' + self._sharepoint_dir}, but doesn't!"
             )
-            self.download_folder(subfolder + "/")
+            self._download_folder(subfolder + "/")
 
         # skip checking files in folders which are not in the include list by our filters
-        short_remote_path = self._remove_sharepoint_dir_prefix(
-            self._remove_url_prefix(remote_path)
-        )
-        if self._folder_filters and not any(
-            [fnmatch(short_remote_path, filter) for filter in self._folder_filters]
-        ):
+        if not is_included:
+            self._record_completed_folder(remote_path)
             return
 
         # go through list of files and match it with our filter expressions
-        files = self._fetch_files(remote_path)
+        files = self._prefetcher.get(self._fetch_files, remote_path)
         files_selectors = self._get_files_selectors_for_file_path(short_remote_path)
+        files_to_download = []
         downloaded_files_per_selector: List[List[str]] = [[] for _ in files_selectors]
         for file in files:
+            listed_fields = self._listed_fields.pop(
+                (remote_path.removesuffix("/"), file), None
+            )
             matching_files_selector_index = None
             if files_selectors:
                 for index, files_selector in enumerate(files_selectors):
@@ -160,6 +239,35 @@ class SharepointFetcherOnPremise(SharepointFetcher):
                 else:
                     # our current file doesn't match any files filter
                     continue
+                if self._is_excluded_by_listed_fields(
+                    short_remote_path + file, listed_fields, files_selectors
+                ):
+                    logger.debug(
+                        "Skipping file `{}` because it doesn't match filter criteria.", file
+                    )
+                    continue
+            if self._completed_file(remote_path + file) is not None:
+                logger.info(
+                    "File `{}` in path `{}` was already fetched by the interrupted run",
+                    file,
+                    output_path,
+                )
+                if matching_files_selector_index is not None:
+                    downloaded_files_per_selector[matching_files_selector_index].append(file)
+                continue
+            files_to_download.append((file, matching_files_selector_index))
+            self._prefetcher.prefetch(
+                self._connect.get_file_properties, remote_path.removesuffix("/"), file
+            )
+
+        for position, (file, matching_files_selector_index) in enumerate(files_to_download):
+            # only fetch the contents of the next few files ahead, so that not
+            # all files of a large folder end up in memory at the same time
+            next_files = files_to_download[
+                position : position + self._prefetcher.max_parallel_requests
+            ]
+            for next_file, _ in next_files:
+                self._prefetch_file_contents(remote_path, next_file, files_selectors)
 
             did_download_file = self._download_file(
                 output_path, remote_path, file, files_selectors=files_selectors
@@ -256,6 +364,8 @@ class SharepointFetcherOnPremise(SharepointFetcher):
                         )
                     logger.info("{}: {}", title, ", ".join([f"<{url}>" for url in urls]))
 
+        self._record_completed_folder(remote_path)
+
     def download_custom_property_definitions(self):
         result = {}
         lists_with_items = self._connect.verify_site_lists(
@@ -300,21 +410,31 @@ class SharepointFetcherOnPremise(SharepointFetcher):
         """
         if remote_path.endswith("/"):
             remote_path = remote_path[:-1]
-
+        try:
+            return self._fetch_file(output_path, remote_path, file_name, files_selectors)
+        finally:
+            # the size listed with the file is only needed while the file is
+            # fetched, also if the file is skipped or fetching it fails
+            self._connect.forget_file_size(remote_path, file_name)
+
+    def _fetch_file(
+        self,
+        output_path: Path,
+        remote_path: str,
+        file_name: str,
+        files_selectors: Optional[List[FilesSelectors]],
+    ) -> bool:
         assert remote_path.startswith(self._relative_url_prefix), (
             f"{remote_path} should start with {self._relative_url_prefix}, but doesn't!"
         )
 
         # download file properties
-        file_properties = self._connect.get_file_properties(remote_path, file_name)
-
-        self.save_file(
-            output_path,
-            file_name + self.metadata_file_suffix,
-            json.dumps(file_properties, indent=2),
-            True,
+        file_properties = self._prefetcher.get(
+            self._connect.get_file_properties, remote_path, file_name
         )
 
+        self.save_properties(output_path, file_name, file_properties, True)
+
         # find matching files_selectors
         if files_selectors:
             files_selectors = list(
@@ -344,12 +464,7 @@ class SharepointFetcherOnPremise(SharepointFetcher):
                         )
                         raise
 
-                    matches = check(
-                        checked_value=property_value,
-                        operator=selector.operator,
-                        other_value=selector.other_value,
-                    )
-                    if not matches:
+                    if not selector.matches(property_value):
                         logger.debug(
                             "Removing local file `{}` because it doesn't match filter criteria.",
                             file_name + self.metadata_file_suffix,
@@ -359,17 +474,101 @@ class SharepointFetcherOnPremise(SharepointFetcher):
                         )
                         return False
 
-        # download file
-        if not self._download_properties_only:
-            file_contents = self._connect.get_file_object(remote_path, file_name)
+        manifest_key = remote_path + "/" + file_name
+        if self._download_properties_only:
+            if self._is_recording_files():
+                entry = self._manifest_entry(
+                    output_path, remote_path, file_name, file_properties
+                )
+                if self._manifest is not None:
+                    self._manifest.record(manifest_key, entry)
+                self._record_completed_file(manifest_key, entry)
+            return True
+
+        # download file, unless it is unchanged since the last incremental run
+        unchanged_entry = None
+        if self._manifest is not None:
+            unchanged_entry = self._manifest.unchanged(
+                manifest_key,
+                self._manifest_entry(output_path, remote_path, file_name, file_properties),
+            )
+        if unchanged_entry is not None:
+            sha256 = unchanged_entry.sha256
+        else:
+            file_contents = self._prefetcher.get(
+                self._connect.get_file_object, remote_path, file_name
+            )
+            sha256 = file_contents.sha256
+        self.save_properties(
+            output_path, file_name, {**file_properties, self.sha256_property: sha256}, True
+        )
+        logger.info(
+            "File `{}` was saved in path `{}`",
+            file_name + self.metadata_file_suffix,
+            output_path,
+        )
+        if unchanged_entry is not None:
+            assert self._manifest is not None
+            self._manifest.keep(manifest_key)
+            self._record_completed_file(manifest_key, unchanged_entry)
             logger.info(
-                "File `{}` was saved in path `{}`",
-                file_name + self.metadata_file_suffix,
+                "File `{}` in path `{}` is unchanged and was not downloaded again",
+                file_name,
                 output_path,
             )
-            self.save_file(output_path, file_name, file_contents, False)
+            return True
+
+        self.save_file(output_path, file_name, file_contents, False)
+        if self._is_recording_files():
+            entry = self._manifest_entry(
+                output_path, remote_path, file_name, file_properties, sha256
+            )
+            if self._manifest is not None:
+                self._manifest.record(manifest_key, entry)
+            self._record_completed_file(manifest_key, entry)
         return True
 
+    def _manifest_entry(
+        self,
+        output_path: Path,
+        remote_path: str,
+        file_name: str,
+        file_properties: Dict[str, Any],
+        sha256: Optional[str] = None,
+    ) -> ManifestEntry:
+        return ManifestEntry(
+            path=(output_path / file_name).relative_to(self._destination_path).as_posix(),
+            etag=file_properties.get("__metadata", {}).get("etag"),
+            modified=file_properties.get("Modified"),
+            size=self._connect.get_file_size(remote_path, file_name),
+            sha256=sha256,
+        )
+
+    def _prefetch_file_contents(
+        self, remote_path: str, file_name: str, files_selectors: List[FilesSelectors]
+    ):
+        """
+        Start fetching the contents of a file which `_download_file` will save.
+
+        The contents are only fetched ahead of time if they are downloaded
+        anyway, i.e. if no selector needs to check the file properties first
+        and the file wasn't fetched by an earlier incremental run.
+        """
+        if self._download_properties_only:
+            return
+        remote_path = remote_path.removesuffix("/")
+        if self._manifest is not None and self._manifest.get(remote_path + "/" + file_name):
+            return
+        short_file_path = self._remove_sharepoint_dir_prefix(
+            self._remove_url_prefix(remote_path + "/" + file_name)
+        )
+        if not any(
+            files_selector.selectors
+            for files_selector in files_selectors
+            if fnmatch(short_file_path, files_selector.filter)
+        ):
+            self._prefetcher.prefetch(self._connect.get_file_object, remote_path, file_name)
+
     def _fetch_subfolders(self, remote_path: str) -> List[str]:
         """
         Fetch list of all subfolders of a given path.
@@ -390,16 +589,102 @@ class SharepointFetcherOnPremise(SharepointFetcher):
         result = self._connect.get_folders(remote_path)
         return self.frame_list_from_dict(result, "folders")
 
+    def _is_excluded_by_listed_fields(
+        self,
+        short_file_path: str,
+        listed_fields: Optional[Dict[str, Any]],
+        files_selectors: List[FilesSelectors],
+    ) -> bool:
+        """
+        Check whether the listed fields of a file show that it doesn't match the selectors.
+
+        The selectors are checked in the same order as in `_download_file`.
+        If in doubt, e.g. because a field wasn't listed, the file is not
+        excluded, so that `_download_file` checks it with all its properties.
+        """
+        if listed_fields is None:
+            return False
+        for files_selector in files_selectors:
+            if not fnmatch(short_file_path, files_selector.filter):
+                continue
+            for selector in files_selector.selectors:
+                try:
+                    property_value = self._properties_reader.get_property(
+                        listed_fields, selector.property, Path(short_file_path)
+                    )
+                except (AutopilotError, KeyError, OSError):
+                    return False
+                if not selector.matches(property_value):
+                    return True
+        return False
+
+    def _odata_field_name(self, property_name: str) -> Optional[str]:
+        """Return the OData field to filter `property_name` with, if it can be filtered."""
+        if self._properties_reader.field_name(property_name) != property_name:
+            # the values of custom properties are only mapped to their titles locally
+            return None
+        return "ListItemAllFields/" + property_name
+
     def _fetch_files(self, remote_path: str) -> List[str]:
         """
         Fetch list of file names.
 
         Fetches list of names of all files present inside the folder passed
         through parameter.
+
+        If the files of the folder are selected by file properties, these
+        properties are fetched in the same request and kept for
+        `_is_excluded_by_listed_fields`. Selectors which can be translated
+        into an OData `$filter` (see `files_selectors_to_odata_filter`) are
+        also passed to the server, so that most files which don't match are
+        not even listed. The selectors are still checked for the listed
+        files, and if the server rejects the filter, all files are listed.
         """
         assert remote_path.startswith(self._relative_url_prefix), (
             f"{remote_path} should start with {self._relative_url_prefix}, but doesn't!"
         )
+        files_selectors = self._get_files_selectors_for_file_path(
+            self._remove_sharepoint_dir_prefix(self._remove_url_prefix(remote_path))
+        )
+        fields = sorted(
+            {
+                self._properties_reader.field_name(selector.property)
+                for files_selector in files_selectors
+                for selector in files_selector.selectors
+            }
+        )
+        if fields:
+            odata_filters = [
+                files_selectors_to_odata_filter(files_selectors, self._odata_field_name)
+            ]
+            if odata_filters[0] is not None:
+                odata_filters.append(None)
+            for odata_filter in odata_filters:
+                try:
+                    if odata_filter:
+                        result = self._connect.get_files(
+                            remote_path, fields, odata_filter=odata_filter
+                        )
+                    else:
+                        result = self._connect.get_files(remote_path, fields)
+                except requests.exceptions.HTTPError as e:
+                    # e.g. if a selector uses an unknown property or if the
+                    # server can't filter by the type of a property
+                    if e.response is None or e.response.status_code != 400:
+                        raise
+                    logger.debug(
+                        "Could not list files of `{}` together with properties {}{}",
+                        remote_path,
+                        ", ".join(fields),
+                        f" and filter `{odata_filter}`" if odata_filter else "",
+                    )
+                    continue
+                for item in result:
+                    if isinstance(item.get("ListItemAllFields"), dict):
+                        self._listed_fields[(remote_path.removesuffix("/"), item["Name"])] = (
+                            item["ListItemAllFields"]
+                        )
+                return self.frame_list_from_dict(result, "files")
         result = self._connect.get_files(remote_path)
         return self.frame_list_from_dict(result, "files")
 
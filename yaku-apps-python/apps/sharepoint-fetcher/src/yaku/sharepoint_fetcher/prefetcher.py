@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .downloads import DownloadedFile
+
+
+class Prefetcher:
+    """
+    Start requests ahead of time in a bounded thread pool.
+
+    The fetchers walk through a SharePoint folder tree one request after
+    another, which makes a full fetch bound by the round-trip latency. With a
+    prefetcher, the fetcher announces calls it will make later with
+    `prefetch(function, *args)`, and then makes them in its usual order with
+    `get(function, *args)`. If the call was prefetched, `get` returns (or
+    raises) its result, waiting for it if necessary, otherwise it simply calls
+    the function.
+
+    As the results are always consumed in the order in which the fetcher
+    needs them, files are saved and results are logged in the same order as
+    without prefetching.
+
+    Prefetching only happens inside of the `running()` context and if more
+    than one parallel request is allowed. When the context is left, e.g.
+    because a download failed, the temporary files of prefetched downloads
+    which were never used are removed.
+    """
+
+    def __init__(self, max_parallel_requests: int = 1):
+        self.max_parallel_requests = max_parallel_requests
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[Tuple[Callable, Tuple], Future] = {}
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        """Prefetch calls in background threads while inside this context."""
+        if self._executor is not None or self.max_parallel_requests < 2:
+            yield
+            return
+        self._executor = ThreadPoolExecutor(
+            self.max_parallel_requests, thread_name_prefix="prefetch"
+        )
+        try:
+            yield
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            for future in self._futures.values():
+                _discard_unused_result(future)
+            self._futures.clear()
+
+    def prefetch(self, function: Callable, *args: Any) -> None:
+        if self._executor is None:
+            return
+        key = (function, args)
+        if key not in self._futures:
+            self._futures[key] = self._executor.submit(function, *args)
+
+    def get(self, function: Callable, *args: Any) -> Any:
+        future = self._futures.pop((function, args), None)
+        if future is None:
+            return function(*args)
+        return future.result()
+
+
+def _discard_unused_result(future: Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if isinstance(result, DownloadedFile):
+        result.temporary_path.unlink(missing_ok=True)
@@ -2,10 +2,27 @@
 #
 # SPDX-License-Identifier: MIT
 
-from dataclasses import dataclass
-from typing import List, Optional, Union
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Union
 
-from yaku.autopilot_utils.checks import checks_dict
+from yaku.autopilot_utils.checks import (
+    CompiledCheck,
+    checks_dict,
+    compile_check,
+    convert_to_date,
+    convert_to_seconds,
+    equals,
+    larger,
+    larger_equal,
+    less,
+    less_equal,
+    not_older,
+    older,
+)
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
 
 from .config import FilterConfigFileContent
@@ -16,6 +33,9 @@ class Selector:
     property: str
     operator: str
     other_value: Optional[Union[str, int, float]] = None
+    _compiled_check: Optional[CompiledCheck] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.operator not in checks_dict:
@@ -26,6 +46,65 @@ class Selector:
     def __str__(self) -> str:
         return f"Selector({self.property}=>{self.operator}=>{self.other_value})"
 
+    def matches(self, value) -> bool:
+        """
+        Check if `value` fulfills this selector.
+
+        The selector's operator and value are compiled on first use and then reused.
+        """
+        if self._compiled_check is None:
+            self._compiled_check = compile_check(self.operator, self.other_value)
+        return self._compiled_check(value)
+
+    def to_odata_filter(self, field_name: str, now: Optional[float] = None) -> Optional[str]:
+        """
+        Translate this selector into an OData `$filter` expression for `field_name`.
+
+        Only operators which map cleanly are translated: `equals` with a
+        non-numeric text, the number comparisons and the date age checks
+        (`is-older-than`, `is-not-older-than`). For all other selectors, None
+        is returned and the selector can only be checked with `matches`.
+
+        The expression never excludes a value which `matches` would accept,
+        but it may include values which `matches` rejects (e.g. as text
+        comparisons on the server are case-insensitive), so `matches` must
+        still be checked for the returned items. Empty values are kept for
+        comparisons, as `matches` raises an error for them. Date ages are
+        relative to `now` (default: the current time) and the cutoff is
+        widened by a day, so that it doesn't matter when `matches` is called.
+        """
+        if not _ODATA_FIELD_NAME_PATTERN.fullmatch(field_name):
+            return None
+        check_function = checks_dict[self.operator]
+        other_value = self.other_value
+        if isinstance(other_value, bool) or not isinstance(other_value, (str, int, float)):
+            return None
+        if check_function is equals:
+            if not isinstance(other_value, str) or not other_value or _is_number(other_value):
+                return None
+            return f"{field_name} eq '{_quote_odata_string(other_value)}'"
+        if check_function in _ODATA_COMPARISON_OPERATORS:
+            if not _is_number(other_value):
+                return None
+            number = _format_odata_number(float(other_value))
+            if number is None:
+                return None
+            odata_operator = _ODATA_COMPARISON_OPERATORS[check_function]
+            return f"({field_name} {odata_operator} {number} or {field_name} eq null)"
+        if check_function in (older, not_older):
+            cutoff = _date_age_cutoff(other_value, time.time() if now is None else now)
+            if cutoff is None:
+                return None
+            if check_function is older:
+                odata_operator, cutoff = "lt", cutoff + _ODATA_DATE_MARGIN
+            else:
+                odata_operator, cutoff = "ge", cutoff - _ODATA_DATE_MARGIN
+            return (
+                f"({field_name} {odata_operator} {_format_odata_datetime(cutoff)}"
+                f" or {field_name} eq null)"
+            )
+        return None
+
     def nice(self) -> str:
         """Provide a nice string representation of the selector."""
         try:
@@ -36,6 +115,51 @@ class Selector:
             return str(self)
 
 
+_ODATA_FIELD_NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(/[A-Za-z_][A-Za-z0-9_]*)*")
+
+_ODATA_COMPARISON_OPERATORS = {larger: "gt", larger_equal: "ge", less: "lt", less_equal: "le"}
+
+_ODATA_DATE_MARGIN = 86400
+
+
+def _is_number(value: Union[str, int, float]) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _quote_odata_string(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _format_odata_number(number: float) -> Optional[str]:
+    if not math.isfinite(number):
+        return None
+    if number.is_integer() and abs(number) < 2**53:
+        return str(int(number))
+    text = repr(number)
+    return None if "e" in text else text
+
+
+def _format_odata_datetime(timestamp: float) -> str:
+    date = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    return f"datetime'{date.strftime('%Y-%m-%dT%H:%M:%SZ')}'"
+
+
+def _date_age_cutoff(other_value: Union[str, int, float], now: float) -> Optional[float]:
+    """Return the timestamp which `older`/`not_older` compare dates with."""
+    try:
+        other_date = convert_to_date(other_value)
+        if other_date is not None:
+            return other_date
+        return now - convert_to_seconds(str(other_value))
+    except Exception:
+        # leave invalid values to the client-side check, which reports them
+        return None
+
+
 @dataclass
 class FilesSelectors:
     filter: str
@@ -47,6 +171,46 @@ class FilesSelectors:
         return f"FilesSelector(filter: `{self.filter}`, selectors: [{', '.join([str(s) for s in self.selectors])}])"
 
 
+def files_selectors_to_odata_filter(
+    files_selectors: List[FilesSelectors],
+    odata_field_name: Callable[[str], Optional[str]],
+    now: Optional[float] = None,
+) -> Optional[str]:
+    """
+    Translate the selectors of all `files_selectors` into one OData `$filter` expression.
+
+    A file is only selected if it matches all selectors of a files selector,
+    so the translatable selectors of each files selector are combined with
+    `and`, and the files selectors are combined with `or`. Selectors which
+    can't be translated (see `Selector.to_odata_filter`) are left out, which
+    only makes the expression less strict. `odata_field_name` returns the
+    name of the OData field for a selector property, or None if the property
+    can't be filtered on the server.
+
+    Returns None if the expression wouldn't exclude any file.
+    """
+    if now is None:
+        now = time.time()
+    alternatives = []
+    for files_selector in files_selectors:
+        conditions = []
+        for selector in files_selector.selectors:
+            field_name = odata_field_name(selector.property)
+            if field_name is None:
+                continue
+            condition = selector.to_odata_filter(field_name, now)
+            if condition is not None and condition not in conditions:
+                conditions.append(condition)
+        if not conditions:
+            return None
+        alternatives.append(" and ".join(conditions))
+    if not alternatives:
+        return None
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return " or ".join(f"({alternative})" for alternative in alternatives)
+
+
 def parse_filter_config_file_data(
     filter_config_file_data: FilterConfigFileContent,
 ) -> List[FilesSelectors]:
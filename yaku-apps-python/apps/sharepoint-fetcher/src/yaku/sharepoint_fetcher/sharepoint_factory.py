@@ -27,6 +27,10 @@ class SharePointFetcherFactory:
                 list_title_property_map=list_title_property_map,
                 download_properties_only=settings.download_properties_only,
                 filter_config=filter_config_file_data,
+                max_parallel_requests=settings.max_parallel_requests,
+                max_requests_per_second=settings.max_requests_per_second,
+                incremental=settings.incremental,
+                resume=settings.resume,
             )
         elif settings.is_cloud == True:  # Still keeping this clause for clarity
             return SharepointFetcherCloud(
@@ -39,4 +43,7 @@ class SharePointFetcherFactory:
                 force_ip=settings.force_ip,
                 download_properties_only=settings.download_properties_only,
                 filter_config=filter_config_file_data,
+                max_requests_per_second=settings.max_requests_per_second,
+                incremental=settings.incremental,
+                resume=settings.resume,
             )
@@ -2,19 +2,33 @@
 #
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import json
 import os
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from contextlib import contextmanager
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Dict, List, Mapping, Optional, Tuple, Union
+from typing import Any, ContextManager, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 
 from loguru import logger
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
+from yaku.sharepoint_fetcher.checkpoint import Checkpoint
+from yaku.sharepoint_fetcher.downloads import DownloadedFile, write_atomically
+from yaku.sharepoint_fetcher.folder_filters import FolderFilterTrie
+from yaku.sharepoint_fetcher.manifest import Manifest, ManifestEntry
 from yaku.sharepoint_fetcher.selectors import FilesSelectors
+from yaku.sharepoint_fetcher.utils import PropertiesStore
 
 
 class SharepointFetcher(ABC):
+    # property in the metadata file which holds the SHA-256 hash of the downloaded file
+    sha256_property = "__sha256__"
+
+    # used for storing the file metadata in a JSON file next to the downloaded file
+    metadata_file_suffix = ".__properties__.json"
+
     def __init__(
         self,
         sharepoint_dir: Optional[str],
@@ -23,6 +37,8 @@ class SharepointFetcher(ABC):
         download_properties_only: Optional[bool] = False,
         list_title_property_map: Optional[Dict[str, str]] = None,
         filter_config: Optional[List[FilesSelectors]] = None,
+        incremental: Optional[bool] = False,
+        resume: Optional[bool] = False,
     ):
         if sharepoint_dir is not None and sharepoint_site is not None:
             assert sharepoint_dir.endswith("/"), (
@@ -62,6 +78,19 @@ class SharepointFetcher(ABC):
                     self._folder_filters,
                     self._files_selectors,
                 ) = self._generate_filters_and_selectors(filter_config)
+            self._folder_filter_trie = FolderFilterTrie(self._folder_filters)
+
+            self._manifest: Optional[Manifest] = None
+            if incremental:
+                self._manifest = Manifest(destination_path, self.metadata_file_suffix)
+
+            self._resume = resume
+            # journal of the completed work while a folder is downloaded with `resume`
+            self._checkpoint: Optional[Checkpoint] = None
+
+            self._properties_store = PropertiesStore(
+                destination_path / PropertiesStore.filename
+            )
         else:
             raise AutopilotConfigurationError(
                 "Missing values for the SharePoint site and path! Make sure you either "
@@ -128,6 +157,93 @@ class SharepointFetcher(ABC):
             output_path, self._relative_url_prefix + "/" + remote_path, file_name
         )
 
+    @contextmanager
+    def _incremental_run(self) -> Iterator[None]:
+        """
+        Update the manifest of an incremental fetch with the files fetched inside this context.
+
+        Local files which were fetched by an earlier run but not by this one
+        are only removed if the run completes without errors.
+        """
+        if self._manifest is None:
+            yield
+            return
+        os.makedirs(self._destination_path, exist_ok=True)
+        try:
+            yield
+            self._manifest.remove_unseen()
+        finally:
+            self._manifest.save()
+
+    def _properties_run(self) -> ContextManager[None]:
+        """Commit the file properties which are saved inside this context to the properties store."""
+        return self._properties_store.writing()
+
+    @contextmanager
+    def _checkpointed_run(self) -> Iterator[None]:
+        """
+        Record the folders and files which are completed inside this context in a checkpoint.
+
+        Only used with `resume`: if an earlier run into the same destination
+        path was interrupted, the folders and files which that run completed
+        are skipped (see `Checkpoint`). They are also recorded in the manifest
+        of an incremental fetch, so that they are kept. The checkpoint is
+        removed once the context is left without errors.
+        """
+        if not self._resume:
+            yield
+            return
+        os.makedirs(self._destination_path, exist_ok=True)
+        checkpoint = Checkpoint(
+            self._destination_path, self.metadata_file_suffix, self._checkpoint_run_key()
+        )
+        if self._manifest is not None:
+            for key, entry in checkpoint.files():
+                self._manifest.record(key, entry)
+        checkpoint.open()
+        self._checkpoint = checkpoint
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            self._checkpoint = None
+            checkpoint.close(completed)
+
+    def _checkpoint_run_key(self) -> str:
+        """Identify the fetched folder and filters, so that only the same run is resumed."""
+        run = (
+            type(self).__name__,
+            self._sharepoint_site,
+            self._sharepoint_dir,
+            bool(self._download_properties_only),
+            sorted(self._files_selectors.items()),
+        )
+        return hashlib.sha256(repr(run).encode("utf-8")).hexdigest()
+
+    def _is_recording_files(self) -> bool:
+        """Check whether fetched files are recorded in a manifest or checkpoint."""
+        return self._manifest is not None or self._checkpoint is not None
+
+    def _completed_file(self, key: str) -> Optional[ManifestEntry]:
+        """Return the entry of a file which an interrupted run already fetched completely."""
+        if self._checkpoint is None:
+            return None
+        return self._checkpoint.completed_file(
+            key, with_contents=not self._download_properties_only
+        )
+
+    def _record_completed_file(self, key: str, entry: ManifestEntry):
+        if self._checkpoint is not None:
+            self._checkpoint.record_file(key, entry)
+
+    def _is_completed_folder(self, remote_path: str) -> bool:
+        return self._checkpoint is not None and self._checkpoint.completed_folder(remote_path)
+
+    def _record_completed_folder(self, remote_path: str):
+        if self._checkpoint is not None:
+            self._checkpoint.record_folder(remote_path)
+
     def _unlink_local_file(self, path: Path):
         """Wrap Path.unlink for easier mocking during tests."""
         path.unlink()
@@ -136,18 +252,44 @@ class SharepointFetcher(ABC):
         self,
         path: Path,
         file_name: str,
-        contents: Union[bytes, str],
+        contents: Union[bytes, str, DownloadedFile],
         enable_logging: bool,
     ):
-        if isinstance(contents, str):
-            contents = contents.encode("utf-8")
         file_dir_path = Path.cwd().joinpath(path).joinpath(file_name)
-        with open(file_dir_path, "wb") as f:
-            f.write(contents)
-            f.close()
+        if isinstance(contents, DownloadedFile):
+            # the temporary file is in the destination path, so it can be moved atomically
+            os.replace(contents.temporary_path, file_dir_path)
+        else:
+            write_atomically(file_dir_path, contents)
         if not enable_logging:
             logger.info("File `{}` was saved in path `{}`", file_name, path)
 
+    def save_properties(
+        self,
+        path: Path,
+        file_name: str,
+        properties: Dict[str, Any],
+        enable_logging: bool,
+    ):
+        """
+        Save the properties of the file `file_name` next to it and in the properties store.
+
+        The properties file is the primary copy, the entry in the
+        `PropertiesStore` only allows faster lookups.
+        """
+        self.save_file(
+            path,
+            file_name + self.metadata_file_suffix,
+            json.dumps(properties, indent=2),
+            enable_logging,
+        )
+        file_path = Path.cwd().joinpath(path).joinpath(file_name)
+        self._properties_store.put(
+            file_path,
+            file_path.with_name(file_name + self.metadata_file_suffix),
+            json.dumps(properties),
+        )
+
     def _generate_filters_and_selectors(
         self, filter_config: List[FilesSelectors]
     ) -> Tuple[List[str], Mapping[str, List[FilesSelectors]]]:
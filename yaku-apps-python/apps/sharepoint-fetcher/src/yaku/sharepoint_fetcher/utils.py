@@ -10,19 +10,173 @@
 #####################################################
 
 
+import itertools
 import json
+import os
+import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
+from loguru import logger
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
 
+PROPERTIES_FILE_SUFFIX = ".__properties__.json"
+
+
+def _relative_key(path: Path, base_path: Path) -> Optional[str]:
+    """Return `path` relative to `base_path` as POSIX path, or None if it is outside."""
+    relative_path = os.path.relpath(Path.cwd().joinpath(path), Path.cwd().joinpath(base_path))
+    if relative_path == ".." or relative_path.startswith(".." + os.sep):
+        return None
+    return Path(relative_path).as_posix()
+
+
+class PropertiesStore:
+    """
+    Consolidated store of the properties of all files in a folder tree.
+
+    Next to the `*.__properties__.json` file of every fetched file, the
+    fetcher records the properties in one SQLite database in the destination
+    path, indexed by the path of the file relative to the destination path.
+    This allows readers to look up the properties of a file without opening
+    and parsing one small JSON file per file.
+
+    The store is only an index of the properties files: every entry keeps
+    the modification time and size of the properties file it was recorded
+    from, and `get` only returns the entry if the properties file is
+    unchanged. Otherwise (and for folder trees without a store), the
+    properties file must be read instead.
+    """
+
+    filename = "__properties__.sqlite"
+
+    # number of recorded entries after which they are committed to the database
+    commit_interval = 1000
+
+    def __init__(self, path: Path, read_only: bool = False):
+        self.path = path
+        self._base_path = path.parent
+        self._read_only = read_only
+        self._connection: Optional[sqlite3.Connection] = None
+        self._uncommitted = 0
+        self._failed = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._connection is not None or self._failed:
+            return self._connection
+        try:
+            if self._read_only:
+                if not self.path.is_file():
+                    self._failed = True
+                    return None
+                uri = Path.cwd().joinpath(self.path).as_uri() + "?mode=ro"
+                self._connection = sqlite3.connect(uri, uri=True)
+            else:
+                self._connection = sqlite3.connect(self.path)
+                # the properties files are the primary copy, so there is no need to wait for the disk
+                self._connection.execute("PRAGMA synchronous = OFF")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS properties (path TEXT PRIMARY KEY, "
+                    "mtime_ns INTEGER, size INTEGER, properties TEXT) WITHOUT ROWID"
+                )
+        except sqlite3.Error as e:
+            logger.warning("Cannot use properties store `{}`: {}", self.path, e)
+            self._failed = True
+        return self._connection
+
+    def put(self, file_path: Path, properties_file: Path, properties: str):
+        """Record the JSON `properties` of `file_path`, which were written to `properties_file`."""
+        key = _relative_key(file_path, self._base_path)
+        if key is None:
+            return
+        try:
+            stat = properties_file.stat()
+        except OSError:
+            return
+        connection = self._connect()
+        if connection is None:
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO properties VALUES (?, ?, ?, ?)",
+            (key, stat.st_mtime_ns, stat.st_size, properties),
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_interval:
+            self.commit()
+
+    def get(
+        self, file_path: Path, properties_stat: os.stat_result
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the recorded properties of `file_path`.
+
+        Returns None if there is no entry or if the properties file (with the
+        given `properties_stat`) changed since the entry was recorded.
+        """
+        key = _relative_key(file_path, self._base_path)
+        connection = self._connect()
+        if key is None or connection is None:
+            return None
+        try:
+            row: Optional[Tuple[int, int, str]] = connection.execute(
+                "SELECT mtime_ns, size, properties FROM properties WHERE path = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Cannot use properties store `{}`: {}", self.path, e)
+            self.close()
+            self._failed = True
+            return None
+        if row is None or row[:2] != (properties_stat.st_mtime_ns, properties_stat.st_size):
+            return None
+        return json.loads(row[2])  # type: ignore
+
+    def commit(self):
+        if self._connection is not None and self._uncommitted:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        if self._connection is not None:
+            self.commit()
+            self._connection.close()
+            self._connection = None
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        """Commit all entries recorded inside this context when it is left."""
+        try:
+            yield
+        finally:
+            self.close()
+
 
 class PropertiesReader:
-    def __init__(self, custom_property_definitions_file: Path):
-        self._cache: Dict[str, Any] = {}
+    """
+    Read the properties of fetched files.
+
+    The properties are looked up in the `PropertiesStore` given by
+    `properties_store` (if any) and otherwise read from the
+    `*.__properties__.json` file next to the file. The properties of the
+    last `cache_size` files are kept in memory.
+    """
+
+    cache_size = 1024
+
+    # maximum number of other files which are listed if a file doesn't exist
+    max_listed_alternatives = 20
+
+    def __init__(
+        self, custom_property_definitions_file: Path, properties_store: Optional[Path] = None
+    ):
+        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         self._property_map: Optional[Dict[str, Dict[str, str]]] = None
         self._property_name_map: Dict[str, str] = {}
         self._custom_property_definitions_file = custom_property_definitions_file
+        self._properties_store: Optional[PropertiesStore] = None
+        if properties_store is not None:
+            self._properties_store = PropertiesStore(properties_store, read_only=True)
 
     @property
     def property_map(self):
@@ -76,36 +230,87 @@ class PropertiesReader:
         the id is automatically replaced by the list value, e.g. instead
         of a `Status=1`, you'll get a `Status="Draft"` or similar.
         """
-        properties_file = file_path.with_suffix(file_path.suffix + ".__properties__.json")
+        return self.get_property(self.load_properties(file_path), property_name, file_path)
 
-        if not file_path.exists() and not properties_file.exists():
-            other_possible_files = file_path.parent.glob("*")
-            alternatives_list = "".join([f"- {p}\n" for p in other_possible_files])
-            raise AutopilotConfigurationError(
-                f"Cannot read file properties for {file_path}. File doesn't exist! "
-                "There are only the following files:\n"
-                f"{alternatives_list}"
-            )
+    def get_file_properties(
+        self, file_path: Path, property_names: Iterable[str]
+    ) -> Dict[str, Any]:
+        """
+        Get several properties of a file at once.
+
+        Returns the values of `property_names` (see `get_file_property`) by
+        property name, the other properties of the file are left out.
+        """
+        properties = self.load_properties(file_path)
+        return {
+            property_name: self.get_property(properties, property_name, file_path)
+            for property_name in property_names
+        }
 
+    def load_properties(self, file_path: Path) -> Dict[str, Any]:
+        """Return all properties of a file, as stored in its properties file."""
+        properties_file = file_path.with_suffix(file_path.suffix + PROPERTIES_FILE_SUFFIX)
         cache_key = str(properties_file)
-        if cache_key not in self._cache:
+        properties = self._cache.get(cache_key)
+        if properties is not None:
+            self._cache.move_to_end(cache_key)
+            return properties
+
+        try:
+            properties_stat = properties_file.stat()
+        except OSError:
+            if not file_path.exists():
+                other_possible_files = list(
+                    itertools.islice(
+                        file_path.parent.glob("*"), self.max_listed_alternatives + 1
+                    )
+                )
+                alternatives_list = "".join(
+                    [f"- {p}\n" for p in other_possible_files[: self.max_listed_alternatives]]
+                )
+                if len(other_possible_files) > self.max_listed_alternatives:
+                    alternatives_list += "- ...\n"
+                raise AutopilotConfigurationError(
+                    f"Cannot read file properties for {file_path}. File doesn't exist! "
+                    "There are only the following files:\n"
+                    f"{alternatives_list}"
+                )
+            raise
+
+        properties = None
+        if self._properties_store is not None:
+            properties = self._properties_store.get(file_path, properties_stat)
+        if properties is None:
             with properties_file.open("r") as fh:
-                properties: dict[str, Any] = json.load(fh)
-            self._cache[cache_key] = properties
+                properties = json.load(fh)
+        self._cache[cache_key] = properties
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return properties
 
+    def field_name(self, property_name: str) -> str:
+        """Return the name of the file property which holds `property_name`."""
+        return self._property_name_map.get(property_name, property_name)
+
+    def get_property(
+        self, properties: Dict[str, Any], property_name: str, file_path: Path
+    ) -> Any:
+        """
+        Get property from the already loaded `properties` of a file.
+
+        Works like `get_file_property`, `file_path` is only used for error messages.
+        """
         try:
             if property_name in self._property_name_map:
                 alias_name = self._property_name_map[property_name]
-                property_value = self._cache[cache_key][alias_name]
+                property_value = properties[alias_name]
             else:
-                property_value = self._cache[cache_key][property_name]
+                property_value = properties[property_name]
                 return property_value if property_value is not None else ""
             if property_value is None:
                 return ""
         except KeyError:
-            valid_names = set(self._cache[cache_key].keys()) | set(
-                self._property_name_map.keys()
-            )
+            valid_names = set(properties.keys()) | set(self._property_name_map.keys())
             # TODO: is this a configuration error?
             raise AutopilotConfigurationError(
                 f"Could not get property `{property_name}` for `{file_path}`! "
@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import pytest
+from loguru import logger
+from yaku.sharepoint_fetcher.on_premise.sharepoint_fetcher_on_premise import (
+    SharepointFetcherOnPremise,
+)
+from yaku.sharepoint_fetcher.utils import PropertiesStore
+
+LATENCY = 0.01
+SITE = "/sites/123456"
+ROOT = SITE + "/Documents/reports"
+
+FOLDER_REQUEST = re.compile(r".*/GetFolderByServerRelativeUrl\('(.*)/'\)/(folders|files)$")
+FILE_REQUEST = re.compile(
+    r".*/GetFileByServerRelativePath\(decodedurl='(.*)'\)/(ListItemAllFields|\$value|Properties)$"
+)
+
+
+def make_tree(subfolders_per_level=(4, 3), files_per_folder=3):
+    """Return a map from folder path to its subfolders and files."""
+    tree = {}
+    folders = [ROOT]
+    for number_of_subfolders in (*subfolders_per_level, 0):
+        next_folders = []
+        for folder in folders:
+            subfolders = [f"{folder}/folder{i}" for i in range(number_of_subfolders)]
+            files = [f"file {i}.txt" for i in range(files_per_folder)]
+            tree[folder] = (subfolders, files)
+            next_folders.extend(subfolders)
+        folders = next_folders
+    return tree
+
+
+class SharePointStandIn(BaseHTTPRequestHandler):
+    """Answer the on-premise SharePoint REST API calls of the fetcher with a fixed latency."""
+
+    tree: dict = {}
+    protocol_version = "HTTP/1.1"
+    # write headers and body at once, to not wait for delayed TCP acknowledgements
+    wbufsize = -1
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        if match := FOLDER_REQUEST.match(path):
+            subfolders, files = self.tree[match.group(1)]
+            if match.group(2) == "folders":
+                results = [{"ServerRelativeUrl": f} for f in subfolders]
+            else:
+                results = [{"Name": f} for f in files]
+            self._send(json.dumps({"d": {"results": results}}).encode())
+        elif match := FILE_REQUEST.match(path):
+            contents = match.group(1).encode()
+            if match.group(2) == "ListItemAllFields":
+                properties = {"Modified": "2024-01-01T00:00:00"}
+                if "$expand=File" in unquote(url.query):
+                    properties["File"] = {"Length": str(len(contents))}
+                self._send(json.dumps({"d": properties}).encode())
+            elif match.group(2) == "Properties":
+                self._send(json.dumps({"d": {"vti_x005f_filesize": len(contents)}}).encode())
+            else:
+                self._send(contents)
+        else:
+            self.send_error(404)
+
+    def _send(self, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def sharepoint_site():
+    SharePointStandIn.tree = make_tree()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SharePointStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.disable("yaku.sharepoint_fetcher")
+    yield f"http://127.0.0.1:{server.server_address[1]}{SITE}/"
+    logger.enable("yaku.sharepoint_fetcher")
+    server.shutdown()
+    server.server_close()
+
+
+def download_folder(sharepoint_site: str, destination_path: Path, max_parallel_requests: int):
+    destination_path.mkdir()
+    fetcher = SharepointFetcherOnPremise(
+        "Documents/reports/",
+        destination_path,
+        sharepoint_site,
+        "username",
+        "password",
+        max_parallel_requests=max_parallel_requests,
+    )
+    start = time.perf_counter()
+    fetcher.download_folder()
+    duration = time.perf_counter() - start
+    files = {
+        str(p.relative_to(destination_path)): p.read_bytes()
+        for p in destination_path.rglob("*")
+        # the properties store records modification times, which differ between runs
+        if p.is_file() and p.name != PropertiesStore.filename
+    }
+    return duration, files, fetcher._connect.request_count
+
+
+def test_parallel_requests_are_faster_than_sequential_requests(sharepoint_site, tmp_path):
+    sequential_time, expected_files, requests = download_folder(
+        sharepoint_site, tmp_path / "seq", 1
+    )
+
+    print(
+        f"\nlatency {LATENCY * 1e3:.0f}ms, {len(expected_files) // 2} files, {requests} requests:"
+    )
+    print(f"max-parallel-requests=1: {sequential_time * 1e3:.0f}ms")
+    for max_parallel_requests in (4, 16):
+        parallel_time, files, _ = download_folder(
+            sharepoint_site, tmp_path / str(max_parallel_requests), max_parallel_requests
+        )
+        assert files == expected_files
+        print(
+            f"max-parallel-requests={max_parallel_requests}: {parallel_time * 1e3:.0f}ms, "
+            f"speedup {sequential_time / parallel_time:.1f}x"
+        )
+        assert parallel_time < sequential_time
@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+
+import pytest
+from yaku.sharepoint_fetcher.checkpoint import Checkpoint
+from yaku.sharepoint_fetcher.manifest import ManifestEntry
+
+SUFFIX = ".__properties__.json"
+
+
+@pytest.fixture
+def destination(tmp_path: Path) -> Path:
+    (tmp_path / "folder").mkdir()
+    for name in ("folder/a.txt", "folder/b.txt"):
+        (tmp_path / name).write_text("1234")
+        (tmp_path / (name + SUFFIX)).write_text("{}")
+    return tmp_path
+
+
+def _entry(path: str) -> ManifestEntry:
+    return ManifestEntry(path, '"1"', "2024", 4, "abc")
+
+
+def _interrupted_run(destination: Path, run_key: str = "run") -> Checkpoint:
+    checkpoint = Checkpoint(destination, SUFFIX, run_key)
+    checkpoint.open()
+    checkpoint.record_file("/folder/a.txt", _entry("folder/a.txt"))
+    checkpoint.record_file("/folder/b.txt", _entry("folder/b.txt"))
+    checkpoint.record_folder("/folder/")
+    checkpoint.close(completed=False)
+    return checkpoint
+
+
+def test_checkpoint_of_interrupted_run_is_resumed(destination: Path):
+    _interrupted_run(destination)
+
+    checkpoint = Checkpoint(destination, SUFFIX, "run")
+
+    assert checkpoint.was_interrupted
+    assert checkpoint.completed_folder("/folder/")
+    assert not checkpoint.completed_folder("/other/")
+    assert checkpoint.completed_file("/folder/a.txt", with_contents=True) == _entry(
+        "folder/a.txt"
+    )
+    assert len(checkpoint.files()) == 2
+
+
+def test_checkpoint_ignores_incomplete_last_line(destination: Path):
+    checkpoint = _interrupted_run(destination)
+    with open(checkpoint.path, "a") as f:
+        f.write('{"file": "/folder/c.t')
+
+    checkpoint = Checkpoint(destination, SUFFIX, "run")
+    checkpoint.open()
+    checkpoint.record_folder("/other/")
+    checkpoint.close(completed=False)
+
+    resumed = Checkpoint(destination, SUFFIX, "run")
+    assert resumed.completed_folder("/folder/") and resumed.completed_folder("/other/")
+    assert len(resumed.files()) == 2
+
+
+def test_checkpoint_of_different_run_is_not_resumed(destination: Path):
+    _interrupted_run(destination)
+
+    checkpoint = Checkpoint(destination, SUFFIX, "other run")
+
+    assert not checkpoint.completed_folder("/folder/")
+    assert checkpoint.completed_file("/folder/a.txt", with_contents=True) is None
+
+
+def test_partially_written_files_are_not_completed(destination: Path):
+    _interrupted_run(destination)
+    (destination / "folder" / "b.txt").write_text("12")
+    (destination / "folder" / ".tmp1234.download").write_text("1")
+
+    checkpoint = Checkpoint(destination, SUFFIX, "run")
+    checkpoint.open()
+
+    assert checkpoint.completed_file("/folder/a.txt", with_contents=True) is not None
+    assert checkpoint.completed_file("/folder/b.txt", with_contents=True) is None
+    assert checkpoint.completed_file("/folder/b.txt", with_contents=False) is not None
+    assert not (destination / "folder" / ".tmp1234.download").exists()
+
+
+def test_checkpoint_is_removed_when_completed(destination: Path):
+    checkpoint = Checkpoint(destination, SUFFIX, "run")
+    assert not checkpoint.was_interrupted
+    checkpoint.open()
+    checkpoint.record_folder("/folder/")
+    assert checkpoint.path.exists()
+
+    checkpoint.close(completed=True)
+
+    assert not checkpoint.path.exists()
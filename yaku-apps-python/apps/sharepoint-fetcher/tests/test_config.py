@@ -420,3 +420,55 @@ def test_Settings():
                 sharepoint_url="https://different-example.com/site/test/folder/test.pdf",
             )
         )
+
+
+@pytest.mark.parametrize(("value", "expected"), [(None, 1), ("1", 1), ("8", 8), (4, 4)])
+def test_settings_max_parallel_requests(value, expected):
+    settings = Settings(destination_path="/path/to/destination", max_parallel_requests=value)
+    assert settings.max_parallel_requests == expected
+
+
+@pytest.mark.parametrize("value", ["0", "-2", "many"])
+def test_settings_invalid_max_parallel_requests(value):
+    with pytest.raises(AutopilotConfigurationError, match="MAX_PARALLEL_REQUESTS"):
+        Settings(destination_path="/path/to/destination", max_parallel_requests=value)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"), [(None, None), ("", None), ("2.5", 2.5), (10, 10)]
+)
+def test_settings_max_requests_per_second(value, expected):
+    settings = Settings(destination_path="/path/to/destination", max_requests_per_second=value)
+    assert settings.max_requests_per_second == expected
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "fast"])
+def test_settings_invalid_max_requests_per_second(value):
+    with pytest.raises(AutopilotConfigurationError, match="MAX_REQUESTS_PER_SECOND"):
+        Settings(destination_path="/path/to/destination", max_requests_per_second=value)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"), [(None, False), ("false", False), ("true", True), (True, True)]
+)
+def test_settings_incremental(value, expected):
+    settings = Settings(destination_path="/path/to/destination", incremental=value)
+    assert settings.incremental == expected
+
+
+def test_settings_invalid_incremental():
+    with pytest.raises(ValidationError):
+        Settings(destination_path="/path/to/destination", incremental="sometimes")
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"), [(None, False), ("false", False), ("true", True), (True, True)]
+)
+def test_settings_resume(value, expected):
+    settings = Settings(destination_path="/path/to/destination", resume=value)
+    assert settings.resume == expected
+
+
+def test_settings_invalid_resume():
+    with pytest.raises(ValidationError):
+        Settings(destination_path="/path/to/destination", resume="sometimes")
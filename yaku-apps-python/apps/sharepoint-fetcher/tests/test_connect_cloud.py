@@ -447,12 +447,14 @@ class ConnectTest(unittest.TestCase):
         mock_get_site_id.return_value = "site_id_123"
         mock_get_folder_id.return_value = "folder_id_123"
 
-        response = {"value": [{"name": "subfolder"}]}
+        response = {
+            "value": [{"name": "subfolder", "folder": {}}, {"name": "file", "file": {}}]
+        }
         site_id = "site_id_123"
         folder_id = "folder_id_123"
 
         self.mock.get(
-            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/items/{folder_id}/children?$filter=folder ne null",
+            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/items/{folder_id}/children",
             json=response,
             status_code=200,
         )
@@ -479,13 +481,15 @@ class ConnectTest(unittest.TestCase):
         mock_get_folder_id.return_value = "folder_id_123"
         mock_get_drive_id.return_value = "drive_id_123"
 
-        response = {"value": [{"name": "subfolder"}]}
+        response = {
+            "value": [{"name": "subfolder", "folder": {}}, {"name": "file", "file": {}}]
+        }
         site_id = "site_id_123"
         folder_id = "folder_id_123"
         drive_id = "drive_id_123"
 
         self.mock.get(
-            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/items/{folder_id}/children?$filter=folder ne null",
+            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/items/{folder_id}/children",
             json=response,
             status_code=200,
         )
@@ -506,11 +510,13 @@ class ConnectTest(unittest.TestCase):
         mock_session.return_value = {"Authorization": "Bearer your_token"}
         mock_get_site_id.return_value = "site_id_123"
 
-        response = {"value": [{"name": "subfolder"}]}
+        response = {
+            "value": [{"name": "subfolder", "folder": {}}, {"name": "file", "file": {}}]
+        }
         site_id = "site_id_123"
 
         self.mock.get(
-            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root/children?$filter=folder ne null",
+            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drive/root/children",
             json=response,
             status_code=200,
         )
@@ -533,12 +539,14 @@ class ConnectTest(unittest.TestCase):
         mock_get_site_id.return_value = "site_id_123"
         mock_get_drive_id.return_value = "drive_id_123"
 
-        response = {"value": [{"name": "subfolder"}]}
+        response = {
+            "value": [{"name": "subfolder", "folder": {}}, {"name": "file", "file": {}}]
+        }
         site_id = "site_id_123"
         drive_id = "drive_id_123"
 
         self.mock.get(
-            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root/children?$filter=folder ne null",
+            f"https://graph.microsoft.com/v1.0/sites/{site_id}/drives/{drive_id}/root/children",
             json=response,
             status_code=200,
         )
@@ -571,8 +579,8 @@ class ConnectTest(unittest.TestCase):
             json=response,
             status_code=200,
         )
-        result = connect.get_folders("/sites/123456/test", None)
-        assert "/sites/123456/test/file" in result[0]
+        result = connect.get_files("/sites/123456/test", None)
+        assert result == ["file"]
         assert self.mock.call_count == 1
 
     @patch("yaku.sharepoint_fetcher.cloud.connect.Connect.get_drive_id")
@@ -604,8 +612,8 @@ class ConnectTest(unittest.TestCase):
             json=response,
             status_code=200,
         )
-        result = connect.get_folders("/sites/123456/test", "library_name")
-        assert "/sites/123456/test/file" in result[0]
+        result = connect.get_files("/sites/123456/test", "library_name")
+        assert result == ["file"]
         assert self.mock.call_count == 1
 
     @patch("yaku.sharepoint_fetcher.cloud.connect.Connect.get_site_id")
@@ -735,3 +743,238 @@ class ConnectTest(unittest.TestCase):
         result = connect.get_file_properties("123456", "test.txt", "library_name")
         assert "file_id" in result["value"][0]["file"]
         assert self.mock.call_count == 1
+
+
+DELTA_URL = "https://graph.microsoft.com/v1.0/sites/site_id_123/drive/root/delta"
+
+
+def test_get_changed_item_ids_without_delta_link_returns_latest_link(
+    mocker, requests_mock, connect: Connect
+):
+    mocker.patch.object(connect, "get_site_id", return_value="site_id_123")
+    requests_mock.get(
+        DELTA_URL + "?token=latest",
+        json={"value": [], "@odata.deltaLink": DELTA_URL + "?token=1"},
+    )
+
+    assert connect.get_changed_item_ids(None, None) == (None, DELTA_URL + "?token=1")
+
+
+def test_get_changed_item_ids_follows_next_links(mocker, requests_mock, connect: Connect):
+    mocker.patch.object(connect, "get_site_id", return_value="site_id_123")
+    requests_mock.get(
+        DELTA_URL + "?token=1",
+        json={"value": [{"id": "a"}], "@odata.nextLink": DELTA_URL + "?token=2"},
+    )
+    requests_mock.get(
+        DELTA_URL + "?token=2",
+        json={
+            "value": [{"id": "b", "deleted": {}}],
+            "@odata.deltaLink": DELTA_URL + "?token=3",
+        },
+    )
+
+    assert connect.get_changed_item_ids(None, DELTA_URL + "?token=1") == (
+        {"a", "b"},
+        DELTA_URL + "?token=3",
+    )
+
+
+def test_get_changed_item_ids_with_expired_delta_link(mocker, requests_mock, connect: Connect):
+    mocker.patch.object(connect, "get_site_id", return_value="site_id_123")
+    requests_mock.get(DELTA_URL + "?token=1", status_code=410)
+    requests_mock.get(
+        DELTA_URL + "?token=latest",
+        json={"value": [], "@odata.deltaLink": DELTA_URL + "?token=2"},
+    )
+
+    assert connect.get_changed_item_ids(None, DELTA_URL + "?token=1") == (
+        None,
+        DELTA_URL + "?token=2",
+    )
+
+
+SITE_URL = "https://graph.microsoft.com/v1.0/sites/some.sharepoint.server:/sites/123456"
+DRIVES_URL = "https://graph.microsoft.com/v1.0/sites/site_id_123/drives"
+
+
+def test_site_and_drive_ids_are_only_requested_once(requests_mock, connect: Connect):
+    requests_mock.get(SITE_URL, json={"id": "host,site_id_123,web_id"})
+    requests_mock.get(DRIVES_URL, json={"value": [{"name": "Library", "id": "drive_id"}]})
+
+    assert connect.get_site_id(None) == "site_id_123"
+    assert connect.get_site_id(None) == "site_id_123"
+    assert connect.get_drive_id(None, "Library") == "drive_id"
+    assert connect.get_drive_id(None, "Library") == "drive_id"
+
+    assert requests_mock.call_count == 2
+    assert connect.request_count == 2
+
+
+def test_throttled_requests_are_retried_after_retry_after(
+    mocker, requests_mock, connect: Connect
+):
+    sleep = mocker.MagicMock()
+    connect._transport._sleep = sleep
+    requests_mock.get(
+        SITE_URL,
+        [
+            {"status_code": 429, "headers": {"Retry-After": "3"}},
+            {"status_code": 503, "headers": {"Retry-After": "1"}},
+            {"json": {"id": "host,site_id_123,web_id"}},
+        ],
+    )
+
+    assert connect.get_site_id(None) == "site_id_123"
+    assert connect.request_count == 3
+    assert sleep.call_args_list == [unittest.mock.call(3.0), unittest.mock.call(1.0)]
+
+
+def test_folder_ids_are_cached_with_lru_eviction(mocker, requests_mock, connect: Connect):
+    mocker.patch.object(connect, "get_site_id", return_value="site_id_123")
+    mocker.patch.object(connect, "folder_id_cache_size", 2)
+    for folder in ("a", "b", "c"):
+        requests_mock.get(
+            f"https://graph.microsoft.com/v1.0/sites/site_id_123/drive/root:/{folder}",
+            json={"id": f"{folder}_id"},
+        )
+
+    for folder in ("a", "b", "a", "c", "a", "b"):
+        assert connect.get_folder_id(folder, None) == f"{folder}_id"
+
+    # "b" was evicted when "c" was added, as "a" had been used more recently
+    assert [r.url.rsplit("/", 1)[1] for r in requests_mock.request_history] == [
+        "a",
+        "b",
+        "c",
+        "b",
+    ]
+
+
+def test_downloading_files_needs_no_repeated_id_requests(
+    mocker, requests_mock, connect: Connect, tmp_path
+):
+    connect.download_directory = tmp_path
+    requests_mock.get(SITE_URL, json={"id": "host,site_id_123,web_id"})
+    requests_mock.get(DRIVES_URL, json={"value": [{"name": "Library", "id": "drive_id"}]})
+    for name in ("a.txt", "b.txt"):
+        requests_mock.get(
+            f"https://graph.microsoft.com/v1.0/sites/site_id_123/drives/drive_id/root:/folder/{name}?$expand=listItem",
+            json={"@microsoft.graph.downloadUrl": f"https://download/{name}", "size": 2},
+        )
+        requests_mock.get(f"https://download/{name}", content=b"ab")
+
+    connect.get_file_object("folder", "a.txt", "Library")
+    assert connect.request_count == 4
+
+    connect.request_count = 0
+    connect.get_file_properties("folder", "b.txt", "Library")
+    connect.get_file_object("folder", "b.txt", "Library")
+    # the download URL is taken from the properties
+    assert connect.request_count == 2
+
+
+def test_get_children_follows_next_links_with_selected_properties(
+    mocker, requests_mock, connect: Connect
+):
+    mocker.patch.object(connect, "get_site_id", return_value="site_id_123")
+    mocker.patch.object(connect, "get_folder_id", return_value="folder_id_123")
+    children_url = (
+        "https://graph.microsoft.com/v1.0/sites/site_id_123/drive/items/folder_id_123/children"
+    )
+    requests_mock.get(
+        children_url,
+        json={
+            "value": [{"name": "a.pdf", "file": {}}],
+            "@odata.nextLink": children_url + "?$skiptoken=2",
+        },
+    )
+    requests_mock.get(
+        children_url + "?$skiptoken=2", json={"value": [{"name": "sub", "folder": {}}]}
+    )
+
+    assert connect.get_files("folder", None) == ["a.pdf"]
+    assert connect.get_folders("folder", None) == ["folder/sub"]
+
+    first_page_query = requests_mock.request_history[0].qs
+    assert first_page_query == {
+        "$select": ["name,id,file,folder,size,etag,lastmodifieddatetime"],
+        "$top": ["999"],
+    }
+    assert connect.request_count == 4
+
+
+BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+
+
+def test_get_files_properties_with_batch_requests(mocker, requests_mock, connect: Connect):
+    mocker.patch.object(connect, "get_site_id", return_value="site_id_123")
+    mocked_sleep = mocker.MagicMock()
+    connect._transport._sleep = mocked_sleep
+    throttled_once = set()
+
+    def answer_batch(request, context):
+        responses = []
+        for sub_request in request.json()["requests"]:
+            file_name = sub_request["url"].split("/")[-1].split("?")[0]
+            if file_name == "file3" and file_name not in throttled_once:
+                throttled_once.add(file_name)
+                responses.append(
+                    {"id": sub_request["id"], "status": 429, "headers": {"Retry-After": "2"}}
+                )
+            elif file_name == "missing":
+                responses.append({"id": sub_request["id"], "status": 404, "body": {}})
+            else:
+                responses.append(
+                    {
+                        "id": sub_request["id"],
+                        "status": 200,
+                        "body": {"name": file_name, "url": sub_request["url"]},
+                    }
+                )
+        return {"responses": list(reversed(responses))}
+
+    requests_mock.post(BATCH_URL, json=answer_batch)
+    file_names = [f"file{i}" for i in range(25)] + ["missing"]
+
+    result = connect.get_files_properties("folder", file_names, None)
+
+    assert sorted(result) == sorted(f"file{i}" for i in range(25))
+    assert (
+        result["file0"]["url"]
+        == "/sites/site_id_123/drive/root:/folder/file0?$expand=listItem"
+    )
+    assert [len(r.json()["requests"]) for r in requests_mock.request_history] == [20, 7]
+    # the throttled request is sent again with the next batch
+    mocked_sleep.assert_called_once_with(2.0)
+    assert connect.request_count == 2
+    assert connect._transport.limiter.limit == 1
+
+
+def test_get_files_properties_waits_for_retry_after_date(mocker, requests_mock, connect):
+    mocker.patch.object(connect, "get_site_id", return_value="site_id_123")
+    mocked_sleep = mocker.MagicMock()
+    connect._transport._sleep = mocked_sleep
+    requests_mock.post(
+        BATCH_URL,
+        [
+            {
+                "json": {
+                    "responses": [
+                        {
+                            "id": "1",
+                            "status": 429,
+                            "headers": {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"},
+                        }
+                    ]
+                }
+            },
+            {"json": {"responses": [{"id": "1", "status": 200, "body": {"name": "file"}}]}},
+        ],
+    )
+
+    result = connect.get_files_properties("folder", ["file"], None)
+
+    assert result == {"file": {"name": "file"}}
+    # the date is in the past, so the request is sent again right away
+    mocked_sleep.assert_called_once_with(0.0)
@@ -2,14 +2,19 @@
 #
 # SPDX-License-Identifier: MIT
 
+import hashlib
 import json
 import re
+import stat
+import threading
+from pathlib import Path
 from unittest import mock
 from urllib.parse import quote
 
 import pytest
 import requests
 from yaku.autopilot_utils.errors import AutopilotConfigurationError, AutopilotError
+from yaku.sharepoint_fetcher.downloads import FILE_MODE
 from yaku.sharepoint_fetcher.on_premise.connect import Connect
 
 
@@ -25,12 +30,13 @@ def test_initial_value():
     assert connect._session.headers == {"Accept": "application/json;odata=verbose"}
 
 
-def test_force_ip(mocker):
+def test_force_ip(mocker, tmp_path: Path):
     connect = Connect(
         "https://some.sharepoint.server/sites/123456/",
         "username",
         "password",
         force_ip="10.0.0.1",
+        download_directory=tmp_path,
     )
 
     mocked_get_additional_file_properties: mock.MagicMock = mocker.patch(
@@ -50,6 +56,7 @@ def test_force_ip(mocker):
         "https://10.0.0.1/sites/123456/_api/web/GetFileByServerRelativePath(decodedurl='/sites/123456/File.txt')/$value",
         headers={"Host": "some.sharepoint.server"},
         verify=False,
+        stream=True,
     )
 
 
@@ -92,6 +99,26 @@ def test_get_paginated_results(requests_mock, connect: Connect):
     assert result[1] == {"File": "B.txt"}
 
 
+def test_throttled_requests_are_retried(mocker, requests_mock, connect: Connect):
+    sleep = mocker.MagicMock()
+    connect._transport._sleep = sleep
+    requests_mock.get(
+        "https://some.fake.url",
+        [
+            {"status_code": 429, "headers": {"Retry-After": "2"}},
+            {"exc": requests.ConnectionError},
+            {"status_code": 200, "json": {"d": {"results": [{"File": "A.txt"}]}}},
+        ],
+    )
+
+    result = connect._get_paginated_results("https://some.fake.url")
+
+    assert result == [{"File": "A.txt"}]
+    assert requests_mock.call_count == 3
+    assert connect.request_count == 3
+    assert sleep.call_args_list[0] == mock.call(2.0)
+
+
 def test_check_folder_access_and_presence_with_401(requests_mock, connect: Connect):
     requests_mock.get(
         "https://some.sharepoint.server/sites/123456/_api/web/GetFolderByServerRelativeUrl('/sites/123456/test')",
@@ -254,7 +281,7 @@ def test_get_files_with_paginated_results(requests_mock, connect: Connect):
     assert second_requested_url == "https://some.fake.url/to/page/2"
 
 
-def test_get_file_object(mocker, connect: Connect):
+def test_get_file_object(mocker, connect: Connect, tmp_path: Path):
     mocked_get_request: mock.MagicMock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect._get"
     )
@@ -265,18 +292,25 @@ def test_get_file_object(mocker, connect: Connect):
         "yaku.sharepoint_fetcher.on_premise.connect.Connect._get_file_size_from_properties"
     )
     byte = b"0x0x0xf2d2"
-    response = {"content": byte}
-    response_properties = {"d": {"vti_x005f_filesize": 1}}
-    mocked_get_request.return_value = mock.Mock(content=response)
+    response_properties = {"d": {"vti_x005f_filesize": len(byte)}}
+    mocked_get_request.return_value.iter_content.return_value = [byte[:4], byte[4:]]
     mocked_get_additional_file_properties.return_value = mock.Mock(content=response_properties)
-    mocked_get_file_size_from_properties.return_value = 1
+    mocked_get_file_size_from_properties.return_value = len(byte)
+    connect.download_directory = tmp_path
 
-    assert connect.get_file_object("/sites/123456/test", "test3") == response
+    downloaded_file = connect.get_file_object("/sites/123456/test", "test3")
 
+    assert downloaded_file.temporary_path.parent == tmp_path
+    assert downloaded_file.temporary_path.read_bytes() == byte
+    assert downloaded_file.size == len(byte)
+    # like files created with `open`, the file follows the umask instead of being private
+    assert stat.S_IMODE(downloaded_file.temporary_path.stat().st_mode) == FILE_MODE
+    assert downloaded_file.sha256 == hashlib.sha256(byte).hexdigest()
     assert mocked_get_request.call_count == 1
     requested_url = mocked_get_request.call_args.args[0]
     assert "/_api/web/GetFile" in requested_url
     assert requested_url.endswith("/$value")
+    assert mocked_get_request.call_args.kwargs == {"stream": True}
 
 
 def test_get_file_properties(mocker, connect: Connect):
@@ -551,3 +585,84 @@ def test_get_items_for_list_with_paginated_results(requests_mock, connect: Conne
     assert requests_mock.call_count == 2
     requested_second_url = requests_mock.last_request.url
     assert "https://some.fake.url/to/page/2" == requested_second_url
+
+
+def test_every_thread_uses_its_own_session(connect: Connect):
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(connect._session))
+    thread.start()
+    thread.join()
+
+    assert connect._session is connect._session
+    assert sessions[0] is not connect._session
+    assert sessions[0].auth is not connect._session.auth
+
+
+def test_get_file_object_uses_size_from_file_properties(
+    requests_mock, connect: Connect, tmp_path: Path
+):
+    file_url = "https://some.sharepoint.server/sites/123456/_api/web/GetFileByServerRelativePath(decodedurl='/sites/123456/test/test3')"
+    requests_mock.get(
+        file_url + "/ListItemAllFields",
+        json={"d": {"Modified": "2024-01-01T00:00:00", "File": {"Length": "5"}}},
+    )
+    requests_mock.get(file_url + "/$value", content=b"12345")
+
+    assert connect.get_file_properties("/sites/123456/test", "test3") == {
+        "Modified": "2024-01-01T00:00:00"
+    }
+    connect.download_directory = tmp_path
+    assert connect.get_file_object("/sites/123456/test", "test3").size == 5
+
+    assert connect.request_count == 2
+    assert requests_mock.request_history[0].qs == {
+        "$select": ["*,file/length"],
+        "$expand": ["file"],
+    }
+
+
+def test_get_file_object_requests_size_if_properties_have_no_size(
+    requests_mock, connect: Connect, tmp_path: Path
+):
+    file_url = "https://some.sharepoint.server/sites/123456/_api/web/GetFileByServerRelativePath(decodedurl='/sites/123456/test/test3')"
+    requests_mock.get(file_url + "/ListItemAllFields", json={"d": {"Modified": "2024"}})
+    requests_mock.get(file_url + "/Properties", json={"d": {"vti_x005f_filesize": 4}})
+    requests_mock.get(file_url + "/$value", content=b"12345")
+
+    connect.get_file_properties("/sites/123456/test", "test3")
+    connect.download_directory = tmp_path
+    with pytest.raises(AutopilotError, match="expected 4 bytes, got more than 4 bytes"):
+        connect.get_file_object("/sites/123456/test", "test3")
+
+    assert connect.request_count == 3
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_get_files_with_list_item_fields(requests_mock, connect: Connect):
+    requests_mock.get(
+        "https://some.sharepoint.server/sites/123456/_api/web/GetFolderByServerRelativeUrl('/sites/123456/test')/files",
+        json={"d": {"results": [{"Name": "a.pdf", "ListItemAllFields": {"Status": "Final"}}]}},
+    )
+
+    assert connect.get_files("/sites/123456/test", ["Status", "Modified"]) == [
+        {"Name": "a.pdf", "ListItemAllFields": {"Status": "Final"}}
+    ]
+
+    assert requests_mock.last_request.qs == {
+        "$select": ["name,listitemallfields/status,listitemallfields/modified"],
+        "$expand": ["listitemallfields"],
+    }
+
+
+def test_get_files_with_odata_filter(requests_mock, connect: Connect):
+    requests_mock.get(
+        "https://some.sharepoint.server/sites/123456/_api/web/GetFolderByServerRelativeUrl('/sites/123456/test')/files",
+        json={"d": {"results": [{"Name": "a.pdf", "ListItemAllFields": {"Status": "R&D"}}]}},
+    )
+
+    connect.get_files(
+        "/sites/123456/test", ["Status"], odata_filter="ListItemAllFields/Status eq 'R&D'"
+    )
+
+    assert "$filter=ListItemAllFields/Status%20eq%20'R%26D'" in requests_mock.last_request.url
+    assert requests_mock.last_request.qs["$filter"] == ["listitemallfields/status eq 'r&d'"]
@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import pytest
+from yaku.sharepoint_fetcher.folder_filters import FolderFilterTrie
+
+
+@pytest.mark.parametrize("path", ["", "any/", "any/folder/"])
+def test_everything_matches_without_filters(path: str):
+    trie = FolderFilterTrie([])
+
+    assert trie.could_match(path)
+    assert trie.could_match_below(path)
+
+
+@pytest.mark.parametrize(
+    ("path", "could_match", "could_match_below"),
+    [
+        ("", True, True),
+        ("2024/", True, True),
+        ("2024/Q1/", True, False),
+        ("2024/Q2/", False, False),
+        ("2024/Q1/old/", False, False),
+        ("2023/", True, False),
+        ("2023/old/", False, False),
+        ("2022/", False, False),
+    ],
+)
+def test_literal_filters(path: str, could_match: bool, could_match_below: bool):
+    trie = FolderFilterTrie(["2024/Q1/", "2023/"])
+
+    assert trie.could_match(path) == could_match
+    assert trie.could_match_below(path) == could_match_below
+
+
+@pytest.mark.parametrize(
+    ("path", "could_match", "could_match_below"),
+    [
+        ("", True, True),
+        ("reports/", True, True),
+        ("reports/2024/", True, True),
+        ("reports/2024/Q1/", True, True),
+        ("drafts/", False, False),
+    ],
+)
+def test_everything_below_wildcards_could_match(
+    path: str, could_match: bool, could_match_below: bool
+):
+    trie = FolderFilterTrie(["reports/*/", "", "notes/"])
+
+    assert trie.could_match(path) == could_match
+    assert trie.could_match_below(path) == could_match_below
+
+
+def test_root_filter_does_not_match_subfolders():
+    trie = FolderFilterTrie([""])
+
+    assert trie.could_match("")
+    assert not trie.could_match_below("")
+    assert not trie.could_match("folder/")
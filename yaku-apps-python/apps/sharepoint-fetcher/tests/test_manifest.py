@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+
+import pytest
+from yaku.sharepoint_fetcher.manifest import Manifest, ManifestEntry
+
+SUFFIX = ".__properties__.json"
+
+
+@pytest.fixture
+def destination(tmp_path: Path) -> Path:
+    (tmp_path / "folder").mkdir()
+    for name in ("folder/a.txt", "folder/b.txt"):
+        (tmp_path / name).write_text("1234")
+        (tmp_path / (name + SUFFIX)).write_text("{}")
+    return tmp_path
+
+
+def _entry(path: str, modified: str = "2024", sha256: str = "abc") -> ManifestEntry:
+    return ManifestEntry(path, '"1"', modified, 4, sha256)
+
+
+def test_manifest_is_saved_and_loaded(destination: Path):
+    manifest = Manifest(destination, SUFFIX)
+    manifest.record("/sites/1/Documents/folder/a.txt", _entry("folder/a.txt"))
+    manifest.delta_link = "https://delta.link"
+    manifest.save()
+
+    loaded = Manifest(destination, SUFFIX)
+
+    assert loaded.get("/sites/1/Documents/folder/a.txt") == _entry("folder/a.txt")
+    assert loaded.delta_link == "https://delta.link"
+
+
+def test_interrupted_save_keeps_previous_manifest(destination: Path, mocker):
+    manifest = Manifest(destination, SUFFIX)
+    manifest.record("a", _entry("folder/a.txt"))
+    manifest.save()
+    manifest.record("b", _entry("folder/b.txt"))
+    mocker.patch("yaku.sharepoint_fetcher.downloads.os.replace", side_effect=OSError("killed"))
+
+    with pytest.raises(OSError, match="killed"):
+        manifest.save()
+
+    loaded = Manifest(destination, SUFFIX)
+    assert loaded.get("a") == _entry("folder/a.txt")
+    assert loaded.get("b") is None
+    assert sorted(p.name for p in destination.iterdir()) == [Manifest.filename, "folder"]
+
+
+def test_manifest_leaves_out_files_which_were_removed_locally(destination: Path):
+    manifest = Manifest(destination, SUFFIX)
+    manifest.record("a", _entry("folder/a.txt"))
+    manifest.record("b", _entry("folder/b.txt"))
+    (destination / "folder" / "b.txt").unlink()
+    manifest.save()
+
+    loaded = Manifest(destination, SUFFIX)
+
+    assert loaded.get("a") is not None
+    assert loaded.get("b") is None
+
+
+def test_unchanged_requires_same_version_and_complete_local_copy(destination: Path):
+    manifest = Manifest(destination, SUFFIX)
+    manifest.record("a", _entry("folder/a.txt"))
+    manifest.record("b", _entry("folder/b.txt"))
+    (destination / "folder" / "b.txt").write_text("12345")
+
+    assert manifest.unchanged("a", _entry("folder/a.txt", sha256=None)) == _entry(
+        "folder/a.txt"
+    )
+    assert manifest.unchanged("a", _entry("folder/a.txt", modified="2025")) is None
+    assert manifest.unchanged("b", _entry("folder/b.txt")) is None
+    assert manifest.unchanged("c", _entry("folder/c.txt")) is None
+
+
+def test_remove_unseen_deletes_files_which_were_not_fetched_again(destination: Path):
+    manifest = Manifest(destination, SUFFIX)
+    manifest.record("a", _entry("folder/a.txt"))
+    manifest.record("b", _entry("folder/b.txt"))
+    manifest.save()
+
+    manifest = Manifest(destination, SUFFIX)
+    manifest.keep("a")
+    manifest.remove_unseen()
+    manifest.save()
+
+    assert sorted(p.name for p in (destination / "folder").iterdir()) == [
+        "a.txt",
+        "a.txt" + SUFFIX,
+    ]
+    assert Manifest(destination, SUFFIX).get("b") is None
+
+
+@pytest.mark.parametrize("content", ["not json", '{"version": 99, "files": {}}', "[]"])
+def test_invalid_manifest_is_ignored(destination: Path, content: str, caplog):
+    (destination / Manifest.filename).write_text(content)
+
+    manifest = Manifest(destination, SUFFIX)
+
+    assert manifest.get("a") is None
+    assert "Ignoring invalid manifest" in caplog.text
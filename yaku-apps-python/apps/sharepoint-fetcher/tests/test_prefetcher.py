@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from yaku.sharepoint_fetcher.downloads import DownloadedFile
+from yaku.sharepoint_fetcher.prefetcher import Prefetcher
+
+
+def test_get_calls_function_if_it_was_not_prefetched():
+    function = mock.Mock(return_value=42)
+    prefetcher = Prefetcher(4)
+
+    prefetcher.prefetch(function, "a")
+    assert prefetcher.get(function, "a") == 42
+
+    function.assert_called_once_with("a")
+
+
+def test_prefetched_calls_run_in_parallel():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_others(value):
+        barrier.wait()
+        return value * 2
+
+    prefetcher = Prefetcher(3)
+    with prefetcher.running():
+        for value in range(3):
+            prefetcher.prefetch(wait_for_others, value)
+        assert [prefetcher.get(wait_for_others, value) for value in range(3)] == [0, 2, 4]
+
+
+def test_prefetched_calls_are_only_made_once_and_raise_on_get():
+    function = mock.Mock(side_effect=[1, ValueError("oops"), 3])
+    prefetcher = Prefetcher(2)
+    with prefetcher.running():
+        prefetcher.prefetch(function, "a")
+        prefetcher.prefetch(function, "a")
+        assert prefetcher.get(function, "a") == 1
+        prefetcher.prefetch(function, "b")
+        with pytest.raises(ValueError, match="oops"):
+            prefetcher.get(function, "b")
+
+    assert function.call_count == 2
+
+
+def test_no_threads_are_used_for_one_parallel_request():
+    prefetcher = Prefetcher(1)
+    with prefetcher.running():
+        prefetcher.prefetch(threading.current_thread)
+        assert prefetcher.get(threading.current_thread) is threading.current_thread()
+
+
+def test_unused_prefetched_downloads_are_removed(tmp_path: Path):
+    def download(name: str) -> DownloadedFile:
+        path = tmp_path / f".{name}.download"
+        path.write_bytes(b"contents")
+        return DownloadedFile(path, 8, "sha256")
+
+    prefetcher = Prefetcher(2)
+    with pytest.raises(ValueError, match="failed"):
+        with prefetcher.running():
+            prefetcher.prefetch(download, "a")
+            prefetcher.prefetch(download, "b")
+            used = prefetcher.get(download, "a")
+            raise ValueError("failed")
+
+    assert list(tmp_path.iterdir()) == [used.temporary_path]
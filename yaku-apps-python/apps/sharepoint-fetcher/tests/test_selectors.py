@@ -2,11 +2,18 @@
 #
 # SPDX-License-Identifier: MIT
 
+from datetime import datetime, timezone
+
 import pydantic
 import pytest
 from yaku.autopilot_utils.errors import AutopilotConfigurationError
 from yaku.sharepoint_fetcher.config import FilterConfigFileContent
-from yaku.sharepoint_fetcher.selectors import Selector, parse_filter_config_file_data
+from yaku.sharepoint_fetcher.selectors import (
+    FilesSelectors,
+    Selector,
+    files_selectors_to_odata_filter,
+    parse_filter_config_file_data,
+)
 
 
 def test_read_filter_config_file_with_missing_checks_in_selector():
@@ -76,3 +83,84 @@ def test_parse_filter_config_file():
         Selector("Size", "is-larger-than", "1024"),
     ]
     assert files_selectors[2].onlyLastModified == True
+
+
+def test_selector_matches_values_like_check():
+    selector = Selector("Status", "equals", "Released")
+    assert selector.matches("Released")
+    assert not selector.matches("Draft")
+    assert Selector("Size", "is-less-than", "5").matches("4.5")
+
+
+@pytest.mark.parametrize(
+    "selector,expected",
+    [
+        (Selector("Status", "equals", "Released"), "F eq 'Released'"),
+        (Selector("Status", "equals", "Bob's"), "F eq 'Bob''s'"),
+        (Selector("Size", "is-larger-than", "1024"), "(F gt 1024 or F eq null)"),
+        (Selector("Size", "is-larger-equal", 1.5), "(F ge 1.5 or F eq null)"),
+        (Selector("Size", "less-than", -3), "(F lt -3 or F eq null)"),
+        (Selector("Size", "less-equal", "2"), "(F le 2 or F eq null)"),
+        (
+            Selector("Modified", "is-older-than", "2024-03-02T00:00:00Z"),
+            "(F lt datetime'2024-03-03T00:00:00Z' or F eq null)",
+        ),
+        (
+            Selector("Modified", "is-not-older-than", "30d"),
+            "(F ge datetime'2024-01-31T00:00:00Z' or F eq null)",
+        ),
+        # numbers may be stored as text, e.g. `5.0`, so `equals` must stay client-side
+        (Selector("Size", "equals", "5"), None),
+        (Selector("Status", "equals", ""), None),
+        (Selector("Status", "contains", "Rel"), None),
+        (Selector("Status", "is-not-empty"), None),
+        (Selector("Size", "is-larger-than", "big"), None),
+        (Selector("Modified", "is-older-than", "someday"), None),
+    ],
+)
+def test_selector_to_odata_filter(selector, expected):
+    now = datetime(2024, 3, 2, tzinfo=timezone.utc).timestamp()
+    assert selector.to_odata_filter("F", now) == expected
+
+
+def test_selector_to_odata_filter_rejects_invalid_field_names():
+    assert Selector("Status", "equals", "Released").to_odata_filter("Some Status") is None
+
+
+def test_odata_filter_does_not_exclude_matching_values():
+    now = datetime(2024, 3, 2, tzinfo=timezone.utc).timestamp()
+    # the cutoff is widened, so a file which becomes older while fetching is still listed
+    assert Selector("Modified", "older-than", "1d").to_odata_filter("F", now) == (
+        "(F lt datetime'2024-03-02T00:00:00Z' or F eq null)"
+    )
+
+
+def test_files_selectors_to_odata_filter():
+    files_selectors = [
+        FilesSelectors(
+            "*.pdf",
+            [
+                Selector("Status", "equals", "Released"),
+                Selector("Status", "contains", "eleas"),
+                Selector("Size", "larger", 10),
+            ],
+        ),
+        FilesSelectors("*.docx", [Selector("Status", "equals", "Draft")]),
+    ]
+
+    assert files_selectors_to_odata_filter(files_selectors, lambda p: "F/" + p) == (
+        "(F/Status eq 'Released' and (F/Size gt 10 or F/Size eq null))"
+        " or (F/Status eq 'Draft')"
+    )
+    assert files_selectors_to_odata_filter(files_selectors[1:], lambda p: "F/" + p) == (
+        "F/Status eq 'Draft'"
+    )
+
+
+def test_files_selectors_to_odata_filter_without_restrictions():
+    selected = FilesSelectors("*.pdf", [Selector("Status", "equals", "Released")])
+    unrestricted = FilesSelectors("*.docx", [Selector("Status", "contains", "Draft")])
+
+    assert files_selectors_to_odata_filter([selected, unrestricted], lambda p: p) is None
+    assert files_selectors_to_odata_filter([selected], lambda p: None) is None
+    assert files_selectors_to_odata_filter([], lambda p: p) is None
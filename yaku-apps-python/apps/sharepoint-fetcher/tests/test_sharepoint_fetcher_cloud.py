@@ -6,14 +6,17 @@ import json
 import logging
 import os
 import re
+import stat
 from pathlib import Path
 from unittest import mock
 
 import pytest
+import requests
 from yaku.autopilot_utils.errors import AutopilotError
 from yaku.sharepoint_fetcher.cloud.sharepoint_fetcher_cloud import (
     SharepointFetcherCloud,
 )
+from yaku.sharepoint_fetcher.downloads import FILE_MODE, DownloadedFile
 from yaku.sharepoint_fetcher.selectors import FilesSelectors, Selector
 
 
@@ -182,7 +185,7 @@ def test_download_file(mocker, default_fetcher: SharepointFetcherCloud):
     mocked_connect_get_file_object = mocker.patch(
         "yaku.sharepoint_fetcher.cloud.connect.Connect.get_file_object"
     )
-    file_response = b"0x410x420x43"
+    file_response = DownloadedFile(Path("test3.txt.download"), 12, "abc123")
     mocked_connect_get_file_object.return_value = file_response
 
     mocked_connect_get_file_properties = mocker.patch(
@@ -204,23 +207,24 @@ def test_download_file(mocker, default_fetcher: SharepointFetcherCloud):
     mocked_connect_get_file_properties.assert_called_with("somepath", "test3.txt", "Documents")
     mocked_save_file.assert_has_calls(
         [
-            mock.call(res_folder, "test3.txt", file_response, False),
             mock.call(
                 res_folder,
                 "test3.txt" + SharepointFetcherCloud.metadata_file_suffix,
-                json.dumps(property_response, indent=2),
-                False,
+                json.dumps({**property_response, "__sha256__": "abc123"}, indent=2),
+                True,
             ),
-        ],
-        any_order=True,
+            mock.call(res_folder, "test3.txt", file_response, False),
+        ]
     )
+    # the properties are only written once, together with the hash
+    assert mocked_save_file.call_count == 2
 
 
 def test_download_file_trailing_slash(mocker, default_fetcher: SharepointFetcherCloud):
     mocked_connect_get_file_object = mocker.patch(
         "yaku.sharepoint_fetcher.cloud.connect.Connect.get_file_object"
     )
-    file_response = b"0x410x420x43"
+    file_response = DownloadedFile(Path("test3.txt.download"), 12, "abc123")
     mocked_connect_get_file_object.return_value = file_response
 
     mocked_connect_get_file_properties = mocker.patch(
@@ -287,27 +291,27 @@ def test_download_file_with_empty_selectors(mocker, default_fetcher: SharepointF
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.cloud.connect.Connect.get_file_object"
     )
+    mocked_connect_get_file_object.return_value = DownloadedFile(Path("download"), 0, "")
 
     default_fetcher._download_file(
         "evidence_path/", "/sites/123456/Test1/", "File1.docx", files_selectors=[]
     )
 
+    # properties, properties with hash of the downloaded file, file
     assert mocked_save_file.call_count == 2
     assert mocked_connect_get_file_object.call_count == 1
 
 
-def test_save_file_with_bytes(requests_mock, caplog):
+def test_save_file_with_bytes(requests_mock, caplog, tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     output_path = Path("Downloads/DocumentA/Files")
+    output_path.mkdir(parents=True)
 
-    mocked_open = mock.mock_open()
-    with mock.patch("builtins.open", mocked_open):
-        SharepointFetcherCloud.save_file(
-            requests_mock, output_path, "FILE.xlsx", b"x00xx", False
-        )
+    SharepointFetcherCloud.save_file(requests_mock, output_path, "FILE.xlsx", b"x00xx", False)
 
-    mocked_open.assert_called_with(Path.cwd() / output_path / "FILE.xlsx", "wb")
-    handle = mocked_open()
-    handle.write.assert_called_with(b"x00xx")
+    # the file is written to a temporary file first and then moved into place
+    assert [p.name for p in output_path.iterdir()] == ["FILE.xlsx"]
+    assert (output_path / "FILE.xlsx").read_bytes() == b"x00xx"
 
     assert caplog.record_tuples == [
         (
@@ -318,22 +322,23 @@ def test_save_file_with_bytes(requests_mock, caplog):
     ]
 
 
-def test_save_file_with_string(caplog):
+def test_save_file_with_string(caplog, tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     output_path = Path("Downloads/DocumentA/Files")
+    output_path.mkdir(parents=True)
+    (output_path / "FILE.xlsx").write_bytes(b"old contents")
 
-    mocked_open = mock.mock_open()
-    with mock.patch("builtins.open", mocked_open):
-        SharepointFetcherCloud.save_file(
-            default_fetcher,
-            path=output_path,
-            file_name="FILE.xlsx",
-            contents="{}",
-            enable_logging=False,
-        )
+    SharepointFetcherCloud.save_file(
+        default_fetcher,
+        path=output_path,
+        file_name="FILE.xlsx",
+        contents="{}",
+        enable_logging=False,
+    )
 
-    mocked_open.assert_called_with(Path.cwd() / output_path / "FILE.xlsx", "wb")
-    handle = mocked_open()
-    handle.write.assert_called_with(b"{}")
+    assert [p.name for p in output_path.iterdir()] == ["FILE.xlsx"]
+    assert (output_path / "FILE.xlsx").read_bytes() == b"{}"
+    assert stat.S_IMODE((output_path / "FILE.xlsx").stat().st_mode) == FILE_MODE
 
     assert caplog.record_tuples == [
         (
@@ -450,3 +455,217 @@ def test_generate_filters_and_selectors(requests_mock):
     )
     assert folder_filters == ["Folder1/"]
     assert files_selectors == {"Folder1/": filter_config}
+
+
+def test_incremental_download_folder_only_fetches_changed_files(mocker, tmp_path: Path):
+    remote_files = {"a.pdf": "1", "b.pdf": "1"}
+    mocked_get_changed_item_ids = mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_changed_item_ids",
+        return_value=(None, "delta-link-1"),
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.sharepoint_fetcher_cloud.SharepointFetcherCloud._fetch_subfolders",
+        return_value=[],
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.sharepoint_fetcher_cloud.SharepointFetcherCloud._fetch_files",
+        side_effect=lambda path: list(remote_files),
+    )
+    # fetch the properties one by one
+    mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_files_properties", return_value={}
+    )
+    mocked_get_file_properties = mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_file_properties",
+        side_effect=lambda path, name, library: {
+            "id": "id-" + name,
+            "cTag": remote_files[name],
+            "size": 1,
+        },
+    )
+
+    def get_file_object(path, name, library):
+        temporary_path = tmp_path / (name + ".download")
+        temporary_path.write_text(remote_files[name])
+        return DownloadedFile(temporary_path, 1, "sha-" + remote_files[name])
+
+    mocked_get_file_object = mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_file_object",
+        side_effect=get_file_object,
+    )
+
+    def download_folder():
+        SharepointFetcherCloud(
+            "Shared Documents/reports/",
+            tmp_path,
+            "https://some.server/sites/123456/",
+            "tenant-id",
+            "client-id",
+            "client-secret",
+            incremental=True,
+        ).download_folder()
+
+    download_folder()
+    assert mocked_get_file_object.call_count == 2
+
+    remote_files["b.pdf"] = "2"
+    remote_files["c.pdf"] = "1"
+    del remote_files["a.pdf"]
+    mocked_get_changed_item_ids.return_value = ({"id-b.pdf", "id-c.pdf"}, "delta-link-2")
+    mocked_get_file_properties.reset_mock()
+    mocked_get_file_object.reset_mock()
+    download_folder()
+
+    mocked_get_changed_item_ids.assert_called_with(None, "delta-link-1")
+    assert [c.args[1] for c in mocked_get_file_properties.call_args_list] == ["b.pdf", "c.pdf"]
+    assert [c.args[1] for c in mocked_get_file_object.call_args_list] == ["b.pdf", "c.pdf"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "__manifest__.json",
+        "__properties__.sqlite",
+        "b.pdf",
+        "b.pdf.__properties__.json",
+        "c.pdf",
+        "c.pdf.__properties__.json",
+    ]
+    assert json.loads((tmp_path / "__manifest__.json").read_text())["delta_link"] == (
+        "delta-link-2"
+    )
+
+    # unchanged files are skipped without any request
+    mocked_get_changed_item_ids.return_value = (set(), "delta-link-3")
+    mocked_get_file_properties.reset_mock()
+    download_folder()
+
+    assert mocked_get_file_properties.call_count == 0
+    assert (tmp_path / "b.pdf").read_text() == "2"
+
+
+def test_resumed_download_folder_skips_completed_folders_and_files(mocker, tmp_path: Path):
+    children = {
+        "": [{"name": "sub", "folder": {}}, {"name": "a.pdf", "file": {}}],
+        "sub/": [{"name": "b.pdf", "file": {}}, {"name": "c.pdf", "file": {}}],
+    }
+    mocked_get_children = mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_children",
+        side_effect=lambda path, library: iter(children[path]),
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_files_properties", return_value={}
+    )
+    mocked_get_file_properties = mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_file_properties",
+        side_effect=lambda path, name, library: {"id": "id-" + name, "size": 1},
+    )
+    failing_files = {"a.pdf"}
+
+    def get_file_object(path, name, library):
+        if name in failing_files:
+            raise requests.ConnectionError("connection lost")
+        temporary_path = tmp_path / (name + ".download")
+        temporary_path.write_text("x")
+        return DownloadedFile(temporary_path, 1, "sha-" + name)
+
+    mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_file_object",
+        side_effect=get_file_object,
+    )
+
+    def download_folder():
+        SharepointFetcherCloud(
+            "Shared Documents/",
+            tmp_path,
+            "https://some.server/sites/123456/",
+            "tenant-id",
+            "client-id",
+            "client-secret",
+            resume=True,
+        ).download_folder()
+
+    with pytest.raises(requests.ConnectionError):
+        download_folder()
+
+    failing_files.clear()
+    mocked_get_children.reset_mock()
+    mocked_get_file_properties.reset_mock()
+    download_folder()
+
+    assert [c.args for c in mocked_get_children.call_args_list] == [("", None)]
+    assert [c.args[1] for c in mocked_get_file_properties.call_args_list] == ["a.pdf"]
+    assert sorted(p.name for p in tmp_path.rglob("*.pdf")) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert not (tmp_path / "__checkpoint__.jsonl").exists()
+
+
+def test_download_folder_lists_every_folder_once(mocker, tmp_path: Path):
+    children = {
+        "": [{"name": "sub", "folder": {}}, {"name": "a.pdf", "file": {}}],
+        "sub/": [{"name": "b.pdf", "file": {}}],
+    }
+    mocked_get_children = mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.connect.Connect.get_children",
+        side_effect=lambda path, library: iter(children[path]),
+    )
+    mocked_download_file = mocker.patch(
+        "yaku.sharepoint_fetcher.cloud.sharepoint_fetcher_cloud.SharepointFetcherCloud._download_file",
+        return_value=True,
+    )
+
+    SharepointFetcherCloud(
+        "Shared Documents/",
+        tmp_path,
+        "https://some.server/sites/123456/",
+        "tenant-id",
+        "client-id",
+        "client-secret",
+    ).download_folder()
+
+    assert [c.args for c in mocked_get_children.call_args_list] == [("", None), ("sub/", None)]
+    assert [c.args[1:] for c in mocked_download_file.call_args_list] == [
+        ("sub/", "b.pdf"),
+        ("/sites/123456/Shared Documents/", "a.pdf"),
+    ]
+
+
+def test_download_folder_fetches_file_properties_in_batches(requests_mock, tmp_path: Path):
+    file_names = [f"file {i}.txt" for i in range(40)]
+    graph = "https://graph.microsoft.com/v1.0"
+    requests_mock.get(graph + "/sites/some.server:/sites/123456", json={"id": "host,site,web"})
+    requests_mock.get(
+        graph + "/sites/site/drive/root/children",
+        json={"value": [{"name": name, "file": {}} for name in file_names]},
+    )
+
+    def answer_batch(request, context):
+        return {
+            "responses": [
+                {
+                    "id": sub_request["id"],
+                    "status": 200,
+                    "body": {
+                        "id": sub_request["id"],
+                        "size": 1,
+                        "@microsoft.graph.downloadUrl": "https://download.server/file",
+                    },
+                }
+                for sub_request in request.json()["requests"]
+            ]
+        }
+
+    requests_mock.post(graph + "/$batch", json=answer_batch)
+    requests_mock.get("https://download.server/file", content=b"x")
+    fetcher = SharepointFetcherCloud(
+        "Shared Documents/",
+        tmp_path,
+        "https://some.server/sites/123456/",
+        "tenant-id",
+        "client-id",
+        "client-secret",
+    )
+
+    fetcher.download_folder()
+
+    assert sorted(p.name for p in tmp_path.iterdir() if p.suffix == ".txt") == sorted(
+        file_names
+    )
+    # site id, folder listing, two batches of properties and the 40 downloads
+    assert fetcher._connect.request_count == 1 + 1 + 2 + 40
+    assert requests_mock.call_count == 1 + 1 + 2 + 40
@@ -2,20 +2,38 @@
 #
 # SPDX-License-Identifier: MIT
 
+import hashlib
 import json
 import logging
 import os
 import re
+import tempfile
+import threading
+import time
 from pathlib import Path, PosixPath
 from typing import Any, Dict
 from unittest import mock
 
 import pytest
+import requests
 from yaku.autopilot_utils.errors import AutopilotConfigurationError, AutopilotError
+from yaku.sharepoint_fetcher.downloads import DownloadedFile
+from yaku.sharepoint_fetcher.on_premise.connect import Connect
 from yaku.sharepoint_fetcher.on_premise.sharepoint_fetcher_on_premise import (
     SharepointFetcherOnPremise,
 )
 from yaku.sharepoint_fetcher.selectors import FilesSelectors, Selector
+from yaku.sharepoint_fetcher.utils import PropertiesStore
+
+EMPTY_FILE = DownloadedFile(Path("download"), 0, hashlib.sha256().hexdigest())
+
+
+def downloaded_file(directory: Path, contents: bytes = b"") -> DownloadedFile:
+    """Create a temporary file like `Connect.get_file_object` does."""
+    fd, name = tempfile.mkstemp(suffix=".download", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        f.write(contents)
+    return DownloadedFile(Path(name), len(contents), hashlib.sha256(contents).hexdigest())
 
 
 @pytest.fixture
@@ -224,7 +242,7 @@ def test_download_file(mocker, default_fetcher: SharepointFetcherOnPremise):
     mocked_connect_get_file_object = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    file_response = b"0x410x420x43"
+    file_response = DownloadedFile(Path("test3.txt.download"), 12, "abc123")
     mocked_connect_get_file_object.return_value = file_response
 
     # mock get_file_properties
@@ -259,6 +277,12 @@ def test_download_file(mocker, default_fetcher: SharepointFetcherOnPremise):
                 json.dumps(property_response, indent=2),
                 True,
             ),
+            mock.call(
+                res_folder,
+                "test3.txt" + SharepointFetcherOnPremise.metadata_file_suffix,
+                json.dumps({**property_response, "__sha256__": "abc123"}, indent=2),
+                True,
+            ),
         ],
         any_order=True,
     )
@@ -269,7 +293,7 @@ def test_download_file_trailing_slash(mocker, default_fetcher: SharepointFetcher
     mocked_connect_get_file_object = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    file_response = b"0x410x420x43"
+    file_response = DownloadedFile(Path("test3.txt.download"), 12, "abc123")
     mocked_connect_get_file_object.return_value = file_response
 
     # mock get_file_properties
@@ -359,12 +383,14 @@ def test_download_file_with_empty_selectors(
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
+    mocked_connect_get_file_object.return_value = EMPTY_FILE
 
     default_fetcher._download_file(
         "evidence_path/", "/sites/123456/Test1/", "File1.docx", files_selectors=[]
     )
 
-    assert mocked_save_file.call_count == 2
+    # properties, properties with hash of the downloaded file, file
+    assert mocked_save_file.call_count == 3
     assert mocked_connect_get_file_object.call_count == 1
 
 
@@ -389,7 +415,7 @@ def test_download_file_with_simple_equality_selector(
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    mocked_connect_get_file_object.return_value = b""
+    mocked_connect_get_file_object.return_value = downloaded_file(tmp_path, b"content")
 
     default_fetcher._download_file(
         tmp_path,
@@ -400,8 +426,16 @@ def test_download_file_with_simple_equality_selector(
         ],
     )
 
-    assert (tmp_path / ("File1.docx" + default_fetcher.metadata_file_suffix)).exists()
-    assert (tmp_path / "File1.docx").exists()
+    properties_file = tmp_path / ("File1.docx" + default_fetcher.metadata_file_suffix)
+    assert json.loads(properties_file.read_text()) == {
+        "some_property": "some_data",
+        "__sha256__": hashlib.sha256(b"content").hexdigest(),
+    }
+    assert (tmp_path / "File1.docx").read_bytes() == b"content"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "File1.docx",
+        "File1.docx" + default_fetcher.metadata_file_suffix,
+    ]
     assert mocked_connect_get_file_object.call_count == 1
 
 
@@ -426,7 +460,7 @@ def test_download_file_with_invalid_property_selector(
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    mocked_connect_get_file_object.return_value = b""
+    mocked_connect_get_file_object.return_value = EMPTY_FILE
 
     with pytest.raises(AutopilotConfigurationError, match="unknown_property"):
         default_fetcher._download_file(
@@ -474,7 +508,7 @@ def test_download_file_with_custom_property_value(mocker, tmp_path: Path):
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    mocked_connect_get_file_object.return_value = b""
+    mocked_connect_get_file_object.return_value = downloaded_file(tmp_path)
 
     # put custom property file into tmp_path and tell it the properties reader instance
     custom_prop_def_file = evidence_folder / my_fetcher.custom_property_definitions_filename
@@ -530,7 +564,7 @@ def test_download_file_with_unmatched_custom_property_value(mocker, tmp_path: Pa
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    mocked_connect_get_file_object.return_value = b""
+    mocked_connect_get_file_object.return_value = EMPTY_FILE
 
     # put custom property file into tmp_path and tell it the properties reader instance
     custom_prop_def_file = evidence_folder / my_fetcher.custom_property_definitions_filename
@@ -579,7 +613,7 @@ def test_download_file_with_unmatched_simple_equality_selector(
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    mocked_connect_get_file_object.return_value = b""
+    mocked_connect_get_file_object.return_value = EMPTY_FILE
 
     default_fetcher._download_file(
         tmp_path,
@@ -609,7 +643,7 @@ def test_download_file_with_one_matched_and_one_unmatched_selectors(
     mocked_connect_get_file_object: mock.Mock = mocker.patch(
         "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object"
     )
-    mocked_connect_get_file_object.return_value = b""
+    mocked_connect_get_file_object.return_value = EMPTY_FILE
 
     # mock get_additional_file_properties
     mocked_connect_get_additional_file_object: mock.Mock = mocker.patch(
@@ -640,18 +674,18 @@ def test_download_file_with_one_matched_and_one_unmatched_selectors(
     assert mocked_connect_get_file_object.call_count == 0
 
 
-def test_save_file_with_bytes(requests_mock, caplog):
+def test_save_file_with_bytes(requests_mock, caplog, tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     output_path = Path("Downloads/DocumentA/Files")
+    output_path.mkdir(parents=True)
 
-    mocked_open = mock.mock_open()
-    with mock.patch("builtins.open", mocked_open):
-        SharepointFetcherOnPremise.save_file(
-            requests_mock, output_path, "FILE.xlsx", b"x00xx", False
-        )
+    SharepointFetcherOnPremise.save_file(
+        requests_mock, output_path, "FILE.xlsx", b"x00xx", False
+    )
 
-    mocked_open.assert_called_with(Path.cwd() / output_path / "FILE.xlsx", "wb")
-    handle = mocked_open()
-    handle.write.assert_called_with(b"x00xx")
+    # the file is written to a temporary file first and then moved into place
+    assert [p.name for p in output_path.iterdir()] == ["FILE.xlsx"]
+    assert (output_path / "FILE.xlsx").read_bytes() == b"x00xx"
 
     assert caplog.record_tuples == [
         (
@@ -662,22 +696,22 @@ def test_save_file_with_bytes(requests_mock, caplog):
     ]
 
 
-def test_save_file_with_string(caplog):
+def test_save_file_with_string(caplog, tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     output_path = Path("Downloads/DocumentA/Files")
+    output_path.mkdir(parents=True)
+    (output_path / "FILE.xlsx").write_bytes(b"old contents")
 
-    mocked_open = mock.mock_open()
-    with mock.patch("builtins.open", mocked_open):
-        SharepointFetcherOnPremise.save_file(
-            default_fetcher,
-            path=output_path,
-            file_name="FILE.xlsx",
-            contents="{}",
-            enable_logging=False,
-        )
+    SharepointFetcherOnPremise.save_file(
+        default_fetcher,
+        path=output_path,
+        file_name="FILE.xlsx",
+        contents="{}",
+        enable_logging=False,
+    )
 
-    mocked_open.assert_called_with(Path.cwd() / output_path / "FILE.xlsx", "wb")
-    handle = mocked_open()
-    handle.write.assert_called_with(b"{}")
+    assert [p.name for p in output_path.iterdir()] == ["FILE.xlsx"]
+    assert (output_path / "FILE.xlsx").read_bytes() == b"{}"
 
     assert caplog.record_tuples == [
         (
@@ -1349,7 +1383,7 @@ def test_download_folders_with_folder_filter_expression_and_selectors_plus_last_
 
     # mock get_file_object
     mocked_get_file_object = mocker.patch.object(default_fetcher._connect, "get_file_object")
-    mocked_get_file_object.return_value = ""
+    mocked_get_file_object.return_value = EMPTY_FILE
 
     default_fetcher.download_folder()
 
@@ -1367,14 +1401,26 @@ def test_download_folders_with_folder_filter_expression_and_selectors_plus_last_
                 '{\n  "PropABC": "AB"\n}',
                 True,
             ),
-            mock.call(PosixPath("evidence_path"), "FileA.pdf", "", False),
+            mock.call(
+                PosixPath("evidence_path"),
+                "FileA.pdf.__properties__.json",
+                json.dumps({"PropABC": "AB", "__sha256__": EMPTY_FILE.sha256}, indent=2),
+                True,
+            ),
+            mock.call(PosixPath("evidence_path"), "FileA.pdf", EMPTY_FILE, False),
             mock.call(
                 PosixPath("evidence_path"),
                 "File B.pdf.__properties__.json",
                 '{\n  "PropABC": "AB"\n}',
                 True,
             ),
-            mock.call(PosixPath("evidence_path"), "File B.pdf", "", False),
+            mock.call(
+                PosixPath("evidence_path"),
+                "File B.pdf.__properties__.json",
+                json.dumps({"PropABC": "AB", "__sha256__": EMPTY_FILE.sha256}, indent=2),
+                True,
+            ),
+            mock.call(PosixPath("evidence_path"), "File B.pdf", EMPTY_FILE, False),
             mock.call(
                 PosixPath("evidence_path"),
                 "FileC.pdf.__properties__.json",
@@ -1475,7 +1521,7 @@ def test_download_folders_with_file_filters_and_partial_matches_on_comment_messa
     )
 
     # mock get_file_object
-    mocker.patch.object(default_fetcher._connect, "get_file_object", return_value="")
+    mocker.patch.object(default_fetcher._connect, "get_file_object", return_value=EMPTY_FILE)
 
     default_fetcher.download_folder()
     assert "Some file filters for `<root path>` didn't match any file!" in caplog.text
@@ -1487,7 +1533,7 @@ def test_download_folders_with_file_filters_and_partial_matches_on_comment_messa
 
 
 def test_download_custom_property_definitions(
-    default_fetcher: SharepointFetcherOnPremise, mocker
+    default_fetcher: SharepointFetcherOnPremise, mocker, tmp_path: Path, monkeypatch
 ):
     expected_json_data = {
         "StatusList": {
@@ -1513,9 +1559,9 @@ def test_download_custom_property_definitions(
         {1: "History", 2: "No workflow"},
     ]
 
-    mocked_open = mock.mock_open()
-    with mock.patch("builtins.open", mocked_open):
-        default_fetcher.download_custom_property_definitions()
+    monkeypatch.chdir(tmp_path)
+    default_fetcher._destination_path.mkdir()
+    default_fetcher.download_custom_property_definitions()
 
     mocked_verify_site_lists.assert_called_once()
     assert mocked_get_items_for_list.call_count == 2
@@ -1524,16 +1570,12 @@ def test_download_custom_property_definitions(
     property_definitions_filename = (
         SharepointFetcherOnPremise.custom_property_definitions_filename
     )
-    mocked_open.assert_called_with(
-        Path.cwd() / output_path / property_definitions_filename, "wb"
-    )
-    handle = mocked_open()
-    written_json_data = json.loads(handle.write.call_args.args[0])
+    written_json_data = json.loads((output_path / property_definitions_filename).read_text())
     assert expected_json_data == written_json_data
 
 
 def test_download_custom_property_definitions_with_invalid_list_data(
-    default_fetcher: SharepointFetcherOnPremise, mocker
+    default_fetcher: SharepointFetcherOnPremise, mocker, tmp_path: Path, monkeypatch
 ):
     expected_json_data = {
         "StatusList": {
@@ -1560,9 +1602,9 @@ def test_download_custom_property_definitions_with_invalid_list_data(
 
     mocked_get_items_for_list.side_effect = mocked_return_items_for_list
 
-    mocked_open = mock.mock_open()
-    with mock.patch("builtins.open", mocked_open):
-        default_fetcher.download_custom_property_definitions()
+    monkeypatch.chdir(tmp_path)
+    default_fetcher._destination_path.mkdir()
+    default_fetcher.download_custom_property_definitions()
 
     mocked_verify_site_lists.assert_called_once()
     assert mocked_get_items_for_list.call_count == 2
@@ -1571,11 +1613,7 @@ def test_download_custom_property_definitions_with_invalid_list_data(
     property_definitions_filename = (
         SharepointFetcherOnPremise.custom_property_definitions_filename
     )
-    mocked_open.assert_called_with(
-        Path.cwd() / output_path / property_definitions_filename, "wb"
-    )
-    handle = mocked_open()
-    written_json_data = json.loads(handle.write.call_args.args[0])
+    written_json_data = json.loads((output_path / property_definitions_filename).read_text())
     assert expected_json_data == written_json_data
 
 
@@ -1604,3 +1642,499 @@ def test_generate_filters_and_selectors_with_duplicate_folders(requests_mock):
     )
     assert folder_filters == ["Folder1/"]
     assert files_selectors == {"Folder1/": filter_config}
+
+
+def _mock_sharepoint_folder_tree(mocker, download_directory: Path) -> set:
+    root = "/sites/123456/Documents/reports/"
+    folders = {
+        root: [root + "2023", root + "2024"],
+        root + "2023/": [],
+        root + "2024/": [root + "2024/Q1"],
+        root + "2024/Q1/": [],
+    }
+    files = ["a.pdf", "b.pdf", "c.pdf", "notes.txt"]
+    used_threads = set()
+
+    def respond(result):
+        used_threads.add(threading.current_thread().name)
+        time.sleep(0.01)
+        return result
+
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_folders",
+        side_effect=lambda url: respond([{"ServerRelativeUrl": f} for f in folders[url]]),
+    )
+
+    def properties(name):
+        return {
+            "Status": "Final" if name != "b.pdf" else "Draft",
+            "Modified": f"2024-01-0{files.index(name) + 1}T00:00:00",
+        }
+
+    def list_files(url, list_item_fields=None, odata_filter=None):
+        if not list_item_fields:
+            return respond([{"Name": f} for f in files])
+        return respond(
+            [
+                {
+                    "Name": f,
+                    "ListItemAllFields": {k: properties(f)[k] for k in list_item_fields},
+                }
+                for f in files
+            ]
+        )
+
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_files", side_effect=list_files
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_properties",
+        side_effect=lambda url, name: respond(properties(name)),
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object",
+        side_effect=lambda url, name: respond(
+            downloaded_file(download_directory, f"{url}/{name}".encode())
+        ),
+    )
+    return used_threads
+
+
+@pytest.mark.parametrize("max_parallel_requests", [1, 4])
+def test_download_folder_gives_same_result_with_parallel_requests(
+    mocker, caplog, tmp_path: Path, max_parallel_requests: int
+):
+    def download(destination_path: Path, max_parallel_requests: int):
+        destination_path.mkdir()
+        fetcher = SharepointFetcherOnPremise(
+            "Documents/reports/",
+            destination_path,
+            "https://some.server/sites/123456/",
+            "username",
+            "password",
+            filter_config=[
+                FilesSelectors(
+                    "2024/*.pdf",
+                    [Selector(property="Status", operator="equals", other_value="Final")],
+                    title="Latest final report",
+                    onlyLastModified=True,
+                ),
+                FilesSelectors("2023/*", [], title="Files of 2023"),
+            ],
+            max_parallel_requests=max_parallel_requests,
+        )
+        caplog.clear()
+        fetcher.download_folder()
+        return (
+            {
+                str(p.relative_to(destination_path)): p.read_bytes()
+                for p in destination_path.rglob("*")
+                # the properties store records modification times, which differ between runs
+                if p.is_file() and p.name != PropertiesStore.filename
+            },
+            caplog.text.replace(str(destination_path), "<destination>"),
+        )
+
+    used_threads = _mock_sharepoint_folder_tree(mocker, tmp_path)
+    expected_files, expected_log = download(tmp_path / "sequential", 1)
+    used_threads.clear()
+
+    files, log = download(tmp_path / "parallel", max_parallel_requests)
+
+    assert files == expected_files
+    assert log == expected_log
+    assert "2024/c.pdf" in files and "2024/a.pdf" not in files and "2024/b.pdf" not in files
+    assert "2023/notes.txt" in files and "2024/Q1/a.pdf" not in files
+    assert (
+        "Latest final report: <https://some.server/sites/123456/Documents/reports/2024/c.pdf>"
+        in log
+    )
+    assert any(name.startswith("prefetch") for name in used_threads) == (
+        max_parallel_requests > 1
+    )
+
+
+def test_download_folder_removes_prefetched_contents_after_failure(mocker, tmp_path: Path):
+    download_directory = tmp_path / "downloads"
+    download_directory.mkdir()
+    _mock_sharepoint_folder_tree(mocker, download_directory)
+    destination_path = tmp_path / "evidence"
+    destination_path.mkdir()
+    fetcher = SharepointFetcherOnPremise(
+        "Documents/reports/",
+        destination_path,
+        "https://some.server/sites/123456/",
+        "username",
+        "password",
+        filter_config=[FilesSelectors("2023/*", [])],
+        max_parallel_requests=4,
+    )
+
+    def fail_after_contents_are_prefetched(*args, **kwargs):
+        time.sleep(0.2)
+        raise AutopilotError("failed")
+
+    mocker.patch.object(
+        fetcher, "_download_file", side_effect=fail_after_contents_are_prefetched
+    )
+
+    with pytest.raises(AutopilotError, match="failed"):
+        fetcher.download_folder()
+
+    assert fetcher._connect.get_file_object.call_count > 1
+    assert list(download_directory.iterdir()) == []
+
+
+def test_incremental_download_folder_only_downloads_changed_files(mocker, tmp_path: Path):
+    remote_files = {name: "2024-01-01T00:00:00" for name in ["a.pdf", "b.pdf", "c.pdf"]}
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_folders", return_value=[]
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_files",
+        side_effect=lambda url: [{"Name": name} for name in remote_files],
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_properties",
+        side_effect=lambda url, name: {"Modified": remote_files[name]},
+    )
+    mocked_get_file_object = mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object",
+        side_effect=lambda url, name: downloaded_file(
+            tmp_path, f"{name} {remote_files[name]}".encode()
+        ),
+    )
+
+    def download_folder():
+        SharepointFetcherOnPremise(
+            "Documents/reports/",
+            tmp_path,
+            "https://some.server/sites/123456/",
+            "username",
+            "password",
+            incremental=True,
+        ).download_folder()
+
+    download_folder()
+    assert mocked_get_file_object.call_count == 3
+
+    remote_files["b.pdf"] = "2024-02-01T00:00:00"
+    del remote_files["c.pdf"]
+    remote_files["d.pdf"] = "2024-02-01T00:00:00"
+    mocked_get_file_object.reset_mock()
+    download_folder()
+
+    assert [c.args[1] for c in mocked_get_file_object.call_args_list] == ["b.pdf", "d.pdf"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "__manifest__.json",
+        "__properties__.sqlite",
+        "a.pdf",
+        "a.pdf.__properties__.json",
+        "b.pdf",
+        "b.pdf.__properties__.json",
+        "d.pdf",
+        "d.pdf.__properties__.json",
+    ]
+    assert (tmp_path / "b.pdf").read_bytes() == b"b.pdf 2024-02-01T00:00:00"
+    assert json.loads((tmp_path / "a.pdf.__properties__.json").read_text()) == {
+        "Modified": "2024-01-01T00:00:00",
+        "__sha256__": hashlib.sha256(b"a.pdf 2024-01-01T00:00:00").hexdigest(),
+    }
+    properties_store = PropertiesStore(tmp_path / PropertiesStore.filename, read_only=True)
+    for name in ["a.pdf", "b.pdf", "d.pdf"]:
+        properties_file = tmp_path / (name + ".__properties__.json")
+        assert properties_store.get(tmp_path / name, properties_file.stat()) == json.loads(
+            properties_file.read_text()
+        )
+
+
+def test_incremental_download_folder_skips_unchanged_files_with_real_connect(
+    requests_mock, tmp_path: Path
+):
+    contents = {"a.pdf": b"contents of a", "b.pdf": b"contents of b"}
+    requests_mock.get(
+        re.compile(r".*/GetFolderByServerRelativeUrl\('.*'\)/folders"),
+        json={"d": {"results": []}},
+    )
+    requests_mock.get(
+        re.compile(r".*/GetFolderByServerRelativeUrl\('.*'\)/files"),
+        json={"d": {"results": [{"Name": name} for name in contents]}},
+    )
+    for name, data in contents.items():
+        requests_mock.get(
+            re.compile(rf".*decodedurl='.*/{re.escape(name)}'\)/ListItemAllFields.*"),
+            json={
+                "d": {
+                    "Modified": "2024-01-01T00:00:00",
+                    "File": {"Length": str(len(data))},
+                }
+            },
+        )
+        requests_mock.get(
+            re.compile(rf".*decodedurl='.*/{re.escape(name)}'\)/\$value"), content=data
+        )
+
+    def download_folder():
+        SharepointFetcherOnPremise(
+            "Documents/reports/",
+            tmp_path,
+            "https://some.server/sites/123456/",
+            "username",
+            "password",
+            incremental=True,
+        ).download_folder()
+
+    def content_requests():
+        return [r.url for r in requests_mock.request_history if r.url.endswith("/$value")]
+
+    download_folder()
+    assert len(content_requests()) == 2
+    manifest = json.loads((tmp_path / "__manifest__.json").read_text())
+    assert sorted(entry["size"] for entry in manifest["files"].values()) == [13, 13]
+
+    requests_mock.reset_mock()
+    download_folder()
+
+    assert content_requests() == []
+    assert (tmp_path / "a.pdf").read_bytes() == b"contents of a"
+
+
+def test_download_folder_forgets_sizes_of_skipped_files(requests_mock, tmp_path: Path):
+    statuses = {"a.pdf": "Final", "b.pdf": "Draft"}
+    requests_mock.get(
+        re.compile(r".*/GetFolderByServerRelativeUrl\('.*'\)/folders"),
+        json={"d": {"results": []}},
+    )
+    requests_mock.get(
+        re.compile(r".*/GetFolderByServerRelativeUrl\('.*'\)/files"),
+        json={"d": {"results": [{"Name": name} for name in statuses]}},
+    )
+    for name, status in statuses.items():
+        requests_mock.get(
+            re.compile(rf".*decodedurl='.*/{re.escape(name)}'\)/ListItemAllFields.*"),
+            json={"d": {"Status": status, "File": {"Length": "4"}}},
+        )
+        requests_mock.get(
+            re.compile(rf".*decodedurl='.*/{re.escape(name)}'\)/\$value"), content=b"data"
+        )
+    fetcher = SharepointFetcherOnPremise(
+        "Documents/reports/",
+        tmp_path,
+        "https://some.server/sites/123456/",
+        "username",
+        "password",
+        filter_config=[
+            FilesSelectors(
+                "*.pdf", [Selector(property="Status", operator="equals", other_value="Final")]
+            )
+        ],
+    )
+
+    fetcher.download_folder()
+
+    assert (tmp_path / "a.pdf").exists() and not (tmp_path / "b.pdf").exists()
+    assert fetcher._connect._file_sizes == {}
+
+
+def test_resumed_download_folder_skips_completed_folders_and_files(mocker, tmp_path: Path):
+    prefix = "/sites/123456/Documents/reports/"
+    folders = {"": ["2023", "2024"], "2023/": [], "2024/": []}
+    files = {"": ["root.txt"], "2023/": ["a.txt", "b.txt"], "2024/": ["c.txt", "d.txt"]}
+    failing_files = {"d.txt"}
+
+    mocked_get_folders = mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_folders",
+        side_effect=lambda url: [
+            {"ServerRelativeUrl": url + folder} for folder in folders[url[len(prefix) :]]
+        ],
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_files",
+        side_effect=lambda url, *args, **kwargs: [
+            {"Name": name} for name in files[url[len(prefix) :]]
+        ],
+    )
+    mocked_get_file_properties = mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_properties",
+        side_effect=lambda url, name: {"Modified": "2024-01-01T00:00:00"},
+    )
+
+    def get_file_object(url, name):
+        if name in failing_files:
+            raise requests.ConnectionError("connection lost")
+        return downloaded_file(tmp_path, name.encode())
+
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object",
+        side_effect=get_file_object,
+    )
+
+    def download_folder():
+        SharepointFetcherOnPremise(
+            "Documents/reports/",
+            tmp_path,
+            "https://some.server/sites/123456/",
+            "username",
+            "password",
+            resume=True,
+        ).download_folder()
+
+    with pytest.raises(requests.ConnectionError):
+        download_folder()
+    assert (tmp_path / "__checkpoint__.jsonl").exists()
+
+    failing_files.clear()
+    mocked_get_folders.reset_mock()
+    mocked_get_file_properties.reset_mock()
+    download_folder()
+
+    assert [c.args[0] for c in mocked_get_folders.call_args_list] == [prefix, prefix + "2024/"]
+    assert [c.args[1] for c in mocked_get_file_properties.call_args_list] == [
+        "d.txt",
+        "root.txt",
+    ]
+    assert sorted(
+        str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*") if p.is_file()
+    ) == sorted(
+        [
+            path + suffix
+            for path in ["root.txt", "2023/a.txt", "2023/b.txt", "2024/c.txt", "2024/d.txt"]
+            for suffix in ["", ".__properties__.json"]
+        ]
+        + ["__properties__.sqlite"]
+    )
+    assert (tmp_path / "2024" / "d.txt").read_bytes() == b"d.txt"
+
+
+def test_download_folder_skips_folders_excluded_by_filters(mocker, tmp_path: Path):
+    _mock_sharepoint_folder_tree(mocker, tmp_path)
+    mocked_get_folders = mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_folders",
+        side_effect=lambda url: [
+            {"ServerRelativeUrl": url + folder} for folder in ("2023", "2024")
+        ],
+    )
+    fetcher = SharepointFetcherOnPremise(
+        "Documents/reports/",
+        tmp_path,
+        "https://some.server/sites/123456/",
+        "username",
+        "password",
+        filter_config=[FilesSelectors("2023/*.pdf", [])],
+    )
+
+    fetcher.download_folder()
+
+    assert [c.args[0] for c in mocked_get_folders.call_args_list] == [
+        "/sites/123456/Documents/reports/"
+    ]
+    assert sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*") if p.is_dir()) == [
+        "2023"
+    ]
+
+
+def _mock_folder_with_listed_status(mocker, get_files_error=None, filter_error=None):
+    status = {"a.pdf": "Final", "b.pdf": "Draft", "c.pdf": "Final"}
+
+    def get_files(url, list_item_fields=None, odata_filter=None):
+        if odata_filter and filter_error:
+            raise filter_error
+        if list_item_fields and get_files_error:
+            raise get_files_error
+        if list_item_fields:
+            assert list_item_fields == ["Status"]
+            return [{"Name": n, "ListItemAllFields": {"Status": s}} for n, s in status.items()]
+        return [{"Name": n} for n in status]
+
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_folders", return_value=[]
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_files", side_effect=get_files
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_object",
+        return_value=EMPTY_FILE,
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.sharepoint_fetcher_on_premise.SharepointFetcher.save_file"
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.sharepoint_fetcher_on_premise.SharepointFetcher._unlink_local_file"
+    )
+    mocker.patch(
+        "yaku.sharepoint_fetcher.utils.PropertiesReader.get_file_property",
+        side_effect=lambda path, name: status[path.name],
+    )
+    return mocker.patch(
+        "yaku.sharepoint_fetcher.on_premise.connect.Connect.get_file_properties",
+        side_effect=lambda url, name: {"Status": status[name]},
+    )
+
+
+def _fetcher_selecting_final_files(tmp_path: Path) -> SharepointFetcherOnPremise:
+    return SharepointFetcherOnPremise(
+        "Documents/reports/",
+        tmp_path,
+        "https://some.server/sites/123456/",
+        "username",
+        "password",
+        filter_config=[
+            FilesSelectors("*.pdf", [Selector("Status", "equals", "Final")], title="Final")
+        ],
+    )
+
+
+def test_download_folder_skips_files_excluded_by_listed_properties(mocker, tmp_path: Path):
+    mocked_get_file_properties = _mock_folder_with_listed_status(mocker)
+
+    _fetcher_selecting_final_files(tmp_path).download_folder()
+
+    assert [c.args[1] for c in mocked_get_file_properties.call_args_list] == [
+        "a.pdf",
+        "c.pdf",
+    ]
+
+
+def test_download_folder_checks_every_file_if_properties_can_not_be_listed(
+    mocker, tmp_path: Path
+):
+    response = requests.Response()
+    response.status_code = 400
+    mocked_get_file_properties = _mock_folder_with_listed_status(
+        mocker, requests.exceptions.HTTPError(response=response)
+    )
+
+    _fetcher_selecting_final_files(tmp_path).download_folder()
+
+    assert [c.args[1] for c in mocked_get_file_properties.call_args_list] == [
+        "a.pdf",
+        "b.pdf",
+        "c.pdf",
+    ]
+
+
+def test_download_folder_passes_selectors_as_odata_filter(mocker, tmp_path: Path):
+    _mock_folder_with_listed_status(mocker)
+
+    _fetcher_selecting_final_files(tmp_path).download_folder()
+
+    assert [c.kwargs for c in Connect.get_files.call_args_list] == [
+        {"odata_filter": "ListItemAllFields/Status eq 'Final'"}
+    ]
+
+
+def test_download_folder_lists_all_files_if_odata_filter_is_rejected(mocker, tmp_path: Path):
+    response = requests.Response()
+    response.status_code = 400
+    mocked_get_file_properties = _mock_folder_with_listed_status(
+        mocker, filter_error=requests.exceptions.HTTPError(response=response)
+    )
+
+    _fetcher_selecting_final_files(tmp_path).download_folder()
+
+    assert [c.args[1] for c in Connect.get_files.call_args_list] == [["Status"], ["Status"]]
+    assert [c.args[1] for c in mocked_get_file_properties.call_args_list] == [
+        "a.pdf",
+        "c.pdf",
+    ]
@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+from pathlib import Path
+
+from yaku.sharepoint_fetcher.utils import (
+    PROPERTIES_FILE_SUFFIX,
+    PropertiesReader,
+    PropertiesStore,
+)
+
+
+def _write_properties(path: Path, properties: dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    properties_file = path.with_name(path.name + PROPERTIES_FILE_SUFFIX)
+    properties_file.write_text(json.dumps(properties))
+    return properties_file
+
+
+def test_properties_store_returns_recorded_properties(tmp_path: Path):
+    properties_file = _write_properties(tmp_path / "folder" / "a.txt", {"Title": "a"})
+    store = PropertiesStore(tmp_path / PropertiesStore.filename)
+    with store.writing():
+        store.put(tmp_path / "folder" / "a.txt", properties_file, json.dumps({"Title": "a"}))
+
+    reading_store = PropertiesStore(tmp_path / PropertiesStore.filename, read_only=True)
+
+    assert reading_store.get(tmp_path / "folder" / "a.txt", properties_file.stat()) == {
+        "Title": "a"
+    }
+    assert reading_store.get(tmp_path / "folder" / "b.txt", properties_file.stat()) is None
+
+
+def test_properties_store_ignores_changed_properties_files(tmp_path: Path):
+    properties_file = _write_properties(tmp_path / "a.txt", {"Title": "a"})
+    store = PropertiesStore(tmp_path / PropertiesStore.filename)
+    with store.writing():
+        store.put(tmp_path / "a.txt", properties_file, json.dumps({"Title": "a"}))
+    properties_file.write_text(json.dumps({"Title": "changed"}))
+
+    reading_store = PropertiesStore(tmp_path / PropertiesStore.filename, read_only=True)
+
+    assert reading_store.get(tmp_path / "a.txt", properties_file.stat()) is None
+
+
+def test_properties_store_commits_in_batches(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(PropertiesStore, "commit_interval", 2)
+    store = PropertiesStore(tmp_path / PropertiesStore.filename)
+    reading_store = PropertiesStore(tmp_path / PropertiesStore.filename, read_only=True)
+    properties_files = {
+        name: _write_properties(tmp_path / name, {"Title": name}) for name in ["a", "b", "c"]
+    }
+
+    with store.writing():
+        for name, properties_file in properties_files.items():
+            store.put(tmp_path / name, properties_file, json.dumps({"Title": name}))
+        assert reading_store.get(tmp_path / "b", properties_files["b"].stat()) is not None
+        assert reading_store.get(tmp_path / "c", properties_files["c"].stat()) is None
+
+    assert reading_store.get(tmp_path / "c", properties_files["c"].stat()) is not None
+
+
+def test_properties_store_skips_files_without_properties_file(tmp_path: Path):
+    store = PropertiesStore(tmp_path / PropertiesStore.filename)
+    with store.writing():
+        store.put(tmp_path / "a.txt", tmp_path / ("a.txt" + PROPERTIES_FILE_SUFFIX), "{}")
+
+    assert not (tmp_path / PropertiesStore.filename).exists()
+
+
+def test_properties_reader_reads_properties_from_store(tmp_path: Path):
+    properties_file = _write_properties(tmp_path / "a.txt", {"Title": "file"})
+    store = PropertiesStore(tmp_path / PropertiesStore.filename)
+    with store.writing():
+        store.put(tmp_path / "a.txt", properties_file, json.dumps({"Title": "store"}))
+
+    reader = PropertiesReader(
+        tmp_path / "__custom_property_definitions__.json",
+        properties_store=tmp_path / PropertiesStore.filename,
+    )
+
+    assert reader.get_file_properties(tmp_path / "a.txt", ["Title"]) == {"Title": "store"}
@@ -12,6 +12,7 @@ from pydantic import BaseSettings, Field, validator
 from requests import Response, Session
 from requests.exceptions import HTTPError, InvalidURL, JSONDecodeError
 from requests_ntlm import HttpNtlmAuth
+from yaku.autopilot_utils.throttling import ThrottledTransport
 
 
 class Settings(BaseSettings):
@@ -40,6 +41,10 @@ class SharepointClient:
     Establish link with a sharepoint site to upload folders and files.
 
     This class provides functionality to upload files and folders on a SharePoint site.
+
+    Requests which are throttled by SharePoint (`429`/`503`) are sent again
+    after the time given in the `Retry-After` header. Other failed requests
+    are not sent again, as they might already have changed the site.
     """
 
     def __init__(self, config: Settings):
@@ -54,6 +59,7 @@ class SharepointClient:
         session.auth = HttpNtlmAuth(config.username, config.password)
         session.verify = False
         self._session = session
+        self._transport = ThrottledTransport()
 
     def _exchange_hostname_by_forced_ip_address(self, url: str) -> Tuple[str, str]:
         """
@@ -74,8 +80,11 @@ class SharepointClient:
         if self._force_ip:
             url, host = self._exchange_hostname_by_forced_ip_address(url)
             custom_headers["Host"] = host
-        return self._session.post(
-            url, headers=custom_headers, data=data, verify=self._session.verify
+        return self._transport.request(
+            lambda: self._session.post(
+                url, headers=custom_headers, data=data, verify=self._session.verify
+            ),
+            idempotent=False,
         )
 
     def _get_form_digest_value(self) -> str:
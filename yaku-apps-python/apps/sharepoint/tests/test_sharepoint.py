@@ -90,6 +90,20 @@ class TestFormDigestValue:
             == "application/json;odata=verbose"
         )
 
+    def test_retries_throttled_request(self, mocker):
+        """Test _get_form_digest_value with a throttled request."""
+        client = SharepointClient(valid_connect_config)
+        sleep = mocker.patch.object(client._transport, "_sleep")
+        throttled = mock.MagicMock(status_code=429, headers={"Retry-After": "5"})
+        ok = mock.MagicMock(status_code=200)
+        ok.json.return_value = {"d": {"GetContextWebInformation": {"FormDigestValue": "test"}}}
+        mocked_post_request = mocker.patch.object(
+            client._session, "post", side_effect=[throttled, ok]
+        )
+        assert client._get_form_digest_value() == "test"
+        assert mocked_post_request.call_count == 2
+        sleep.assert_called_once_with(5.0)
+
     def test_handles_invalid_status(self, mocker):
         """Test _get_form_digest_value."""
         client = SharepointClient(valid_connect_config)
@@ -7,13 +7,6 @@ from typing import Any, Dict, List
 
 from loguru import logger
 
-from .splunk.base import (
-    SplunkBaseSettings,
-    SplunkOneShotSearchSettings,
-    SplunkSearchSettings,
-)
-from .splunk.fetcher import SplunkFetcher
-
 DEFAULT_SLEEP_DURATION = 20
 MAX_RETRY_COUNT = 5
 
@@ -52,6 +45,15 @@ def fetch_splunk_data(
     end_time,
     validate_results: bool,
 ):
+    # pydantic and splunklib take long to import, so they are only imported
+    # when fetching and not already for `--version` or usage errors
+    from .splunk.base import (
+        SplunkBaseSettings,
+        SplunkOneShotSearchSettings,
+        SplunkSearchSettings,
+    )
+    from .splunk.fetcher import SplunkFetcher
+
     client_settings = SplunkBaseSettings(
         app=app, username=username, password=password, token=token, host=host, port=port
     )
@@ -66,7 +66,7 @@ class TestWriteOutputFile:
 
 
 class TestFetchSplunkData:
-    @mock.patch("yaku.splunk_fetcher.commands.SplunkFetcher")
+    @mock.patch("yaku.splunk_fetcher.splunk.fetcher.SplunkFetcher")
     def test_fetch_splunk_data_with_one_shot_search(self, mock_fetcher):
         mocked_fetcher = mock_fetcher.return_value
         mocked_fetcher.fetch.return_value = "data"
@@ -93,7 +93,7 @@ class TestFetchSplunkData:
         assert mocked_fetcher.fetch.call_args[0][1] == False
         assert result == "data"
 
-    @mock.patch("yaku.splunk_fetcher.commands.SplunkFetcher")
+    @mock.patch("yaku.splunk_fetcher.splunk.fetcher.SplunkFetcher")
     def test_fetch_splunk_data_with_dispatched_search(self, mock_fetcher):
         mocked_fetcher = mock_fetcher.return_value
         mocked_fetcher.fetch.return_value = "data"
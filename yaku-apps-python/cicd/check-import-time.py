@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Check that the apps in the `apps` folder don't import heavy modules at startup.
+
+Every check spawns a new app process, so the apps only import their heavy
+third-party dependencies where a command really needs them. For every app,
+the module given as `entry_point` of the `pex_binary` in the app's BUILD file
+is run with `--version` in a fresh interpreter with `python -X importtime`.
+The check fails if one of the `HEAVY_MODULES` was imported, unless the app is
+allowed to import it in `ALLOWED_HEAVY_MODULES`.
+
+The import time of every app is printed as well, but it isn't checked, as it
+depends too much on the machine.
+
+Run from the `yaku-apps-python` folder with a Python interpreter which has all
+third-party dependencies installed, e.g. the one from `pants export`.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+ENTRY_POINT_PATTERN = re.compile(r"""entry_point\s*=\s*["']([\w.]+)(:\w+)?["']""")
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s*(\d+) \|\s*(\d+) \|( *)(\S+)$")
+
+HEAVY_MODULES = {
+    "artifactory",
+    "openpyxl",
+    "pandas",
+    "pydantic",
+    "pyhanko",
+    "requests_ntlm",
+    "splunklib",
+}
+
+# heavy modules which apps still need at startup, e.g. for their config models
+ALLOWED_HEAVY_MODULES: Dict[str, Set[str]] = {
+    "excel-tools": {"openpyxl", "pandas"},
+    "sharepoint": {"pydantic", "requests_ntlm"},
+    "sharepoint-evaluator": {"pydantic"},
+    "sharepoint-fetcher": {"pydantic"},
+}
+
+
+def find_entry_point(app: Path) -> str | None:
+    match = ENTRY_POINT_PATTERN.search((app / "BUILD").read_text())
+    return match.group(1) if match else None
+
+
+def measure_startup(module: str, pythonpath: str) -> Tuple[float, Set[str], List[str]]:
+    """
+    Run `module` with `--version` and return its startup details.
+
+    Returns the import time in ms, the top-level packages of all imported
+    modules and the slowest modules imported directly by `module`.
+    """
+    env = {**os.environ, "PYTHONPATH": pythonpath}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", module, "--version"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages = set()
+    children = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if not match:
+            continue
+        imported_module = match.group(4)
+        packages.add(imported_module.split(".")[0])
+        total += int(match.group(1)) / 1000
+        if len(match.group(3)) // 2 == 1:
+            children.append((int(match.group(2)) / 1000, imported_module))
+    slowest = [f"{ms:>8.1f}ms {name}" for ms, name in sorted(children, reverse=True)[:5]]
+    return total, packages, slowest
+
+
+def main():
+    package_paths = [str(p) for p in sorted(Path("packages").glob("*/src"))]
+
+    failed = []
+    print(f"{'app':<28} {'import time':>12}  heavy modules")
+    for app in sorted(Path("apps").iterdir()):
+        module = find_entry_point(app) if (app / "BUILD").exists() else None
+        if module is None:
+            continue
+        pythonpath = os.pathsep.join([str(app / "src"), *package_paths])
+        import_time, packages, slowest_imports = measure_startup(module, pythonpath)
+        heavy_modules = (packages & HEAVY_MODULES) - ALLOWED_HEAVY_MODULES.get(app.name, set())
+        if heavy_modules:
+            failed.append((app.name, slowest_imports))
+        print(f"{app.name:<28} {import_time:>10.0f}ms  {', '.join(sorted(heavy_modules))}")
+
+    for app_name, slowest_imports in failed:
+        print(f"\nSlowest imports of {app_name}:")
+        for line in slowest_imports:
+            print(f"  {line}")
+    if failed:
+        print(
+            "\nSome apps import heavy modules at startup! Move these imports into the "
+            "functions which need them."
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,8 @@ COVERAGE_TMP_DIR_NAME=$(basename ${COVERAGE_TMP_DIR})
 xmllint --xpath //@filename ${COVERAGE_XML_FILE} | sed -e 's/^\s*filename="\(.*\)"$/\1/' | grep -v "__global_coverage__" | sort > ${COVERAGE_TMP_DIR}/covered-files.txt
 
 # get list of all Python files
-find apps -name "*.py" -not -path '*/tests/*' -not -path '*/tests-pex/*' -not -path '*/tests-integration/*' | sort > ${COVERAGE_TMP_DIR}/all-files.txt
-find packages -name "*.py" -not -path '*/tests/*' -not -path '*/tests-pex/*' -not -path '*/tests-integration/*' | sort >> ${COVERAGE_TMP_DIR}/all-files.txt
+find apps -name "*.py" -not -path '*/tests/*' -not -path '*/tests-pex/*' -not -path '*/tests-integration/*' -not -path '*/tests-benchmark/*' | sort > ${COVERAGE_TMP_DIR}/all-files.txt
+find packages -name "*.py" -not -path '*/tests/*' -not -path '*/tests-pex/*' -not -path '*/tests-integration/*' -not -path '*/tests-benchmark/*' | sort >> ${COVERAGE_TMP_DIR}/all-files.txt
 
 # compare the two lists of files and print difference
 echo -n "\n\n=======================================================================\n"
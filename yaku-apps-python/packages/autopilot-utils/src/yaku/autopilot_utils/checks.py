@@ -2,10 +2,11 @@
 #
 # SPDX-License-Identifier: MIT
 
+import operator as op
 import re
 from datetime import datetime
 from functools import wraps
-from typing import Any, Protocol
+from typing import Any, Callable, Protocol
 
 import dateutil.parser
 import pytz
@@ -138,13 +139,29 @@ SECONDS_PER_UNIT = {
 }
 
 
+_ISO_TIMESTAMP_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d{3}|\.\d{6})?)?)?(Z|[+-]\d{2}:\d{2})?"
+)
+
+
+def _parse_timestamp(timestamp: str) -> datetime | None:
+    # fast path for the common ISO 8601 timestamps (e.g. from SharePoint), for which
+    # `datetime.fromisoformat` gives the same result as `dateutil.parser.parse`
+    if _ISO_TIMESTAMP_PATTERN.fullmatch(timestamp):
+        try:
+            return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    try:
+        return dateutil.parser.parse(timestamp)
+    except dateutil.parser.ParserError:
+        return None
+
+
 def convert_to_date(timestamp):
     try:
         if "-" in timestamp or ":" in timestamp:
-            try:
-                date = dateutil.parser.parse(timestamp)
-            except dateutil.parser.ParserError:
-                date = None
+            date = _parse_timestamp(timestamp)
             if date is not None:
                 return date.astimezone(tz=pytz.utc).timestamp()
         else:
@@ -160,14 +177,16 @@ def convert_to_date(timestamp):
         return None
 
 
+_TIME_INTERVAL_PATTERN = re.compile(
+    r"(?P<value>-?\d+(\.\d+)?)(?P<unit>(" + "|".join(SECONDS_PER_UNIT.keys()) + ")?)"
+)
+
+
 def convert_to_seconds(timestamp: str) -> float:
     timestamp = timestamp.replace(" ", "")
     seconds: float = 0
-    units_pattern = "|".join(SECONDS_PER_UNIT.keys())
     found_at_least_one_pattern = False
-    for item in re.finditer(
-        r"(?P<value>-?\d+(\.\d+)?)(?P<unit>(" + units_pattern + ")?)", timestamp
-    ):
+    for item in _TIME_INTERVAL_PATTERN.finditer(timestamp):
         seconds += SECONDS_PER_UNIT.get(item.group("unit"), 1) * float(item.group("value"))
         found_at_least_one_pattern = True
 
@@ -287,3 +306,130 @@ def check(
     check_result = checks_dict.get(operator, invalid_operator)(checked_value, other_value)
 
     return check_result
+
+
+CompiledCheck = Callable[[str], bool]
+
+
+def _compile_equals(other_value: OtherValue) -> CompiledCheck:
+    other_string = str(other_value)
+    try:
+        other_number = float(other_value)
+    except ValueError:
+
+        def equals_string(checked_value: str) -> bool:
+            if not isinstance(checked_value, str):
+                return equals(checked_value, other_value)
+            return checked_value == other_string
+
+        return equals_string
+
+    def equals_number(checked_value: str) -> bool:
+        try:
+            return float(checked_value) == other_number
+        except ValueError:
+            return str(checked_value) == other_string
+
+    return equals_number
+
+
+def _make_number_comparison_compiler(
+    compare: Callable[[float, float], bool],
+) -> Callable[[OtherValue], CompiledCheck]:
+    def compiler(other_value: OtherValue) -> CompiledCheck:
+        try:
+            other_number = float(other_value)
+        except ValueError as e:
+            raise AutopilotConfigurationError(
+                f"Could not convert `{other_value}` to a number!"
+            ) from e
+
+        def compare_number(checked_value: str) -> bool:
+            try:
+                checked_number = float(checked_value)
+            except ValueError as e:
+                raise AutopilotError(
+                    f"Could not convert `{checked_value}` to a number!"
+                ) from e
+            return compare(checked_number, other_number)
+
+        return compare_number
+
+    return compiler
+
+
+def _make_older_compiler(negate: bool) -> Callable[[OtherValue], CompiledCheck]:
+    def compiler(other_value: OtherValue) -> CompiledCheck:
+        other_date = convert_to_date(other_value)
+        if other_date is None:
+            other_time_interval = convert_to_seconds(str(other_value))
+
+        def compare_date(checked_value: str) -> bool:
+            some_date = convert_to_date(checked_value)
+            if some_date is None:
+                raise AutopilotError(
+                    f"The value '{checked_value}' is not a valid date and cannot be used for comparison!"
+                )
+            if other_date is None:
+                is_older = some_date < datetime.today().timestamp() - other_time_interval
+            else:
+                is_older = some_date < other_date
+            return not is_older if negate else bool(is_older)
+
+        return compare_date
+
+    return compiler
+
+
+def _compile_contains(other_value: OtherValue) -> CompiledCheck:
+    other_string = str(other_value)
+
+    def contains_string(checked_value: str) -> bool:
+        return other_string in str(checked_value)
+
+    return contains_string
+
+
+_check_compilers: dict[Callable, Callable[[OtherValue], CompiledCheck]] = {
+    equals: _compile_equals,
+    larger: _make_number_comparison_compiler(op.gt),
+    larger_equal: _make_number_comparison_compiler(op.ge),
+    less: _make_number_comparison_compiler(op.lt),
+    less_equal: _make_number_comparison_compiler(op.le),
+    older: _make_older_compiler(negate=False),
+    not_older: _make_older_compiler(negate=True),
+    contains: _compile_contains,
+}
+
+
+def compile_check(operator: str, other_value: OtherValue | None) -> CompiledCheck:
+    """
+    Prepare a check for evaluating many values against the same operator and value.
+
+    Validates the `operator` and pre-parses the `other_value` once, e.g.
+    converts it to a number or to a date or time interval, and returns a
+    function which only takes the `checked_value`::
+
+        is_recent = compile_check("not-older-than", "30d")
+        for value in values:
+            if is_recent(value): ...
+
+    The returned function gives the same results as :py:func:`check`, but
+    errors in the `other_value` are already raised by this function.
+    """
+    check_function = checks_dict.get(operator)
+    if check_function is None:
+        raise AutopilotConfigurationError(
+            f"Unknown operator '{operator}'! Supported operators are: {', '.join(checks_dict.keys())}"
+        )
+    if check_function in (empty, not_empty):
+        return check_function
+    compiler = _check_compilers.get(check_function)
+    if compiler is None or not isinstance(other_value, (str, int, float)):
+        # keep the exact behavior of the check function for unusual values, e.g. None
+
+        def check_value(checked_value: str) -> bool:
+            return check_function(checked_value, other_value)
+
+        return check_value
+    return compiler(other_value)
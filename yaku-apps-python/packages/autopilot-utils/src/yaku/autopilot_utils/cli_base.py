@@ -124,17 +124,48 @@ There are multiple app configurations possible:
   subcommand providers. So only the main provider needs a
   `click_evaluator_callback` function.
 
+
+Fast startup
+------------
+
+Every autopilot app runs in a fresh process, so the time for importing
+modules matters, even for a ``--version`` call or a usage error. Heavy
+dependencies (e.g. pandas, openpyxl or pyhanko) should therefore not be
+imported at module level of the :file:`cli.py` module, but inside the
+`click_command` function which needs them.
+
+Subcommand providers can be loaded on demand by wrapping them in a
+:py:class:`LazySubcommand`. Only the provider of the invoked subcommand is
+then imported::
+
+    def load_size():
+        from .commands import size
+
+        return size
+
+
+    class CLI:
+        click_name = "filecheck"
+        click_subcommands = [LazySubcommand("size", load_size), ...]
+
+The loader function uses a normal import statement (and not a module name
+given as string), so that Pants can still infer the dependency.
+
+Apps which are called very often for small checks can also be started once as
+a long-lived worker, which then runs the commands sent by a thin client, see
+:py:mod:`yaku.autopilot_utils.worker`.
+
 """
 
+import dataclasses
 import functools
 import importlib.resources
 import json
 import os
 import sys
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
 
 import click
-import pydantic
 from loguru import logger
 
 from .errors import AutopilotFailure
@@ -175,6 +206,46 @@ def read_version_from_package(
     return wrapped_function
 
 
+@dataclasses.dataclass(frozen=True)
+class LazySubcommand:
+    """
+    A subcommand provider which is only loaded when the subcommand is used.
+
+    `load` must return the actual subcommand provider. It is called when the
+    subcommand is invoked or when the help text of the main command is shown.
+    """
+
+    click_name: str
+    load: Callable[[], ClickSubCommandProvider]
+
+
+class LazyGroup(click.Group):
+    """
+    A `click.Group` which creates some of its subcommands only when they are needed.
+
+    `lazy_subcommands` maps subcommand names to functions which return the
+    `click.Command` for the subcommand.
+    """
+
+    def __init__(
+        self,
+        *args,
+        lazy_subcommands: Optional[Dict[str, Callable[[], click.Command]]] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*self.commands, *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        load_command = self.lazy_subcommands.pop(cmd_name, None)
+        if load_command is not None:
+            self.add_command(load_command(), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+
 class DebugOption(click.Option):
     def handle_parse_result(self, ctx, opts, args):
         ctx.debug = opts.get("debug", False)  # type: ignore
@@ -247,6 +318,9 @@ def make_autopilot_app(
     def main_cli_entrypoint_wrapper(ctx, colors: bool, debug: bool, *args, **kwargs):
         ctx.color = colors  # necessary for click
         set_up_logging(ctx.debug, colors)
+        if os.getenv("AUTOPILOT_RESULTS_SPOOLING", "false").lower() in ("true", "1"):
+            logger.debug("Spooling results to a temporary file.")
+            RESULTS.enable_spooling()
         if click_command:
             click_command(*args, **kwargs)
 
@@ -257,6 +331,7 @@ def make_autopilot_app(
         if has_click_subcommands:
             decorators.append(
                 click.group(
+                    cls=LazyGroup,
                     name=provider.click_name,
                     help=click_help_text,
                     invoke_without_command=False,
@@ -306,10 +381,19 @@ def make_autopilot_app(
         return functools.reduce(lambda x, dec: dec(x), decorators[::-1], f)
 
     main_cli_entrypoint = decorator_builder(main_cli_entrypoint_wrapper)
-    for i in range(len(click_subcommands)):
-        _add_app_subcommand(
-            click_subcommands[i], main_cli_entrypoint, handle_results=not allow_chaining
-        )
+    for subcommand_provider in click_subcommands:
+        if isinstance(subcommand_provider, LazySubcommand):
+            main_cli_entrypoint.lazy_subcommands[subcommand_provider.click_name] = (
+                functools.partial(
+                    _load_app_subcommand,
+                    subcommand_provider,
+                    handle_results=not allow_chaining,
+                )
+            )
+        else:
+            _add_app_subcommand(
+                subcommand_provider, main_cli_entrypoint, handle_results=not allow_chaining
+            )
     return main_cli_entrypoint
 
 
@@ -336,7 +420,8 @@ def _handle_results(
                 f"The status must be one of GREEN, YELLOW, RED, or FAILED.\nThe returned status was: {status}."
             )
         print(json.dumps({"status": status, "reason": reason}))
-        print(results.to_json())
+        results.write_json(sys.stdout)
+        sys.stdout.write("\n")
     else:
         logger.debug("RESULTS of {provider} are empty.", provider=provider)
 
@@ -400,6 +485,10 @@ class ClickUsageErrorHandlerDecorator:
             raise
 
     def __call__(self, *args, **kwargs):
+        if os.getenv("AUTOPILOT_WORKER_SERVE"):
+            from .worker import serve_from_environment
+
+            return serve_from_environment(self)
         return self._wrapper_error_handler(*args, **kwargs)
 
     @property
@@ -433,12 +522,18 @@ def handle_app_result(
     return result_handler_function
 
 
+def _pydantic_validation_error() -> Type[Exception] | Tuple[()]:
+    # pydantic takes long to import, so only handle its errors if the app has imported it
+    pydantic = sys.modules.get("pydantic")
+    return pydantic.ValidationError if pydantic is not None else ()
+
+
 def handle_app_errors(f):
     @functools.wraps(f)
     def error_handler(*args, **kwargs):
         try:
             f(*args, **kwargs)
-        except pydantic.ValidationError as e:
+        except _pydantic_validation_error() as e:
             error_messages = []
             for error in e.errors():
                 msg = f"Input validation failed for {error['loc']}: {error['msg']}."
@@ -464,6 +559,16 @@ def _add_app_subcommand(
     click_group: click.Group,
     handle_results: bool,
 ):
+    subcommand = _make_app_subcommand(provider, handle_results)
+    click_group.add_command(subcommand)
+    return subcommand
+
+
+def _load_app_subcommand(lazy_provider: LazySubcommand, handle_results: bool) -> click.Command:
+    return _make_app_subcommand(lazy_provider.load(), handle_results)
+
+
+def _make_app_subcommand(provider: ClickSubCommandProvider, handle_results: bool):
     click_setup = getattr(provider, "click_setup", None)
     if click_setup is None:
         click_setup = []
@@ -482,6 +587,4 @@ def _add_app_subcommand(
     click_command = getattr(provider, "click_command", None)
     if not click_command:
         raise TypeError("Click subcommand provider must have a 'click_command' function!")
-    subcommand = decorator_builder(click_command)
-    click_group.add_command(subcommand)
-    return subcommand
+    return decorator_builder(click_command)
@@ -42,11 +42,17 @@ decorator which you simply put around your test function::
 
 """
 
+import io
+import itertools
 import json
 import re
+import tempfile
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from functools import wraps
-from typing import Any, Callable, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 
 @dataclass
@@ -64,18 +70,43 @@ class Output:
         return json.dumps({"output": {self.key: self.value}})
 
 
-@dataclass
+class _EmptyMetadata(dict):
+    """
+    Read-only empty dictionary which is shared by all results without metadata.
+
+    Avoids allocating a separate empty dictionary for each :py:class:`Result`.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(
+            "The default metadata of a Result is read-only. "
+            "Pass a metadata dictionary when creating the Result instead."
+        )
+
+    __setitem__ = __delitem__ = _read_only  # type: ignore
+    clear = pop = popitem = setdefault = update = _read_only  # type: ignore
+    __ior__ = _read_only  # type: ignore
+
+
+_EMPTY_METADATA = _EmptyMetadata()
+
+
+@dataclass(slots=True)
 class Result:
     """
     Simple data class to store a `result` of an autopilot app.
 
     Has fields `criterion`, `fulfilled`, and `justification`.
+
+    Uses `__slots__` to keep the memory footprint small when collecting
+    many results. Results without `metadata` share one read-only empty
+    dictionary.
     """
 
     criterion: str
     fulfilled: bool
     justification: str
-    metadata: dict = field(default_factory=dict)
+    metadata: dict = field(default_factory=lambda: _EMPTY_METADATA)
 
     def __post_init__(self):
         if not isinstance(self.fulfilled, bool):
@@ -88,6 +119,103 @@ class Result:
                     f"Value for 'fulfilled' is not a valid boolean value: {self.fulfilled}"
                 )
 
+    def to_dict(self) -> dict:
+        return {
+            "criterion": self.criterion,
+            "fulfilled": self.fulfilled,
+            "justification": self.justification,
+            "metadata": self.metadata,
+        }
+
+
+class ResultsAggregate:
+    """
+    Running aggregates of a collection of :py:class:`Result` objects.
+
+    Keeps the number of (un)fulfilled results, the first `max_examples`
+    results and unfulfilled results, as well as a histogram of the values
+    for each metadata key. If `max_examples` is `None`, all results are kept
+    as examples.
+
+    Evaluator callbacks should use these aggregates (see
+    :py:attr:`ResultsCollector.aggregate`) instead of iterating over all
+    results, so that they also work when results are spooled to disk.
+    """
+
+    def __init__(self, max_examples: Optional[int] = None):
+        self.max_examples = max_examples
+        self.total = 0
+        self.fulfilled = 0
+        self.unfulfilled = 0
+        self.first_results: List[Result] = []
+        self.first_failures: List[Result] = []
+        self.metadata_histograms: Dict[str, Counter] = defaultdict(Counter)
+
+    @classmethod
+    def from_results(
+        cls, results: Iterable[Result], max_examples: Optional[int] = None
+    ) -> "ResultsAggregate":
+        aggregate = cls(max_examples)
+        for result in results:
+            aggregate.add(result)
+        return aggregate
+
+    def add(self, result: Result) -> None:
+        self.total += 1
+        if self.max_examples is None or len(self.first_results) < self.max_examples:
+            self.first_results.append(result)
+        if result.fulfilled:
+            self.fulfilled += 1
+        else:
+            self.unfulfilled += 1
+            if self.max_examples is None or len(self.first_failures) < self.max_examples:
+                self.first_failures.append(result)
+        for key, value in result.metadata.items():
+            try:
+                self.metadata_histograms[key][value] += 1
+            except TypeError:
+                self.metadata_histograms[key][json.dumps(value, sort_keys=True)] += 1
+
+    @property
+    def omitted_results(self) -> int:
+        """Number of results which are not contained in `first_results`."""
+        return self.total - len(self.first_results)
+
+    @property
+    def omitted_failures(self) -> int:
+        """Number of unfulfilled results which are not contained in `first_failures`."""
+        return self.unfulfilled - len(self.first_failures)
+
+
+class _ResultsSpool:
+    """Temporary JSON lines file for storing results outside of memory."""
+
+    def __init__(self, directory: Optional[Path], max_examples: Optional[int]):
+        self._file = tempfile.NamedTemporaryFile(
+            mode="w+",
+            encoding="utf-8",
+            prefix="results-",
+            suffix=".jsonl",
+            dir=directory,
+        )
+        self.directory = directory
+        self._encode = json.JSONEncoder(check_circular=False).encode
+        self.aggregate = ResultsAggregate(max_examples)
+
+    def append(self, result: Result) -> None:
+        self._file.write(self._encode(result.to_dict()) + "\n")
+        self.aggregate.add(result)
+
+    def lines(self) -> Iterator[str]:
+        """Yield the spooled results as JSON lines (without line breaks)."""
+        self._file.flush()
+        with open(self._file.name, encoding="utf-8") as spool:
+            for line in spool:
+                yield line.rstrip("\n")
+
+    def close(self) -> None:
+        self._file.close()
+
 
 class ResultsCollector(list[Result]):
     """
@@ -96,22 +224,205 @@ class ResultsCollector(list[Result]):
     Is used for the :py:data:`RESULTS` singleton to collect all results
     of an autopilot run before the final evaluation.
 
-    Has an `append(result: Result)` method and a `to_json()` method.
+    Has an `append(result: Result)` method and the `to_json()` and
+    `write_json(stream)` methods.
+
+    For evaluations with millions of results, the collector can be switched
+    into spooling mode with :py:meth:`enable_spooling` (or by setting the
+    environment variable `AUTOPILOT_RESULTS_SPOOLING=true` for apps created
+    with :py:func:`~yaku.autopilot_utils.cli_base.make_autopilot_app`).
+    Then, results are appended to a temporary file instead of being kept in
+    memory, and only the :py:attr:`aggregate` is kept in memory. Iterating
+    over the collector reads the results back from the file, but other list
+    operations like indexing, `in`, `==` or `copy()` raise a `TypeError` in
+    this mode.
     """
 
+    json_chunk_size = 1000
+    """Number of result lines which are written at once by `write_json`."""
+
+    _spool: Optional[_ResultsSpool] = None
+
+    def enable_spooling(
+        self, directory: Optional[Path] = None, max_examples: Optional[int] = 100
+    ) -> None:
+        """
+        Store results in a temporary file in `directory` from now on.
+
+        Only the first `max_examples` (unfulfilled) results are kept in
+        memory as part of the :py:attr:`aggregate`.
+        """
+        if self._spool is not None:
+            return
+        existing_results = list(super().__iter__())
+        super().clear()
+        self._spool = _ResultsSpool(directory, max_examples)
+        for result in existing_results:
+            self._spool.append(result)
+
+    def disable_spooling(self) -> None:
+        """Stop spooling and discard all spooled results."""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    @property
+    def spooling(self) -> bool:
+        return self._spool is not None
+
+    @property
+    def aggregate(self) -> ResultsAggregate:
+        """
+        Aggregated view on the collected results.
+
+        In spooling mode, the aggregates are kept up to date while results are
+        appended. Otherwise, they are computed from all results, including
+        all results as examples.
+        """
+        if self._spool is not None:
+            return self._spool.aggregate
+        return ResultsAggregate.from_results(super().__iter__())
+
     def append(self, result: Result) -> None:
         if not isinstance(result, Result):
             raise TypeError("Given result is not a Result object!")
-        super().append(result)
+        if self._spool is not None:
+            self._spool.append(result)
+        else:
+            super().append(result)
+
+    def extend(self, results: Iterable[Result]) -> None:
+        if self._spool is not None:
+            for result in results:
+                self.append(result)
+        else:
+            super().extend(results)
+
+    def clear(self) -> None:
+        if self._spool is not None:
+            max_examples = self._spool.aggregate.max_examples
+            directory = self._spool.directory
+            self.disable_spooling()
+            self.enable_spooling(directory, max_examples)
+        super().clear()
+
+    def __iter__(self) -> Iterator[Result]:
+        if self._spool is None:
+            yield from super().__iter__()
+            return
+        for line in self._spool.lines():
+            yield Result(**json.loads(line))
+
+    def __len__(self) -> int:
+        if self._spool is not None:
+            return self._spool.aggregate.total
+        return super().__len__()
 
     def __bool__(self) -> bool:
+        if self._spool is not None:
+            return self._spool.aggregate.unfulfilled == 0
         return all({r.fulfilled for r in self})
 
-    def to_json(self):
-        lines = []
-        for result in self:
-            lines.append(json.dumps({"result": result.__dict__}))
-        return "\n".join(lines)
+    def __iadd__(self, results: Iterable[Result]) -> "ResultsCollector":  # type: ignore[override]
+        self.extend(results)
+        return self
+
+    def __repr__(self) -> str:
+        if self._spool is not None:
+            return f"<{type(self).__name__} with {len(self)} spooled results>"
+        return super().__repr__()
+
+    @contextmanager
+    def isolated(self) -> Iterator[None]:
+        """
+        Collect results separately inside of the context.
+
+        The collector is empty and not spooling inside of the context.
+        Afterwards, the results inside of the context are discarded and the
+        previous results (and spooling mode) are restored.
+        """
+        spool = self._spool
+        results = list(super().__iter__())
+        self._spool = None
+        super().clear()
+        try:
+            yield
+        finally:
+            self.disable_spooling()
+            super().clear()
+            super().extend(results)
+            self._spool = spool
+
+    def to_json(self) -> str:
+        buffer = io.StringIO()
+        self.write_json(buffer)
+        return buffer.getvalue()
+
+    def write_json(self, stream: TextIO) -> None:
+        """
+        Write the results as JSON lines to a text stream.
+
+        Produces the same text as `to_json()`, but writes it in chunks of
+        `json_chunk_size` lines, so that the full text never needs to be held
+        in memory.
+        """
+        # same output as json.dumps with default arguments, but skips the
+        # (for results unnecessary) check for circular references
+        encode = json.JSONEncoder(check_circular=False).encode
+        if self._spool is not None:
+            lines = ('{"result": ' + line + "}" for line in self._spool.lines())
+        else:
+            lines = (encode({"result": result.to_dict()}) for result in super().__iter__())
+        separator = ""
+        while True:
+            chunk = "\n".join(itertools.islice(lines, self.json_chunk_size))
+            if not chunk:
+                break
+            stream.write(separator + chunk)
+            separator = "\n"
+
+
+def _unsupported_while_spooling(name: str):
+    list_method = getattr(list, name)
+
+    @wraps(list_method)
+    def method(self: ResultsCollector, *args, **kwargs):
+        if self._spool is not None:
+            raise TypeError(f"{name}() is not supported while results are spooled!")
+        return list_method(self, *args, **kwargs)
+
+    return method
+
+
+# the underlying list is empty while spooling, so these operations would silently give
+# wrong answers
+for _name in (
+    "__getitem__",
+    "__setitem__",
+    "__delitem__",
+    "__contains__",
+    "__reversed__",
+    "__eq__",
+    "__ne__",
+    "__lt__",
+    "__le__",
+    "__gt__",
+    "__ge__",
+    "__add__",
+    "__mul__",
+    "__rmul__",
+    "__imul__",
+    "copy",
+    "count",
+    "index",
+    "insert",
+    "pop",
+    "remove",
+    "reverse",
+    "sort",
+):
+    setattr(ResultsCollector, _name, _unsupported_while_spooling(_name))
+del _name
 
 
 RESULTS = ResultsCollector()
@@ -128,14 +439,8 @@ ResultHandler = Callable[[ResultsCollector], Tuple[str, str]]
 def protect_results(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
-        backup = RESULTS.copy()
-        RESULTS.clear()
-        assert len(RESULTS) == 0
-        try:
+        with RESULTS.isolated():
             f(*args, **kwargs)
-        finally:
-            RESULTS.clear()
-            RESULTS.extend(backup)
 
     return wrapper
 
@@ -211,14 +516,28 @@ def DEFAULT_EVALUATOR(results: ResultsCollector):
 
         class CLI:
             click_evaluator_callback = DEFAULT_EVALUATOR
+
+    The reason is built from the :py:attr:`ResultsCollector.aggregate`, so if
+    results are spooled to disk, only the first results are mentioned.
     """
-    if any([not r.fulfilled for r in results]):
+    aggregate = results.aggregate
+    if aggregate.unfulfilled:
         return "RED", "\n".join(
             [
                 "Criterion is: " + r.criterion + "\nBut: " + r.justification
-                for r in results
-                if not r.fulfilled
+                for r in aggregate.first_failures
             ]
+            + omitted_results_note(aggregate.omitted_failures, "unfulfilled criteria")
         )
     else:
-        return "GREEN", "\n".join([r.justification for r in results])
+        return "GREEN", "\n".join(
+            [r.justification for r in aggregate.first_results]
+            + omitted_results_note(aggregate.omitted_results, "results")
+        )
+
+
+def omitted_results_note(number_of_omitted_results: int, kind: str) -> List[str]:
+    """Return a list with a note about omitted results for a reason text, if necessary."""
+    if number_of_omitted_results <= 0:
+        return []
+    return [f"... and {number_of_omitted_results} more {kind}."]
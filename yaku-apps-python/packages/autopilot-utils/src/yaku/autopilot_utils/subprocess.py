@@ -55,17 +55,58 @@ Of course, this final step could also be done in the `click_evaluator_callback`,
 but the logic above allows full flexibility on the flow control between the
 different subprocesses. Also, _outputs_ could be retrieved from `step1` and
 used for `step2`.
+
+Independent steps don't need to run one after another. With :py:func:`run_many`,
+a graph of :py:class:`Step` objects is executed in parallel, and outputs of
+one step can be passed on as environment variables to the following steps::
+
+    results = run_many(
+        [
+            Step("sharepoint", ["sharepoint-fetcher"]),
+            Step("artifactory", ["artifactory-fetcher"]),
+            Step(
+                "evaluation",
+                ["excel-evaluate", "cell"],
+                inputs={"FILE_PATH": ("artifactory", "file_path")},
+            ),
+        ],
+        max_workers=2,
+    )
+    for step_result in results.values():
+        step_result.exit_for_returncode()
+        step_result.raise_for_status()
+
+For long-running apps with a lot of log output, :py:func:`run_streaming` can be
+used instead of :py:func:`run`. It relays the other app's log output while the
+app is still running and keeps only a bounded amount of output in memory.
 """
 
+import collections
 import dataclasses
 import json
 import os
 import subprocess
 import sys
-from typing import Any, Callable, List, Mapping, Optional, Protocol
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from loguru import logger
-from yaku.autopilot_utils.results import Result, ResultsCollector
+from yaku.autopilot_utils.results import RESULTS, Result, ResultsCollector
 
 
 class _DataclassJSONEncoder(json.JSONEncoder):
@@ -149,8 +190,14 @@ class AutopilotSubprocessFailure(Exception):
         self.process_result = process_result
 
 
-def gen_exit_for_returncode(process_result: ProcessResult):
-    """Provide a function for exiting on a failed subprocess."""
+def gen_exit_for_returncode(process_result: ProcessResult, already_relayed: bool = False):
+    """
+    Provide a function for exiting on a failed subprocess.
+
+    If `already_relayed==True`, the clean stdout and the stderr output were
+    already printed while the subprocess was running (see :py:func:`run_streaming`),
+    so they are not printed again on success.
+    """
 
     def exit_for_returncode():
         if process_result.returncode != 0:
@@ -164,7 +211,7 @@ def gen_exit_for_returncode(process_result: ProcessResult):
             if process_result.stderr:
                 logger.error(process_result.stderr)
             sys.exit(process_result.returncode)
-        else:
+        elif not already_relayed:
             if process_result.clean_stdout:
                 print(process_result.clean_stdout)
             if process_result.stderr:
@@ -243,10 +290,7 @@ def run(
       :py:exc:`AutopilotSubprocessFailure` if the subprocess app status is not
       `GREEN`, `YELLOW`, or `RED` (`None` is ignored as well).
     """
-    env = None
-    if extra_env is not None:
-        env = os.environ.copy()
-        env.update(extra_env)
+    env = _make_env(extra_env)
     logger.debug("Executing subprocess: {cmd}", cmd=command)
     process_result: ProcessResult = subprocess.run(
         command,
@@ -257,22 +301,115 @@ def run(
         env=env,
         **kwargs,
     )  # type: ignore
+    parser = AutopilotOutputParser()
+    parser.feed(process_result.stdout)
+    _attach_parse_results(process_result, parser)
+    process_result.exit_for_returncode = gen_exit_for_returncode(process_result)
+    process_result.raise_for_status = gen_raise_for_status(process_result)
+    _log_process_result(process_result)
+
+    return process_result
+
+
+def run_streaming(
+    command,
+    /,
+    shell: bool = False,
+    extra_env: Optional[Mapping[str, str]] = None,
+    max_buffered_lines: int = 10000,
+    **kwargs,
+) -> ProcessResult:
+    """
+    Run another autopilot app in a subprocess and relay its output while it runs.
+
+    This is a streaming variant of :py:func:`run` for long-running apps with
+    a lot of log output. Instead of waiting for the subprocess to finish, the
+    stdout is parsed line by line as it arrives:
+
+    * JSON lines (status, reason, results, outputs) are collected in the
+      returned object just like in :py:func:`run`.
+    * All other lines are printed immediately, and stderr lines are relayed
+      to `sys.stderr` immediately as well.
+
+    To keep memory usage bounded, only the last `max_buffered_lines` lines
+    are kept in `stdout`, `stderr` and `clean_stdout` of the returned object.
+
+    The returned object has the same attributes as the one returned by
+    :py:func:`run`. As the output was already relayed, calling
+    `exit_for_returncode()` won't print it again on success. Any `kwargs`
+    are passed to `subprocess.Popen`.
+    """
+    env = _make_env(extra_env)
+    logger.debug("Executing subprocess in streaming mode: {cmd}", cmd=command)
+    parser = AutopilotOutputParser(max_clean_lines=max_buffered_lines)
+    stdout_tail: Deque[str] = collections.deque(maxlen=max_buffered_lines)
+    stderr_tail: Deque[str] = collections.deque(maxlen=max_buffered_lines)
+    with subprocess.Popen(
+        command,
+        encoding="utf-8",
+        shell=shell,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        env=env,
+        **kwargs,
+    ) as process:
+        assert process.stdout is not None and process.stderr is not None
+        stderr_reader = threading.Thread(
+            target=_relay_stderr, args=(process.stderr, stderr_tail), daemon=True
+        )
+        stderr_reader.start()
+        for line in process.stdout:
+            line = line.rstrip("\r\n")
+            stdout_tail.append(line)
+            if not parser.feed_line(line):
+                print(line, flush=True)
+        stderr_reader.join()
+        returncode = process.wait()
+
+    process_result: ProcessResult = subprocess.CompletedProcess(
+        command,
+        returncode,
+        os.linesep.join(stdout_tail),
+        os.linesep.join(stderr_tail),
+    )  # type: ignore
+    _attach_parse_results(process_result, parser)
+    process_result.exit_for_returncode = gen_exit_for_returncode(
+        process_result, already_relayed=True
+    )
+    process_result.raise_for_status = gen_raise_for_status(process_result)
+    _log_process_result(process_result)
+
+    return process_result
+
+
+def _relay_stderr(stream: IO[str], tail: Deque[str]) -> None:
+    for line in stream:
+        tail.append(line.rstrip("\r\n"))
+        print(line, end="", file=sys.stderr, flush=True)
+
+
+def _make_env(extra_env: Optional[Mapping[str, str]]) -> Optional[Dict[str, str]]:
+    if extra_env is None:
+        return None
+    env = os.environ.copy()
+    env.update(extra_env)
+    return env
+
+
+def _attach_parse_results(
+    process_result: ProcessResult, parser: "AutopilotOutputParser"
+) -> None:
     if process_result.returncode != 0:
         process_result.status = "ERROR"
     else:
-        process_result.status = parse_json_lines(process_result.stdout, "status")
-    process_result.reason = parse_json_lines(process_result.stdout, "reason")
+        process_result.status = parser.status
+    process_result.reason = parser.reason
+    process_result.results = parser.results
+    process_result.outputs = parser.outputs
+    process_result.clean_stdout = parser.clean_stdout
 
-    process_result.results = ResultsCollector(
-        parse_json_lines_into_list(process_result.stdout, "result", cls=Result)
-    )
-    process_result.outputs = OutputMap(
-        parse_json_lines_into_map(process_result.stdout, "output")
-    )
-    process_result.clean_stdout = clean_json_lines(process_result.stdout)
-    process_result.exit_for_returncode = gen_exit_for_returncode(process_result)
-    process_result.raise_for_status = gen_raise_for_status(process_result)
 
+def _log_process_result(process_result: ProcessResult) -> None:
     logger.debug(
         "Process exited with code {code} and status {status}",
         code=process_result.returncode,
@@ -282,9 +419,288 @@ def run(
     logger.debug(process_result.results)
     logger.debug(process_result.outputs)
 
+
+StepCommand = Union[Sequence[str], str]
+
+
+@dataclasses.dataclass
+class Step:
+    """
+    A single subprocess step in a :py:class:`StepGraph`.
+
+    * `name`: unique name of the step, used for declaring dependencies.
+    * `command`: the command for :py:func:`run`. It can also be a function
+      which receives the outputs of the step's dependencies (step name mapped
+      to :py:class:`OutputMap`) and returns the command.
+    * `depends_on`: names of steps which must have finished successfully
+      before this step is started.
+    * `inputs`: mapping of environment variable names to `(step name, output key)`
+      tuples. The output values of the given steps are passed to this step
+      as environment variables. Those steps are implicit dependencies. If one
+      of the outputs is missing, the step fails with an `ERROR` status.
+    * `extra_env` and `run_kwargs`: passed to :py:func:`run`.
+    """
+
+    name: str
+    command: Union[StepCommand, Callable[[Mapping[str, OutputMap]], StepCommand]]
+    depends_on: Sequence[str] = ()
+    inputs: Mapping[str, Tuple[str, str]] = dataclasses.field(default_factory=dict)
+    extra_env: Optional[Mapping[str, str]] = None
+    run_kwargs: Mapping[str, Any] = dataclasses.field(default_factory=dict)
+
+    @property
+    def dependencies(self) -> List[str]:
+        dependencies = list(self.depends_on)
+        for step_name, _ in self.inputs.values():
+            if step_name not in dependencies:
+                dependencies.append(step_name)
+        return dependencies
+
+
+def _step_succeeded(process_result: ProcessResult) -> bool:
+    return process_result.returncode == 0 and process_result.status in (
+        None,
+        "GREEN",
+        "YELLOW",
+        "RED",
+    )
+
+
+class StepGraph:
+    """
+    Directed acyclic graph of :py:class:`Step` objects.
+
+    Steps are executed with :py:func:`run` as soon as all their dependencies
+    have finished successfully, so independent steps run at the same time.
+    Steps whose dependencies have failed (non-zero returncode or a status
+    other than `GREEN`, `YELLOW`, `RED`, or no status) are skipped.
+    """
+
+    def __init__(self, steps: Iterable[Step] = ()):
+        self._steps: Dict[str, Step] = {}
+        for step in steps:
+            self.add(step)
+
+    def add(self, step: Step) -> Step:
+        if step.name in self._steps:
+            raise ValueError(f"There is already a step with the name '{step.name}'!")
+        self._steps[step.name] = step
+        return step
+
+    @property
+    def steps(self) -> List[Step]:
+        return list(self._steps.values())
+
+    def validate(self) -> None:
+        """Raise a `ValueError` for unknown dependencies or dependency cycles."""
+        for step in self._steps.values():
+            for dependency in step.dependencies:
+                if dependency not in self._steps:
+                    raise ValueError(
+                        f"Step '{step.name}' depends on unknown step '{dependency}'!"
+                    )
+        finished: set = set()
+        visiting: set = set()
+
+        def visit(name: str, path: List[str]):
+            if name in finished:
+                return
+            if name in visiting:
+                cycle = " -> ".join(path[path.index(name) :] + [name])
+                raise ValueError(f"Steps have a dependency cycle: {cycle}")
+            visiting.add(name)
+            for dependency in self._steps[name].dependencies:
+                visit(dependency, path + [name])
+            visiting.remove(name)
+            finished.add(name)
+
+        for name in self._steps:
+            visit(name, [])
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, ProcessResult]:
+        """
+        Run all steps with at most `max_workers` steps at the same time.
+
+        Returns a mapping from step name to the step's result in the order in
+        which the steps were added. Skipped steps are not contained.
+        """
+        self.validate()
+        pending = list(self._steps.values())
+        finished: Dict[str, ProcessResult] = {}
+        skipped: set = set()
+        running: Dict[Future, Step] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                for step in list(pending):
+                    dependencies = step.dependencies
+                    failed = [
+                        d
+                        for d in dependencies
+                        if d in skipped or (d in finished and not _step_succeeded(finished[d]))
+                    ]
+                    if failed:
+                        logger.warning(
+                            "Skipping step {step} because step {dependency} has failed.",
+                            step=step.name,
+                            dependency=failed[0],
+                        )
+                        skipped.add(step.name)
+                        pending.remove(step)
+                    elif all(d in finished for d in dependencies):
+                        outputs = {d: finished[d].outputs for d in dependencies}
+                        running[executor.submit(self._run_step, step, outputs)] = step
+                        pending.remove(step)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished[running.pop(future).name] = future.result()
+        return {name: finished[name] for name in self._steps if name in finished}
+
+    @staticmethod
+    def _run_step(step: Step, outputs: Mapping[str, OutputMap]) -> ProcessResult:
+        missing = [
+            f"'{output_key}' of step '{step_name}'"
+            for step_name, output_key in step.inputs.values()
+            if output_key not in outputs[step_name]
+        ]
+        if missing:
+            return _failed_step_result(
+                step, f"Step '{step.name}' is missing the output {', '.join(missing)}."
+            )
+        command = step.command(outputs) if callable(step.command) else step.command
+        extra_env = dict(step.extra_env) if step.extra_env is not None else {}
+        for variable, (step_name, output_key) in step.inputs.items():
+            extra_env[variable] = str(outputs[step_name][output_key])
+        return run(command, extra_env=extra_env or None, **step.run_kwargs)
+
+
+def _failed_step_result(step: Step, reason: str) -> ProcessResult:
+    """Return the result of a step which could not be started, with an `ERROR` status."""
+    logger.error(reason)
+    command = step.command if not callable(step.command) else step.name
+    process_result: ProcessResult = subprocess.CompletedProcess(command, 1, "", reason)  # type: ignore
+    _attach_parse_results(process_result, AutopilotOutputParser())
+    process_result.reason = reason
+    process_result.exit_for_returncode = gen_exit_for_returncode(process_result)
+    process_result.raise_for_status = gen_raise_for_status(process_result)
     return process_result
 
 
+def run_many(
+    steps: Iterable[Step],
+    /,
+    max_workers: Optional[int] = None,
+    collect_results: bool = True,
+) -> Dict[str, ProcessResult]:
+    """
+    Run a graph of autopilot app steps in parallel.
+
+    This is a shortcut for :py:meth:`StepGraph.run`. If `collect_results==True`,
+    the results of all executed steps are appended to the
+    :py:data:`~yaku.autopilot_utils.results.RESULTS` singleton afterwards,
+    in the order in which the steps were given, independent of the order in
+    which they have finished.
+    """
+    step_results = StepGraph(steps).run(max_workers=max_workers)
+    if collect_results:
+        for process_result in step_results.values():
+            for result in process_result.results:
+                RESULTS.append(result)
+    return step_results
+
+
+_JSON_FIRST_CHARACTERS = frozenset('{["-0123456789tfnNI')
+
+
+def _may_be_json(stripped_line: str) -> bool:
+    """
+    Check cheaply if a stripped line could be a JSON document at all.
+
+    Every JSON value (including the `NaN` and `Infinity` extensions accepted
+    by `json.loads`) starts with one of a few characters, so most log lines
+    can be classified as plain text without calling the JSON decoder.
+    """
+    if not stripped_line or stripped_line[0] not in _JSON_FIRST_CHARACTERS:
+        return False
+    if stripped_line[0] == "I":
+        return stripped_line.startswith("Infinity")
+    return True
+
+
+class AutopilotOutputParser:
+    """
+    Single-pass parser for the JSON line protocol of autopilot apps.
+
+    Every line is decoded at most once and classified as `status`, `reason`,
+    `result`, `output` or plain text. This gives the same values as calling
+    :py:func:`parse_json_lines`, :py:func:`parse_json_lines_into_list`,
+    :py:func:`parse_json_lines_into_map` and :py:func:`clean_json_lines`
+    separately, but without scanning the text once per attribute::
+
+        parser = AutopilotOutputParser()
+        parser.feed(stdout)
+        parser.status, parser.results, parser.clean_stdout
+
+    If `max_clean_lines` is given, only the last `max_clean_lines` plain text
+    lines are kept for :py:attr:`clean_stdout`.
+    """
+
+    def __init__(self, max_clean_lines: Optional[int] = None):
+        self.status: Any = None
+        self.reason: Any = None
+        self.results = ResultsCollector()
+        self.outputs = OutputMap()
+        self._clean_lines: Deque[str] = collections.deque(maxlen=max_clean_lines)
+
+    def feed(self, text: str) -> None:
+        """Parse a (multi-line) chunk of text."""
+        for line in text.split(os.linesep):
+            self.feed_line(line)
+
+    def feed_line(self, line: str) -> bool:
+        """
+        Parse a single line of text.
+
+        Returns `True` if the line was a JSON line, `False` if it is plain text.
+        """
+        stripped_line = line.strip()
+        if not _may_be_json(stripped_line):
+            self._add_clean_line(line)
+            return False
+        try:
+            data = json.loads(stripped_line)
+        except json.JSONDecodeError:
+            self._add_clean_line(line)
+            return False
+        if isinstance(data, dict):
+            self._handle_json_data(data)
+        return True
+
+    def _add_clean_line(self, line: str) -> None:
+        self._clean_lines.append(line)
+
+    def _handle_json_data(self, data: dict) -> None:
+        if "status" in data:
+            self.status = data["status"]
+        if "reason" in data:
+            self.reason = data["reason"]
+        result = data.get("result")
+        if result:
+            try:
+                self.results.append(Result(**result))
+            except TypeError:
+                self.results.append(Result(*result))
+        output = data.get("output")
+        if output:
+            self.outputs.update(output)
+
+    @property
+    def clean_stdout(self) -> str:
+        """All plain text lines, i.e. the parsed text without any JSON lines."""
+        return os.linesep.join(self._clean_lines)
+
+
 def clean_json_lines(text: str) -> str:
     """Remove any JSON line from text."""
     cleaned_lines = []
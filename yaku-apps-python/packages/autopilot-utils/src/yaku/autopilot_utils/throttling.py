@@ -0,0 +1,267 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Rate limiting and retries for requests to throttling web services.
+
+Services like SharePoint or Microsoft Graph answer with `429 Too Many
+Requests` or `503 Service Unavailable` (usually with a `Retry-After`
+header) if a client sends too many requests. A
+:py:class:`ThrottledTransport` wraps the function which sends a request and
+
+* limits the number of requests per second with a :py:class:`TokenBucket`,
+* limits the number of concurrent requests with an :py:class:`AimdLimiter`,
+  which shrinks the limit when requests are throttled and grows it back
+  while the responses are healthy,
+* and retries throttled requests after the time given in `Retry-After` or
+  after a jittered exponential backoff::
+
+    transport = ThrottledTransport(
+        requests_per_second=10, retry_exceptions=(requests.ConnectionError,)
+    )
+    response = transport.request(lambda: session.get(url))
+
+The transport doesn't depend on a specific HTTP library: the responses only
+need a `status_code` and a `headers` mapping.
+"""
+
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Mapping, Optional, Protocol, Tuple, Type, TypeVar
+
+from loguru import logger
+
+# status codes which show that the server didn't process the request because of load
+THROTTLING_STATUS_CODES = (429, 503)
+
+# status codes of failed requests which may succeed when they are sent again
+TRANSIENT_STATUS_CODES = (502, 504)
+
+
+class Response(Protocol):
+    status_code: int
+    headers: Mapping[str, str]
+
+
+ResponseType = TypeVar("ResponseType", bound=Response)
+
+
+class TokenBucket:
+    """
+    Allow `rate` events per second, with bursts of up to `capacity` events.
+
+    :py:meth:`acquire` waits until the next event is allowed. The bucket can be
+    used from several threads at once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError(f"The rate must be positive, but is {rate}!")
+        self.rate = rate
+        self.capacity = max(1.0, rate if capacity is None else capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._last_refill) * self.rate
+                )
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            self._sleep(wait_time)
+
+
+class AimdLimiter:
+    """
+    Limit concurrent requests with additive increase and multiplicative decrease.
+
+    The limit starts at `max_limit`. Every throttled request multiplies it with
+    `decrease_factor` (but not below `min_limit`), every healthy response
+    raises it by `1 / limit`, i.e. by about one per round of requests, until
+    `max_limit` is reached again.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease_factor: float = 0.5):
+        if max_limit < min_limit or min_limit < 1:
+            raise ValueError(f"Invalid limits: {min_limit} to {max_limit}!")
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.decrease_factor = decrease_factor
+        self.limit = float(max_limit)
+        self._active = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait until one more request is allowed and hold its slot inside of the context."""
+        with self._condition:
+            while self._active >= int(self.limit):
+                self._condition.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttled(self) -> None:
+        with self._condition:
+            self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Return the number of seconds given in a `Retry-After` header.
+
+    The header contains either a number of seconds or an HTTP date. Returns
+    None if there is no valid value.
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = 0.5,
+    cap: float = 60.0,
+    random_fraction: Callable[[], float] = random.random,
+) -> float:
+    """Return a random delay between 0 and `base * 2**attempt` seconds (at most `cap`)."""
+    return random_fraction() * min(cap, base * 2**attempt)
+
+
+class ThrottledTransport:
+    """
+    Send requests with rate limiting, concurrency control and retries.
+
+    * `requests_per_second` limits the request rate (None for no limit).
+    * `max_concurrency` is the maximum number of concurrent requests, which is
+      lowered while requests are throttled (see :py:class:`AimdLimiter`).
+    * Throttled requests are sent again up to `max_retries` times. Idempotent
+      requests are also sent again after a `502`/`504` status or one of the
+      `retry_exceptions`, e.g. connection errors.
+
+    Without `Retry-After` header, the transport waits for a jittered
+    exponential backoff (see :py:func:`backoff_delay`) before a retry.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: Optional[float] = None,
+        max_concurrency: int = 1,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 60.0,
+        retry_exceptions: Tuple[Type[BaseException], ...] = (),
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._token_bucket = (
+            TokenBucket(requests_per_second, clock=clock, sleep=sleep)
+            if requests_per_second
+            else None
+        )
+        self.limiter = AimdLimiter(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_exceptions = retry_exceptions
+        self._sleep = sleep
+
+    def request(
+        self, send: Callable[[], ResponseType], *, idempotent: bool = True
+    ) -> ResponseType:
+        """
+        Call `send` to send a request and return its final response.
+
+        Requests which aren't `idempotent`, e.g. uploads, are only sent again
+        if the server answered that they were throttled.
+        """
+        for attempt in itertools.count():
+            if self._token_bucket is not None:
+                self._token_bucket.acquire()
+            error: Optional[BaseException] = None
+            with self.limiter.slot():
+                try:
+                    response = send()
+                except self.retry_exceptions as e:
+                    if not idempotent or attempt >= self.max_retries:
+                        raise
+                    error = e
+            if error is not None:
+                # the slot is free again, so other requests aren't blocked while waiting
+                delay = self._backoff_delay(attempt)
+                logger.debug("Request failed with {}, retrying in {:.1f}s", error, delay)
+                self._sleep(delay)
+                continue
+            if response.status_code in THROTTLING_STATUS_CODES:
+                self.limiter.on_throttled()
+            else:
+                self.limiter.on_success()
+            is_retryable = response.status_code in THROTTLING_STATUS_CODES or (
+                idempotent and response.status_code in TRANSIENT_STATUS_CODES
+            )
+            if not is_retryable or attempt >= self.max_retries:
+                return response
+            delay = self.retry_delay(attempt, response.headers.get("Retry-After"))
+            logger.debug(
+                "Request failed with status {}, retrying in {:.1f}s",
+                response.status_code,
+                delay,
+            )
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+            self._sleep(delay)
+        raise AssertionError("unreachable")
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Return the delay before the next attempt, from a `Retry-After` value or the backoff."""
+        delay = parse_retry_after(retry_after)
+        return self._backoff_delay(attempt) if delay is None else delay
+
+    def wait(self, seconds: float) -> None:
+        """Wait before sending throttled requests again, e.g. parts of a batch request."""
+        self._sleep(seconds)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.backoff_base, self.backoff_cap)
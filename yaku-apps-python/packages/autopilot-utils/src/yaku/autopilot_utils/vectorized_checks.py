@@ -0,0 +1,300 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Evaluate a check for a whole column of values at once.
+
+:py:func:`check_many` gives the same results as calling
+:py:func:`yaku.autopilot_utils.checks.check` for every single value, but
+evaluates the common cases with NumPy and pandas instead of calling a Python
+function per value::
+
+    mask = check_many(df["Reviewed at"], "not-older-than", "1 year")
+    outdated_rows = df[~mask]
+
+Number comparisons are done on the whole column, and ISO 8601 timestamps
+with time zone (e.g. ``2020-01-01T10:00:00.000+02:00``) are parsed in bulk.
+All other values, e.g. naive timestamps which are interpreted in the local
+time zone, are passed to the scalar check functions, but every distinct
+string is only checked once.
+"""
+
+import operator as op
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Callable
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from .checks import (
+    CompiledCheck,
+    OtherValue,
+    checks_dict,
+    compile_check,
+    convert_to_date,
+    convert_to_seconds,
+    empty,
+    equals,
+    larger,
+    larger_equal,
+    less,
+    less_equal,
+    not_empty,
+    not_older,
+    older,
+)
+
+BoolArray = npt.NDArray[np.bool_]
+FloatArray = npt.NDArray[np.float64]
+
+
+def _string_mask(values: npt.NDArray[np.object_]) -> BoolArray:
+    if pd.api.types.infer_dtype(values, skipna=False) == "string":
+        return np.ones(len(values), dtype=bool)
+    return np.fromiter((type(v) is str for v in values), dtype=bool, count=len(values))
+
+
+# Layout of the longest supported timestamp without time zone: `0` stands for a
+# digit and `T` for `T` or a blank. Shorter timestamps end after the minutes,
+# seconds or milliseconds.
+_TIMESTAMP_LAYOUT = "0000-00-00T00:00:00.000000"
+_TIMESTAMP_LENGTHS = (16, 19, 23, 26)
+_OFFSET_LENGTH = len("+00:00")
+_MAX_TIMESTAMP_LENGTH = len(_TIMESTAMP_LAYOUT) + _OFFSET_LENGTH
+_LAYOUT_LOWEST = np.array([ord(c) for c in _TIMESTAMP_LAYOUT])
+_LAYOUT_HIGHEST = np.array([ord(c) for c in _TIMESTAMP_LAYOUT.replace("0", "9")])
+_LAYOUT_SEPARATOR = _TIMESTAMP_LAYOUT.index("T")
+
+
+def _parse_aware_timestamps(strings: pd.Series) -> pd.Series:
+    """
+    Convert ISO 8601 timestamps with time zone to seconds since the epoch.
+
+    Only timestamps which are parsed with `datetime.fromisoformat` by
+    `convert_to_date` are converted, all other strings are left out of the
+    returned series. The time zone offset is parsed here, because pandas
+    is a lot slower for timestamps with different offsets.
+    """
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    candidates = (lengths > _TIMESTAMP_LENGTHS[0]) & (lengths <= _MAX_TIMESTAMP_LENGTH)
+    lengths = lengths[candidates]
+    timestamps = strings.to_numpy()[candidates].astype(f"U{_MAX_TIMESTAMP_LENGTH}")
+    chars = timestamps.view(np.uint32).reshape(-1, _MAX_TIMESTAMP_LENGTH)
+    rows = np.arange(len(chars))
+
+    has_z = chars[rows, lengths - 1] == ord("Z")
+    local_lengths = np.where(has_z, lengths - 1, lengths - _OFFSET_LENGTH)
+    valid = np.isin(local_lengths, _TIMESTAMP_LENGTHS)
+    local_chars = chars[:, : len(_TIMESTAMP_LAYOUT)]
+    matches = (local_chars >= _LAYOUT_LOWEST) & (local_chars <= _LAYOUT_HIGHEST)
+    matches[:, _LAYOUT_SEPARATOR] |= local_chars[:, _LAYOUT_SEPARATOR] == ord(" ")
+    within_local_time = np.arange(len(_TIMESTAMP_LAYOUT)) < local_lengths[:, None]
+    valid &= (matches | ~within_local_time).all(axis=1)
+
+    offset_positions = np.minimum(
+        local_lengths[:, None] + np.arange(_OFFSET_LENGTH), _MAX_TIMESTAMP_LENGTH - 1
+    )
+    offset = chars[rows[:, None], offset_positions].astype(np.int64)
+    sign = np.where(offset[:, 0] == ord("-"), -1, 1)
+    digits = offset[:, [1, 2, 4, 5]] - ord("0")
+    hours = digits[:, 0] * 10 + digits[:, 1]
+    minutes = digits[:, 2] * 10 + digits[:, 3]
+    valid &= has_z | (
+        ((offset[:, 0] == ord("+")) | (offset[:, 0] == ord("-")))
+        & (offset[:, 3] == ord(":"))
+        & ((digits >= 0) & (digits <= 9)).all(axis=1)
+        & (hours < 24)
+        & (minutes < 60)
+    )
+    offset_seconds = np.where(has_z, 0, sign * (hours * 3600 + minutes * 60))
+
+    # cut off the time zone offsets, so that only the local times are left
+    chars[np.arange(_MAX_TIMESTAMP_LENGTH) >= local_lengths[:, None]] = 0
+    parsed = pd.DatetimeIndex(
+        pd.to_datetime(timestamps[valid], format="ISO8601", errors="coerce")
+    )
+    parsed_valid = ~parsed.isna()
+    local_microseconds = parsed[parsed_valid].as_unit("us").asi8
+    utc_microseconds = local_microseconds - offset_seconds[valid][parsed_valid] * 10**6
+    index = strings.index[candidates][valid][parsed_valid]
+    # dividing the integer microseconds gives exactly the float of `datetime.timestamp()`
+    return pd.Series(utc_microseconds / 1e6, index=index)
+
+
+class _Column:
+    """The checked values together with lazily computed views on them."""
+
+    def __init__(self, values: Any):
+        array = np.asarray(values)
+        if array.ndim != 1:
+            raise ValueError(f"Expected a one-dimensional array, got {array.ndim} dimensions!")
+        self.is_numeric = array.dtype.kind in "biuf"
+        if self.is_numeric:
+            self._numeric_array = array
+            self.objects = array.astype(object)
+        else:
+            self.objects = np.asarray(values, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    @cached_property
+    def is_string(self) -> BoolArray:
+        if self.is_numeric:
+            return np.zeros(len(self), dtype=bool)
+        return _string_mask(self.objects)
+
+    @cached_property
+    def strings(self) -> pd.Series:
+        """All string values, indexed by their position in the column."""
+        indices = np.flatnonzero(self.is_string)
+        return pd.Series(self.objects[indices], index=indices, dtype=object)
+
+    @cached_property
+    def _converted_numbers(self) -> tuple[BoolArray, FloatArray]:
+        if self.is_numeric:
+            return np.ones(len(self), dtype=bool), self._numeric_array.astype(float)
+        is_number = self.is_string.copy()
+        numbers = np.full(len(self), np.nan)
+        strings = self.objects[is_number]
+        # converting an object array to float calls `float()` on every item
+        try:
+            numbers[is_number] = strings.astype(float)
+        except ValueError:
+            # only convert strings which pandas considers to be numbers, all
+            # others are left to the scalar check functions
+            candidates = pd.notna(pd.to_numeric(strings, errors="coerce"))
+            is_number[is_number] = candidates
+            try:
+                numbers[is_number] = strings[candidates].astype(float)
+            except ValueError:
+                is_number[:] = False
+        return is_number, numbers
+
+    @property
+    def is_number(self) -> BoolArray:
+        """Mask of values which are numbers or strings with a number."""
+        return self._converted_numbers[0]
+
+    @property
+    def numbers(self) -> FloatArray:
+        """The values converted to float, only valid where `is_number` is True."""
+        return self._converted_numbers[1]
+
+
+# returns the results and a mask of the values for which the results are valid
+VectorizedCheck = Callable[[_Column, OtherValue], tuple[BoolArray, BoolArray]]
+
+
+def _equals_many(column: _Column, other_value: OtherValue) -> tuple[BoolArray, BoolArray]:
+    result = np.zeros(len(column), dtype=bool)
+    try:
+        other_number = float(other_value)
+    except ValueError:
+        # `equals` compares strings if `other_value` is not a number
+        handled = column.is_string
+        result[handled] = column.objects[handled] == str(other_value)
+        return result, handled
+    handled = column.is_number
+    result[handled] = column.numbers[handled] == other_number
+    return result, handled
+
+
+def _make_number_comparison(compare: Callable[[Any, Any], Any]) -> VectorizedCheck:
+    def compare_many(column: _Column, other_value: OtherValue) -> tuple[BoolArray, BoolArray]:
+        handled = column.is_number
+        result = np.zeros(len(column), dtype=bool)
+        result[handled] = compare(column.numbers[handled], float(other_value))
+        return result, handled
+
+    return compare_many
+
+
+def _make_older_comparison(negate: bool) -> VectorizedCheck:
+    def compare_many(column: _Column, other_value: OtherValue) -> tuple[BoolArray, BoolArray]:
+        threshold = convert_to_date(other_value)
+        if threshold is None:
+            threshold = datetime.today().timestamp() - convert_to_seconds(str(other_value))
+
+        handled = np.zeros(len(column), dtype=bool)
+        result = np.zeros(len(column), dtype=bool)
+        if len(column.strings):
+            dates = _parse_aware_timestamps(column.strings)
+            is_older = dates.to_numpy() < threshold
+            handled[dates.index] = True
+            result[dates.index] = ~is_older if negate else is_older
+        return result, handled
+
+    return compare_many
+
+
+def _not_empty_many(column: _Column, _: OtherValue) -> tuple[BoolArray, BoolArray]:
+    if not column.is_numeric:
+        # strings are left to the scalar function, which is called once per distinct string
+        return np.zeros(len(column), dtype=bool), np.zeros(len(column), dtype=bool)
+    # numbers are never blank when converted to a string, so only zero is empty
+    return column.numbers != 0, np.ones(len(column), dtype=bool)
+
+
+def _empty_many(column: _Column, other_value: OtherValue) -> tuple[BoolArray, BoolArray]:
+    result, handled = _not_empty_many(column, other_value)
+    return ~result, handled
+
+
+_vectorized_checks: dict[Callable, VectorizedCheck] = {
+    equals: _equals_many,
+    larger: _make_number_comparison(op.gt),
+    larger_equal: _make_number_comparison(op.ge),
+    less: _make_number_comparison(op.lt),
+    less_equal: _make_number_comparison(op.le),
+    older: _make_older_comparison(negate=False),
+    not_older: _make_older_comparison(negate=True),
+    empty: _empty_many,
+    not_empty: _not_empty_many,
+}
+
+
+def _check_each(column: _Column, mask: BoolArray, compiled: CompiledCheck) -> BoolArray:
+    """Evaluate the scalar check for all values in `mask`, once per distinct string."""
+    values = column.objects[mask]
+    results = np.zeros(len(values), dtype=bool)
+    is_string = _string_mask(values)
+    if is_string.any():
+        codes, uniques = pd.factorize(values[is_string])
+        unique_results = np.fromiter(map(compiled, uniques), dtype=bool, count=len(uniques))
+        results[is_string] = unique_results[codes]
+    others = values[~is_string]
+    results[~is_string] = np.fromiter(map(compiled, others), dtype=bool, count=len(others))
+    return results
+
+
+def check_many(values: Any, operator: str, other_value: OtherValue | None) -> BoolArray:
+    """
+    Validate many values at once.
+
+    Takes a one-dimensional NumPy array, pandas Series or list of
+    `values` and returns a boolean NumPy array with the result of
+    :py:func:`yaku.autopilot_utils.checks.check` for each value.
+
+    Like :py:func:`yaku.autopilot_utils.checks.compile_check`, errors in
+    the `operator` or `other_value` are raised before any value is checked.
+    Errors for single values (e.g. a value which is not a number in a number
+    comparison) are raised as by the scalar check functions.
+    """
+    compiled = compile_check(operator, other_value)
+    column = _Column(values)
+    check_function = checks_dict[operator]
+    vectorized = _vectorized_checks.get(check_function)
+    if vectorized is None or (
+        check_function not in (empty, not_empty)
+        and not isinstance(other_value, (str, int, float))
+    ):
+        return _check_each(column, np.ones(len(column), dtype=bool), compiled)
+
+    result, handled = vectorized(column, other_value)
+    if not handled.all():
+        result[~handled] = _check_each(column, ~handled, compiled)
+    return result
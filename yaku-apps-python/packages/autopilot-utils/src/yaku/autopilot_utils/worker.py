@@ -0,0 +1,154 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Long-lived worker process for autopilot apps.
+
+Starting an app (interpreter, pex bootstrap and imports) often takes much
+longer than the actual check, e.g. `filecheck exists`. In worker mode, the
+app is loaded only once and then serves many command invocations, which are
+sent by :py:mod:`yaku.autopilot_utils.worker_client`.
+
+Every app created with
+:py:func:`yaku.autopilot_utils.cli_base.make_autopilot_app` can be started as
+worker by setting the environment variable `AUTOPILOT_WORKER_SERVE` to the path
+of a Unix socket::
+
+    AUTOPILOT_WORKER_SERVE=/tmp/filecheck.sock filecheck &
+    AUTOPILOT_WORKER_SOCKET=/tmp/filecheck.sock worker-client exists foo.txt
+
+Modules which are only imported inside of `click_command` functions can be
+imported at startup of the worker by listing them (comma separated) in
+`AUTOPILOT_WORKER_PRELOAD`.
+
+Each invocation runs in a process forked from the worker, so that the
+`RESULTS`, environment variables and working directory of one invocation never
+leak into another one.
+"""
+
+import importlib
+import os
+import signal
+import socketserver
+import sys
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Union
+
+import click
+
+from .results import RESULTS
+from .worker_client import receive_request, send_exit_code
+
+SERVE_ENVIRONMENT_VARIABLE = "AUTOPILOT_WORKER_SERVE"
+PRELOAD_ENVIRONMENT_VARIABLE = "AUTOPILOT_WORKER_PRELOAD"
+
+
+def _exit_code(exit: SystemExit) -> int:
+    if exit.code is None:
+        return 0
+    if isinstance(exit.code, int):
+        return exit.code
+    print(exit.code, file=sys.stderr)
+    return 1
+
+
+def _run_command(app: Any, request: Dict, fds: List[int]) -> int:
+    os.environ.clear()
+    os.environ.update(request["env"])
+    os.chdir(request["cwd"])
+    for target_fd, fd in enumerate(fds):
+        os.dup2(fd, target_fd)
+        os.close(fd)
+    # the streams inherited from the worker might not write to the file descriptors
+    sys.stdin = open(0, encoding="utf-8", closefd=False)
+    sys.stdout = open(
+        1, "w", buffering=1 if os.isatty(1) else -1, encoding="utf-8", closefd=False
+    )
+    sys.stderr = open(2, "w", buffering=1, encoding="utf-8", closefd=False)
+    sys.argv = [sys.argv[0], *request["argv"]]
+    try:
+        app.main(args=request["argv"])
+        return 0
+    except SystemExit as e:
+        return _exit_code(e)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        RESULTS.disable_spooling()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    server: "_WorkerServer"
+
+    def handle(self):
+        # runs in the forked process, so SIGTERM must end the command, not shut down the worker
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        request, fds = receive_request(self.request)
+        send_exit_code(self.request, _run_command(self.server.app, request, fds))
+
+
+class _WorkerServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str, app: Any):
+        self.app = app
+        # only the user who started the worker may connect to it
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+
+def _load_subcommands(app: Any) -> None:
+    """Load lazy subcommands, so that they are not loaded again for every invocation."""
+    command = getattr(app, "_f", app)
+    if isinstance(command, click.Group):
+        ctx = click.Context(command)
+        for name in command.list_commands(ctx):
+            command.get_command(ctx, name)
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(app: Any, socket_path: Union[str, Path], preload: Iterable[str] = ()) -> None:
+    """
+    Run commands of `app` sent to the Unix socket at `socket_path` until terminated.
+
+    `app` is an app created with
+    :py:func:`yaku.autopilot_utils.cli_base.make_autopilot_app`.
+
+    The modules in `preload` are imported before the first command, so that
+    they are already loaded in the forked processes.
+    """
+    for module in preload:
+        importlib.import_module(module)
+    _load_subcommands(app)
+
+    socket_path = Path(socket_path)
+    if socket_path.is_socket():
+        # left over from a worker which was killed
+        socket_path.unlink()
+    with _WorkerServer(str(socket_path), app) as server:
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        print(f"Worker is listening on {socket_path}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def serve_from_environment(app: Any) -> None:
+    """Serve `app` at the socket path given in `AUTOPILOT_WORKER_SERVE`."""
+    socket_path = os.environ.pop(SERVE_ENVIRONMENT_VARIABLE)
+    preload = os.environ.pop(PRELOAD_ENVIRONMENT_VARIABLE, "")
+    serve(
+        app, socket_path, [module.strip() for module in preload.split(",") if module.strip()]
+    )
@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Thin client for running an autopilot app command in a worker process.
+
+The worker is started by running an app created with
+:py:func:`yaku.autopilot_utils.cli_base.make_autopilot_app` with the
+environment variable `AUTOPILOT_WORKER_SERVE` set to a socket path (see
+:py:mod:`yaku.autopilot_utils.worker`). This client forwards its command
+line arguments, environment variables and working directory to the worker
+given in `AUTOPILOT_WORKER_SOCKET` and exits with the exit code of the
+command::
+
+    AUTOPILOT_WORKER_SOCKET=/tmp/filecheck.sock worker-client exists foo.txt
+
+The standard input and output file descriptors of the client are passed to the
+worker, so the output of the command is written directly to the same place as
+if the app was called itself.
+
+This module only uses the standard library, so that the client starts fast.
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SOCKET_ENVIRONMENT_VARIABLE = "AUTOPILOT_WORKER_SOCKET"
+
+_LENGTH = struct.Struct("!I")
+_EXIT_CODE = struct.Struct("!i")
+_STANDARD_FDS = (0, 1, 2)
+
+
+def send_request(connection: socket.socket, request: Dict, fds: Sequence[int]) -> None:
+    """Send a JSON request together with file descriptors to the other end."""
+    data = json.dumps(request).encode()
+    socket.send_fds(connection, [_LENGTH.pack(len(data))], list(fds))
+    connection.sendall(data)
+
+
+def receive_request(connection: socket.socket) -> Tuple[Dict, List[int]]:
+    """Receive a request sent with :py:func:`send_request`."""
+    header, fds, _, _ = socket.recv_fds(connection, _LENGTH.size, len(_STANDARD_FDS))
+    header += _receive_exactly(connection, _LENGTH.size - len(header))
+    (length,) = _LENGTH.unpack(header)
+    return json.loads(_receive_exactly(connection, length)), fds
+
+
+def send_exit_code(connection: socket.socket, exit_code: int) -> None:
+    connection.sendall(_EXIT_CODE.pack(exit_code))
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size > 0:
+        chunk = connection.recv(size)
+        if not chunk:
+            raise ConnectionError("Connection was closed by the worker!")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def run(
+    socket_path: str,
+    args: Sequence[str],
+    *,
+    env: Optional[Dict[str, str]] = None,
+    cwd: Optional[str] = None,
+) -> int:
+    """
+    Run a command with `args` in the worker listening on `socket_path`.
+
+    Returns the exit code of the command. The command inherits the standard
+    input and output of the calling process, and by default also its
+    environment variables and working directory.
+    """
+    request = {
+        "argv": list(args),
+        "env": dict(os.environ if env is None else env),
+        "cwd": os.getcwd() if cwd is None else cwd,
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        send_request(connection, request, _STANDARD_FDS)
+        (exit_code,) = _EXIT_CODE.unpack(_receive_exactly(connection, _EXIT_CODE.size))
+    return exit_code
+
+
+def main():
+    socket_path = os.environ.get(SOCKET_ENVIRONMENT_VARIABLE)
+    if not socket_path:
+        print(
+            f"Environment variable {SOCKET_ENVIRONMENT_VARIABLE} is not set!", file=sys.stderr
+        )
+        sys.exit(2)
+    try:
+        exit_code = run(socket_path, sys.argv[1:])
+    except OSError as e:
+        print(f"Could not run command in worker at {socket_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
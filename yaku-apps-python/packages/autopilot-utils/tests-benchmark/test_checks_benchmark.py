@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import timeit
+
+import pytest
+from yaku.autopilot_utils.checks import check, compile_check
+
+NUMBER_OF_CALLS = 20_000
+
+
+@pytest.mark.parametrize(
+    ("operator", "checked_value", "other_value"),
+    [
+        ("equals", "Released", "Released"),
+        ("equals", "12.5", "12.5"),
+        ("contains", "Some long description text", "description"),
+        ("empty", "  ", None),
+        ("not-empty", "text", None),
+        ("larger", "12", "10"),
+        ("larger-equal", "12", 10),
+        ("less", "8", "10.5"),
+        ("less-equal", "8", 10),
+        ("older", "2020-01-01T10:00:00Z", "30d"),
+        ("older", "2020-01-01T10:00:00Z", "2021-01-01"),
+        ("not-older", "2020-01-01T10:00:00Z", "1 year 2 months"),
+        ("not-older", "2020-01-01T10:00:00Z", "2021-01-01T00:00:00Z"),
+    ],
+)
+def test_compiled_check_is_not_slower_than_check(operator, checked_value, other_value):
+    compiled = compile_check(operator, other_value)
+    assert compiled(checked_value) == check(checked_value, operator, other_value)
+
+    check_time = min(
+        timeit.repeat(
+            lambda: check(checked_value, operator, other_value),
+            number=NUMBER_OF_CALLS,
+            repeat=3,
+        )
+    )
+    compiled_time = min(
+        timeit.repeat(lambda: compiled(checked_value), number=NUMBER_OF_CALLS, repeat=3)
+    )
+    print(
+        f"\n{operator} {other_value!r}: check {check_time * 1e6 / NUMBER_OF_CALLS:.2f}µs, "
+        f"compiled {compiled_time * 1e6 / NUMBER_OF_CALLS:.2f}µs per call, "
+        f"speedup {check_time / compiled_time:.1f}x"
+    )
+    # allow for some measurement noise for operators which have nothing to pre-parse
+    assert compiled_time < check_time * 1.2
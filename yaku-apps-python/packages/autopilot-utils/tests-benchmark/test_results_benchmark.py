@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from yaku.autopilot_utils.results import Result, ResultsCollector
+
+NUMBER_OF_RESULTS = 1_000_000
+
+
+@dataclass
+class LegacyResult:
+    """Result type as it was before switching to slots and shared metadata."""
+
+    criterion: str
+    fulfilled: bool
+    justification: str
+    metadata: dict = field(default_factory=dict)
+
+
+def legacy_to_json(results) -> str:
+    lines = []
+    for result in results:
+        lines.append(json.dumps({"result": result.__dict__}))
+    return "\n".join(lines)
+
+
+def make_results(cls, number_of_results: int) -> list:
+    # share the strings between both result types so that only the
+    # per-instance overhead is measured
+    criterion = "Vulnerability must not be critical"
+    justification = "Vulnerability was found in some package"
+    return [cls(criterion, i % 2 == 0, justification) for i in range(number_of_results)]
+
+
+def measure_memory(f, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = f(*args)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, elapsed, result
+
+
+def test_slotted_results_use_less_memory():
+    legacy_peak, _, legacy = measure_memory(make_results, LegacyResult, NUMBER_OF_RESULTS)
+    del legacy
+    slotted_peak, _, slotted = measure_memory(make_results, Result, NUMBER_OF_RESULTS)
+    del slotted
+
+    print(
+        f"\n{NUMBER_OF_RESULTS} results: legacy {legacy_peak / 2**20:.0f} MiB, "
+        f"slotted {slotted_peak / 2**20:.0f} MiB"
+    )
+    assert slotted_peak < legacy_peak / 2
+
+
+def test_write_json_streams_with_constant_memory():
+    legacy_results = make_results(LegacyResult, NUMBER_OF_RESULTS)
+    results = ResultsCollector(make_results(Result, NUMBER_OF_RESULTS))
+
+    def legacy_print(devnull):
+        devnull.write(legacy_to_json(legacy_results))
+
+    with open(os.devnull, "w") as devnull:
+        legacy_peak, legacy_time, _ = measure_memory(legacy_print, devnull)
+        streaming_peak, streaming_time, _ = measure_memory(results.write_json, devnull)
+        start = time.perf_counter()
+        results.write_json(devnull)
+        streaming_time_untraced = time.perf_counter() - start
+        start = time.perf_counter()
+        legacy_print(devnull)
+        legacy_time_untraced = time.perf_counter() - start
+
+    print(
+        f"\n{NUMBER_OF_RESULTS} results: to_json+print peak {legacy_peak / 2**20:.0f} MiB "
+        f"in {legacy_time_untraced:.2f}s, write_json peak {streaming_peak / 2**20:.1f} MiB "
+        f"in {streaming_time_untraced:.2f}s"
+    )
+    assert streaming_peak < legacy_peak / 10
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import time
+
+from yaku.autopilot_utils.subprocess import (
+    AutopilotOutputParser,
+    Result,
+    ResultsCollector,
+    clean_json_lines,
+    parse_json_lines,
+    parse_json_lines_into_list,
+    parse_json_lines_into_map,
+)
+
+NUMBER_OF_LINES = 100_000
+
+
+def make_synthetic_output(number_of_lines: int) -> str:
+    lines = []
+    for i in range(number_of_lines):
+        if i % 10 == 0:
+            lines.append(
+                json.dumps(
+                    {
+                        "result": {
+                            "criterion": f"File {i} must exist",
+                            "fulfilled": i % 20 == 0,
+                            "justification": f"File {i} was checked",
+                        }
+                    }
+                )
+            )
+        elif i % 97 == 0:
+            lines.append(json.dumps({"output": {f"key{i}": f"value{i}"}}))
+        else:
+            lines.append(f"INFO  | Fetching file number {i} from the server")
+    lines.append(json.dumps({"status": "GREEN", "reason": "All files fetched."}))
+    return os.linesep.join(lines)
+
+
+def parse_multi_pass(text: str):
+    return (
+        parse_json_lines(text, "status"),
+        parse_json_lines(text, "reason"),
+        ResultsCollector(parse_json_lines_into_list(text, "result", cls=Result)),
+        parse_json_lines_into_map(text, "output"),
+        clean_json_lines(text),
+    )
+
+
+def parse_single_pass(text: str):
+    parser = AutopilotOutputParser()
+    parser.feed(text)
+    return (
+        parser.status,
+        parser.reason,
+        parser.results,
+        parser.outputs,
+        parser.clean_stdout,
+    )
+
+
+def measure(f, *args):
+    start = time.perf_counter()
+    result = f(*args)
+    return time.perf_counter() - start, result
+
+
+def test_single_pass_parser_is_faster_than_multi_pass_parsing():
+    text = make_synthetic_output(NUMBER_OF_LINES)
+
+    multi_pass_time, multi_pass_result = measure(parse_multi_pass, text)
+    single_pass_time, single_pass_result = measure(parse_single_pass, text)
+
+    print(
+        f"\n{NUMBER_OF_LINES} lines: multi-pass {multi_pass_time:.3f}s, "
+        f"single-pass {single_pass_time:.3f}s, "
+        f"speedup {multi_pass_time / single_pass_time:.1f}x"
+    )
+    assert single_pass_result == multi_pass_result
+    assert single_pass_time < multi_pass_time
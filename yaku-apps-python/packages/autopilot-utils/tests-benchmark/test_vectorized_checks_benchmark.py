@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from yaku.autopilot_utils.checks import check, compile_check
+from yaku.autopilot_utils.vectorized_checks import check_many
+
+NUMBER_OF_VALUES = 200_000
+
+
+def random_timestamp(rng: random.Random) -> str:
+    offset = timezone(timedelta(minutes=rng.choice([0, 60, 120, -300, 330])))
+    date = datetime(2000, 1, 1, tzinfo=offset) + timedelta(
+        seconds=rng.randrange(20 * 365 * 86400), microseconds=rng.randrange(10**6)
+    )
+    return date.isoformat(timespec=rng.choice(["minutes", "seconds", "milliseconds"]))
+
+
+def make_column(kind: str) -> np.ndarray:
+    rng = random.Random(42)
+    if kind == "floats":
+        return np.array([rng.uniform(-1000, 1000) for _ in range(NUMBER_OF_VALUES)])
+    if kind == "numbers":
+        values = [
+            f"{rng.uniform(-1000, 1000):.{rng.randrange(6)}f}" for _ in range(NUMBER_OF_VALUES)
+        ]
+    elif kind == "timestamps":
+        values = [random_timestamp(rng) for _ in range(NUMBER_OF_VALUES)]
+    else:
+        words = ["Released", "Draft", "In Review", "", "  ", "Obsolete"]
+        values = [rng.choice(words) + " " * rng.randrange(2) for _ in range(NUMBER_OF_VALUES)]
+    return np.array(values, dtype=object)
+
+
+@pytest.mark.parametrize(
+    ("kind", "operator", "other_value"),
+    [
+        ("words", "equals", "Released"),
+        ("words", "contains", "Review"),
+        ("words", "not-empty", None),
+        ("floats", "larger", 10),
+        ("floats", "not-empty", None),
+        ("numbers", "equals", "12.5"),
+        ("numbers", "larger", 10),
+        ("numbers", "less-equal", "-10.5"),
+        ("timestamps", "older", "2010-01-01T00:00:00Z"),
+        ("timestamps", "not-older", "5 years"),
+    ],
+)
+def test_check_many_is_faster_than_checking_each_value(kind, operator, other_value):
+    values = make_column(kind)
+
+    start = time.perf_counter()
+    expected = [check(value, operator, other_value) for value in values]
+    check_time = time.perf_counter() - start
+
+    compiled = compile_check(operator, other_value)
+    start = time.perf_counter()
+    [compiled(value) for value in values]
+    compiled_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = check_many(values, operator, other_value)
+    vectorized_time = time.perf_counter() - start
+
+    assert result.tolist() == expected
+    print(
+        f"\n{operator} {other_value!r} on {NUMBER_OF_VALUES} {kind}: "
+        f"check {check_time * 1e3:.0f}ms, compiled check {compiled_time * 1e3:.0f}ms, "
+        f"check_many {vectorized_time * 1e3:.0f}ms, speedup {check_time / vectorized_time:.1f}x"
+    )
+    assert vectorized_time < check_time
@@ -4,7 +4,7 @@
 
 import pytest
 from freezegun import freeze_time
-from yaku.autopilot_utils.checks import check
+from yaku.autopilot_utils.checks import check, compile_check
 from yaku.autopilot_utils.errors import AutopilotConfigurationError, AutopilotError
 
 
@@ -102,3 +102,71 @@ def test_check_date_comparison_against_time_span(is_prefix):
 def test_invalid_operator():
     with pytest.raises(AutopilotConfigurationError, match="Invalid operator"):
         check("something", "invalid-operator", "something else")
+
+
+CHECKED_VALUES = [
+    "",
+    " ",
+    "abc",
+    "2",
+    "2.0",
+    ".2",
+    "8",
+    "-1",
+    "2000-01-01",
+    "2020-01-01",
+    None,
+]
+
+
+@freeze_time("2010-01-01")
+@pytest.mark.parametrize(
+    ("operator", "other_value"),
+    [
+        ("equals", "abc"),
+        ("equals", "2"),
+        ("equals", 2),
+        ("equals", 0.2),
+        ("equals", None),
+        ("contains", "b"),
+        ("contains", 2),
+        ("empty", None),
+        ("not-empty", ""),
+        ("larger", 2),
+        ("larger-equal", "2"),
+        ("less", 5.1),
+        ("less-equal", ".2"),
+        ("older", "2001-01-01"),
+        ("older", "1 year"),
+        ("not-older", "1 year"),
+        ("not-older", "2001-01-01T00:00:00Z"),
+        ("older-than", -1),
+    ],
+)
+def test_compiled_check_gives_same_results_as_check(operator, other_value):
+    compiled = compile_check(operator, other_value)
+    for checked_value in CHECKED_VALUES:
+        try:
+            expected = check(checked_value, operator, other_value)  # type: ignore
+        except Exception as e:
+            with pytest.raises(type(e)):
+                compiled(checked_value)  # type: ignore
+        else:
+            assert compiled(checked_value) == expected, checked_value  # type: ignore
+
+
+def test_compile_check_validates_operator_and_value():
+    with pytest.raises(AutopilotConfigurationError, match="Unknown operator 'invalid'"):
+        compile_check("invalid", "something")
+    with pytest.raises(AutopilotConfigurationError, match="Could not convert `abc`"):
+        compile_check("larger-than", "abc")
+    with pytest.raises(AutopilotConfigurationError, match="Invalid timestamp"):
+        compile_check("older-than", "abc")
+
+
+@freeze_time("2010-01-01")
+def test_compiled_time_span_check_uses_current_time():
+    is_recent = compile_check("not-older-than", "1 day")
+    assert is_recent("2009-12-31T12:00:00Z")
+    with freeze_time("2010-01-03"):
+        assert not is_recent("2009-12-31T12:00:00Z")
@@ -224,3 +224,26 @@ def test_older_against_time_span():
     assert not older("2009-01-01T00:00Z", "1 year")
     assert older("2008-12-31T00:00Z", "1 year")
     assert older("2009-01-01T00:00Z", "364 days")
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2020-01-01",
+        "2020-01-01T10:00",
+        "2020-01-01T10:00:00Z",
+        "2020-01-01 10:00:00.123",
+        "2020-01-01T10:00:00.123456+02:00",
+        "2020-01-01T10:00:00-05:30",
+        "2020-02-30T10:00:00Z",
+        "Jan 1 2020 10:00",
+    ],
+)
+def test_convert_to_date_gives_same_result_as_dateutil(timestamp):
+    import dateutil.parser
+
+    try:
+        expected = dateutil.parser.parse(timestamp).astimezone(tz=pytz.utc).timestamp()
+    except dateutil.parser.ParserError:
+        expected = None
+    assert convert_to_date(timestamp) == expected
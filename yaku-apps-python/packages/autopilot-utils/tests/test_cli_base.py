@@ -18,7 +18,11 @@ import mock
 import pytest
 from loguru import logger
 from pydantic import BaseModel
-from yaku.autopilot_utils.cli_base import make_autopilot_app, read_version_from_package
+from yaku.autopilot_utils.cli_base import (
+    LazySubcommand,
+    make_autopilot_app,
+    read_version_from_package,
+)
 from yaku.autopilot_utils.errors import AutopilotFailure
 from yaku.autopilot_utils.results import (
     DEFAULT_EVALUATOR,
@@ -278,6 +282,71 @@ def test_subcommands_work_if_chaining_is_disabled():
     assert "In sub2" in result.output
 
 
+def test_lazy_subcommands_are_only_loaded_when_invoked():
+    class SubProvider:
+        def __init__(self, nr):
+            self.click_name = f"sub{nr}"
+
+        def click_command(self):
+            logger.info(f"In {self.click_name} command")
+
+    loaded = []
+
+    def make_loader(nr):
+        def load():
+            loaded.append(nr)
+            return SubProvider(nr)
+
+        return load
+
+    class MainProvider:
+        click_name = "main"
+        click_help_text = "help"
+
+        click_subcommands = [
+            LazySubcommand("sub1", make_loader(1)),
+            LazySubcommand("sub2", make_loader(2)),
+        ]
+
+    app = make_autopilot_app(MainProvider, version_callback=lambda: "1")
+    runner = click.testing.CliRunner()
+
+    result = runner.invoke(app, "--version")
+    assert loaded == []
+
+    result = runner.invoke(app, ["sub2", "sub2"])
+    assert result.output.count("In sub2") == 2
+    assert loaded == [2]
+
+    result = runner.invoke(app, "--help")
+    assert "sub1" in result.output
+    assert "sub2" in result.output
+
+
+def test_lazy_subcommands_work_if_chaining_is_disabled():
+    class SubProvider:
+        click_name = "sub"
+
+        @staticmethod
+        def click_command():
+            logger.info("In sub command")
+
+    class MainProvider:
+        click_name = "main"
+        click_help_text = "help"
+
+        click_subcommands = [LazySubcommand("sub", lambda: SubProvider)]
+
+    app = make_autopilot_app(MainProvider, version_callback=lambda: "1", allow_chaining=False)
+    runner = click.testing.CliRunner()
+
+    result = runner.invoke(app, ["sub"])
+    assert "In sub command" in result.output
+
+    result = runner.invoke(app, ["unknown"])
+    assert "No such command" in result.output
+
+
 def test_command_errors_are_handled():
     class SimpleProvider:
         click_name = "simple"
@@ -657,3 +726,28 @@ def test_stderr_and_stdout_are_shown_for_all_statuses(status):
     assert result.exit_code == 0, result.stdout
     assert result.stdout.count("foo") == 1
     assert result.stdout.count("bar") == 1
+
+
+@protect_results
+def test_results_are_spooled_if_environment_variable_is_set(monkeypatch):
+    monkeypatch.setenv("AUTOPILOT_RESULTS_SPOOLING", "true")
+
+    class SimpleEvaluatorProvider:
+        click_name = "simple"
+        click_help_text = "help"
+
+        @staticmethod
+        def click_command():
+            for i in range(3):
+                RESULTS.append(Result(f"c{i}", i != 1, f"j{i}"))
+            assert RESULTS.spooling
+
+        click_evaluator_callback = DEFAULT_EVALUATOR
+
+    app = make_autopilot_app(SimpleEvaluatorProvider, version_callback=lambda: "1")
+    runner = click.testing.CliRunner()
+
+    result = runner.invoke(app)
+    assert result.exit_code == 0
+    assert_result_status(result.output, "RED", reason="Criterion is: c1\nBut: j1")
+    assert result.output.count('{"result": ') == 3
@@ -2,12 +2,20 @@
 #
 # SPDX-License-Identifier: MIT
 
+import dataclasses
+import io
 import json
 import random
 from typing import List, Optional
 
 import pytest
-from yaku.autopilot_utils.results import Output, Result, ResultsCollector
+from yaku.autopilot_utils.results import (
+    DEFAULT_EVALUATOR,
+    Output,
+    Result,
+    ResultsAggregate,
+    ResultsCollector,
+)
 
 
 def test_output_dataclass():
@@ -133,3 +141,149 @@ def test_collector_can_export_to_json():
     for nr, line in enumerate(json_string.split("\n")):
         data = json.loads(line)
         assert Result(**data["result"]) == results[nr]
+
+
+def test_result_uses_slots_and_shares_empty_metadata():
+    r1 = Result("c1", True, "j1")
+    r2 = Result("c2", False, "j2")
+    assert not hasattr(r1, "__dict__")
+    assert r1.metadata is r2.metadata
+    with pytest.raises(TypeError, match="read-only"):
+        r1.metadata["key"] = "value"
+    assert r2.metadata == {}
+
+
+def test_result_with_metadata_keeps_own_metadata():
+    r = Result("c", True, "j", metadata={"key": "value"})
+    r.metadata["other"] = 1
+    assert r.metadata == {"key": "value", "other": 1}
+
+
+@pytest.mark.parametrize("number_of_results", [0, 1, 5, 12])
+def test_collector_write_json_writes_same_text_as_to_json(number_of_results):
+    collector = ResultsCollector(
+        [
+            Result(f"crit {i}", i % 2 == 0, f"just {i}", metadata={"nr": i} if i % 3 else {})
+            for i in range(number_of_results)
+        ]
+    )
+    collector.json_chunk_size = 5
+    stream = io.StringIO()
+    collector.write_json(stream)
+
+    expected = "\n".join(json.dumps({"result": dataclasses.asdict(r)}) for r in collector)
+    assert stream.getvalue() == collector.to_json() == expected
+
+
+def make_mixed_results(number_of_results: int) -> List[Result]:
+    return [
+        Result(
+            f"crit {i}",
+            i % 3 != 0,
+            f"just {i}",
+            metadata={"severity": ["low", "high"][i % 2], "tags": ["a"]},
+        )
+        for i in range(number_of_results)
+    ]
+
+
+def test_aggregate_counts_results_and_metadata_values():
+    aggregate = ResultsAggregate.from_results(make_mixed_results(10), max_examples=2)
+    assert aggregate.total == 10
+    assert aggregate.fulfilled == 6
+    assert aggregate.unfulfilled == 4
+    assert [r.criterion for r in aggregate.first_results] == ["crit 0", "crit 1"]
+    assert [r.criterion for r in aggregate.first_failures] == ["crit 0", "crit 3"]
+    assert aggregate.omitted_results == 8
+    assert aggregate.omitted_failures == 2
+    assert aggregate.metadata_histograms["severity"] == {"low": 5, "high": 5}
+    assert aggregate.metadata_histograms["tags"] == {'["a"]': 10}
+
+
+def test_spooling_collector_keeps_results_on_disk(tmp_path):
+    results = make_mixed_results(25)
+    collector = ResultsCollector(results[:5])
+    collector.enable_spooling(tmp_path, max_examples=3)
+    collector.extend(results[5:20])
+    for result in results[20:]:
+        collector.append(result)
+
+    assert collector.spooling
+    assert list.__len__(collector) == 0
+    assert len(list(tmp_path.iterdir())) == 1
+    assert len(collector) == 25
+    assert list(collector) == results
+    assert not collector
+    assert collector.aggregate.unfulfilled == 9
+    assert len(collector.aggregate.first_failures) == 3
+
+    collector.json_chunk_size = 7
+    assert collector.to_json() == ResultsCollector(results).to_json()
+
+    collector.clear()
+    assert len(collector) == 0
+    assert collector.spooling
+    collector.disable_spooling()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spooling_collector_rejects_list_operations(tmp_path):
+    results = make_mixed_results(3)
+    collector = ResultsCollector(results)
+    assert collector[0] == results[0] and results[1] in collector
+    collector.enable_spooling(tmp_path)
+
+    for operation in [
+        lambda: collector[0],
+        lambda: collector[1:],
+        lambda: results[0] in collector,
+        lambda: collector == results,
+        lambda: collector.copy(),
+        lambda: collector.index(results[0]),
+        lambda: collector.pop(),
+    ]:
+        with pytest.raises(TypeError, match="not supported while results are spooled"):
+            operation()
+    collector += results[:1]
+    assert len(collector) == 4
+    assert repr(collector) == "<ResultsCollector with 4 spooled results>"
+    collector.disable_spooling()
+
+
+def test_isolated_collector_restores_spooled_results(tmp_path):
+    results = make_mixed_results(3)
+    collector = ResultsCollector(results)
+    collector.enable_spooling(tmp_path)
+
+    with collector.isolated():
+        assert not collector.spooling and len(collector) == 0
+        collector.append(results[0])
+        collector.enable_spooling(tmp_path)
+
+    assert collector.spooling
+    assert list(collector) == results
+    assert len(list(tmp_path.iterdir())) == 1
+    collector.disable_spooling()
+
+
+def test_default_evaluator_gives_same_reason_as_before_without_spooling():
+    results = ResultsCollector(make_mixed_results(5))
+    status, reason = DEFAULT_EVALUATOR(results)
+    assert status == "RED"
+    assert reason == "\n".join(
+        "Criterion is: " + r.criterion + "\nBut: " + r.justification
+        for r in results
+        if not r.fulfilled
+    )
+    results = ResultsCollector([r for r in make_mixed_results(5) if r.fulfilled])
+    assert DEFAULT_EVALUATOR(results) == ("GREEN", "just 1\njust 2\njust 4")
+
+
+def test_default_evaluator_mentions_omitted_results_when_spooling(tmp_path):
+    results = ResultsCollector()
+    results.enable_spooling(tmp_path, max_examples=1)
+    results.extend(make_mixed_results(10))
+    status, reason = DEFAULT_EVALUATOR(results)
+    assert status == "RED"
+    assert reason == "Criterion is: crit 0\nBut: just 0\n... and 3 more unfulfilled criteria."
+    results.disable_spooling()
@@ -2,21 +2,33 @@
 #
 # SPDX-License-Identifier: MIT
 
+import sys
+import textwrap
+import time
 from dataclasses import dataclass, field
 
 import pytest
 from _pytest.logging import LogCaptureFixture
 from loguru import logger
+from yaku.autopilot_utils.results import RESULTS, protect_results
 from yaku.autopilot_utils.subprocess import (
+    AutopilotOutputParser,
     AutopilotSubprocessFailure,
     OutputMap,
     ProcessResult,
     Result,
     ResultsCollector,
+    Step,
+    StepGraph,
+    clean_json_lines,
     gen_exit_for_returncode,
     gen_raise_for_status,
+    parse_json_lines,
     parse_json_lines_into_list,
     parse_json_lines_into_map,
+    run,
+    run_many,
+    run_streaming,
 )
 
 
@@ -214,3 +226,183 @@ def test_gen_raise_for_status_does_not_ignore_none_status_if_not_ignored():
     raise_for_status = gen_raise_for_status(DummyProcessResult(returncode=0, status=None))
     with pytest.raises(AutopilotSubprocessFailure):
         raise_for_status(ignore_no_status=False)
+
+
+SAMPLE_AUTOPILOT_OUTPUT = "\n".join(
+    [
+        "INFO  | Starting fetcher",
+        '{"output": {"file": "a.txt"}}',
+        '{"result": {"criterion": "c1", "fulfilled": true, "justification": "j1"}}',
+        "Infinitely many log lines",
+        '{"status": "YELLOW", "reason": "first"}',
+        "",
+        "  indented text",
+        '  {"output": {"file": "b.txt", "other": "x"}}',
+        '{"result": {"criterion": "c2", "fulfilled": "false", "justification": "j2", "metadata": {"k": 1}}}',
+        "{not json",
+        '{"status": "GREEN", "reason": "second"}',
+        "DEBUG | done",
+    ]
+)
+
+
+def test_output_parser_is_equivalent_to_separate_parse_functions():
+    parser = AutopilotOutputParser()
+    parser.feed(SAMPLE_AUTOPILOT_OUTPUT)
+
+    assert parser.status == parse_json_lines(SAMPLE_AUTOPILOT_OUTPUT, "status") == "GREEN"
+    assert parser.reason == parse_json_lines(SAMPLE_AUTOPILOT_OUTPUT, "reason") == "second"
+    assert parser.results == parse_json_lines_into_list(
+        SAMPLE_AUTOPILOT_OUTPUT, "result", cls=Result
+    )
+    assert len(parser.results) == 2
+    assert parser.outputs == parse_json_lines_into_map(SAMPLE_AUTOPILOT_OUTPUT, "output")
+    assert parser.outputs == {"file": "b.txt", "other": "x"}
+    assert parser.clean_stdout == clean_json_lines(SAMPLE_AUTOPILOT_OUTPUT)
+
+
+def test_output_parser_feed_line_classifies_lines():
+    parser = AutopilotOutputParser()
+    assert parser.feed_line('{"status": "RED"}') is True
+    assert parser.feed_line("INFO  | some log") is False
+    assert parser.feed_line("Infinity") is True
+    assert parser.feed_line("42") is True
+    assert parser.status == "RED"
+    assert parser.clean_stdout == "INFO  | some log"
+
+
+CHILD_APP_CODE = textwrap.dedent(
+    """
+    import json
+    import sys
+    for i in range(5):
+        print(f"log line {i}")
+    print(json.dumps({"result": {"criterion": "c", "fulfilled": True, "justification": "j"}}))
+    print(json.dumps({"output": {"key": "value"}}))
+    print("error line", file=sys.stderr)
+    print(json.dumps({"status": "GREEN", "reason": "all good"}))
+    """
+)
+
+
+def test_run_streaming_returns_same_attributes_as_run(capsys):
+    command = [sys.executable, "-c", CHILD_APP_CODE]
+    buffered = run(command)
+    capsys.readouterr()
+    streamed = run_streaming(command)
+
+    assert streamed.returncode == buffered.returncode == 0
+    assert streamed.status == buffered.status == "GREEN"
+    assert streamed.reason == buffered.reason
+    assert streamed.results == buffered.results
+    assert streamed.outputs == buffered.outputs
+    assert streamed.clean_stdout == buffered.clean_stdout.rstrip()
+    assert streamed.stderr == buffered.stderr.rstrip()
+
+
+def test_run_streaming_relays_plain_output_immediately_and_only_once(capsys):
+    result = run_streaming([sys.executable, "-c", CHILD_APP_CODE])
+    relayed = capsys.readouterr()
+    assert relayed.out.count("log line 0") == 1
+    assert "status" not in relayed.out
+    assert relayed.err.count("error line") == 1
+
+    result.exit_for_returncode()
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err == ""
+
+
+def test_run_streaming_keeps_only_the_last_lines(capsys):
+    result = run_streaming([sys.executable, "-c", CHILD_APP_CODE], max_buffered_lines=2)
+    assert result.clean_stdout.splitlines() == ["log line 3", "log line 4"]
+    assert len(result.stdout.splitlines()) == 2
+    assert len(result.results) == 1
+    assert result.status == "GREEN"
+
+
+def test_run_streaming_sets_error_status_for_nonzero_returncode(capsys):
+    result = run_streaming([sys.executable, "-c", "import sys; sys.exit(3)"])
+    assert result.returncode == 3
+    assert result.status == "ERROR"
+
+
+def output_app(key: str, value: str, sleep: float = 0.0) -> list:
+    code = (
+        f"import json, os, time; time.sleep({sleep}); "
+        f"print(json.dumps({{'output': {{'{key}': '{value}' + os.environ.get('SUFFIX', '')}}}})); "
+        f"print(json.dumps({{'result': {{'criterion': '{key}', 'fulfilled': True, 'justification': 'j'}}}}))"
+    )
+    return [sys.executable, "-c", code]
+
+
+@protect_results
+def test_run_many_passes_outputs_and_collects_results_in_step_order():
+    step_results = run_many(
+        [
+            Step("third", output_app("c", "3"), inputs={"SUFFIX": ("second", "b")}),
+            Step("first", output_app("a", "1", sleep=0.2)),
+            Step("second", output_app("b", "2"), depends_on=["first"]),
+            Step(
+                "fourth",
+                lambda outputs: output_app("d", outputs["first"]["a"]),
+                depends_on=["first"],
+            ),
+        ],
+        max_workers=4,
+    )
+    assert list(step_results) == ["third", "first", "second", "fourth"]
+    assert step_results["third"].outputs == {"c": "32"}
+    assert step_results["fourth"].outputs == {"d": "1"}
+    assert [r.criterion for r in RESULTS] == ["c", "a", "b", "d"]
+
+
+def test_run_many_runs_independent_steps_in_parallel():
+    start = time.perf_counter()
+    run_many(
+        [Step(f"step{i}", output_app(f"k{i}", "v", sleep=0.5)) for i in range(3)],
+        max_workers=3,
+        collect_results=False,
+    )
+    assert time.perf_counter() - start < 1.4
+
+
+def test_run_many_skips_steps_after_failed_dependency():
+    step_results = run_many(
+        [
+            Step("failing", [sys.executable, "-c", "import sys; sys.exit(1)"]),
+            Step("dependent", output_app("a", "1"), depends_on=["failing"]),
+            Step("transitive", output_app("b", "1"), depends_on=["dependent"]),
+            Step("independent", output_app("c", "1")),
+        ],
+        collect_results=False,
+    )
+    assert list(step_results) == ["failing", "independent"]
+    assert step_results["failing"].status == "ERROR"
+
+
+def test_run_many_fails_step_with_missing_input():
+    step_results = run_many(
+        [
+            Step("first", output_app("a", "1")),
+            Step("second", output_app("b", "2"), inputs={"SUFFIX": ("first", "missing")}),
+            Step("third", output_app("c", "3"), depends_on=["second"]),
+        ],
+        collect_results=False,
+    )
+    assert list(step_results) == ["first", "second"]
+    assert step_results["second"].status == "ERROR"
+    assert step_results["second"].reason == (
+        "Step 'second' is missing the output 'missing' of step 'first'."
+    )
+
+
+def test_step_graph_rejects_invalid_graphs():
+    with pytest.raises(ValueError, match="already a step"):
+        StepGraph([Step("a", "true"), Step("a", "true")])
+    with pytest.raises(ValueError, match="unknown step 'b'"):
+        StepGraph([Step("a", "true", depends_on=["b"])]).validate()
+    with pytest.raises(ValueError, match="cycle: a -> b -> a"):
+        StepGraph(
+            [Step("a", "true", depends_on=["b"]), Step("b", "true", depends_on=["a"])]
+        ).validate()
@@ -0,0 +1,194 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import pytest
+from yaku.autopilot_utils.throttling import (
+    AimdLimiter,
+    ThrottledTransport,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+@dataclass
+class FakeResponse:
+    status_code: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    closed: bool = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_bursts_and_then_the_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    for _ in range(5):
+        bucket.acquire()
+
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_token_bucket_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_aimd_limiter_decreases_and_increases_limit():
+    limiter = AimdLimiter(8)
+
+    limiter.on_throttled()
+    limiter.on_throttled()
+    assert limiter.limit == 2
+    for _ in range(3):
+        limiter.on_throttled()
+    assert limiter.limit == 1
+
+    for _ in range(4):
+        limiter.on_success()
+    assert 3 < limiter.limit < 4
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 8
+
+
+def test_aimd_limiter_limits_concurrent_slots():
+    limiter = AimdLimiter(2)
+    limiter.on_throttled()
+    entered = threading.Event()
+
+    with limiter.slot():
+        thread = threading.Thread(target=lambda: limiter.slot().__enter__() or entered.set())
+        thread.start()
+        assert not entered.wait(0.05)
+    thread.join(1)
+    assert entered.is_set()
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, None),
+        ("3", 3.0),
+        ("-1", 0.0),
+        ("Wed, 21 Oct 2015 07:28:10 GMT", 10.0),
+        ("soon", None),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    now = datetime(2015, 10, 21, 7, 28, tzinfo=timezone.utc)
+    assert parse_retry_after(value, now) == expected
+
+
+def test_backoff_delay_is_capped_and_jittered():
+    assert backoff_delay(0, random_fraction=lambda: 1.0) == 0.5
+    assert backoff_delay(3, random_fraction=lambda: 0.5) == 2.0
+    assert backoff_delay(20, random_fraction=lambda: 1.0) == 60.0
+
+
+def _transport_answering(*responses, **kwargs):
+    clock = FakeClock()
+    remaining = list(responses)
+
+    def send():
+        response = remaining.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return ThrottledTransport(clock=clock, sleep=clock.sleep, **kwargs), send, clock
+
+
+def test_transport_honours_retry_after():
+    throttled = FakeResponse(429, {"Retry-After": "7"})
+    transport, send, clock = _transport_answering(throttled, FakeResponse(200))
+
+    assert transport.request(send).status_code == 200
+    assert clock.sleeps == [7.0]
+    assert throttled.closed
+    assert transport.limiter.limit == 1
+
+
+def test_transport_retries_idempotent_requests_with_backoff():
+    transport, send, clock = _transport_answering(
+        ConnectionError("reset"),
+        FakeResponse(502),
+        FakeResponse(200),
+        retry_exceptions=(ConnectionError,),
+        backoff_base=1,
+    )
+
+    assert transport.request(send).status_code == 200
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1 and 0 <= clock.sleeps[1] <= 2
+
+
+def test_transport_releases_slot_before_waiting_for_retry():
+    active_during_sleeps = []
+    transport, send, clock = _transport_answering(
+        ConnectionError("reset"), FakeResponse(200), retry_exceptions=(ConnectionError,)
+    )
+
+    def sleep(seconds: float):
+        active_during_sleeps.append(transport.limiter._active)
+        clock.sleep(seconds)
+
+    transport._sleep = sleep
+
+    assert transport.request(send).status_code == 200
+    assert active_during_sleeps == [0]
+
+
+def test_transport_only_retries_throttled_non_idempotent_requests():
+    transport, send, clock = _transport_answering(
+        FakeResponse(503), FakeResponse(502), retry_exceptions=(ConnectionError,)
+    )
+    assert transport.request(send, idempotent=False).status_code == 502
+    assert len(clock.sleeps) == 1
+
+    transport, send, clock = _transport_answering(
+        ConnectionError("reset"), retry_exceptions=(ConnectionError,)
+    )
+    with pytest.raises(ConnectionError):
+        transport.request(send, idempotent=False)
+
+
+def test_transport_gives_up_after_max_retries():
+    transport, send, clock = _transport_answering(
+        *[FakeResponse(429, {"Retry-After": "1"}) for _ in range(3)], max_retries=2
+    )
+
+    assert transport.request(send).status_code == 429
+    assert clock.sleeps == [1.0, 1.0]
+
+
+def test_transport_limits_request_rate():
+    transport, send, clock = _transport_answering(
+        *[FakeResponse(200) for _ in range(3)], requests_per_second=1
+    )
+
+    for _ in range(3):
+        transport.request(send)
+
+    assert clock.sleeps == [1.0, 1.0]
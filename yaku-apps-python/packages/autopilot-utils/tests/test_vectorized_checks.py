@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+import pandas as pd
+import pytest
+from freezegun import freeze_time
+from yaku.autopilot_utils.checks import check
+from yaku.autopilot_utils.errors import AutopilotConfigurationError, AutopilotError
+from yaku.autopilot_utils.vectorized_checks import check_many
+
+STRING_VALUES = [
+    "",
+    " ",
+    "abc",
+    "b",
+    "2",
+    "2.0",
+    " 2 ",
+    "2e0",
+    ".2",
+    "0.2",
+    "-1",
+    "8",
+    "0",
+    "1_0",
+    "inf",
+    "nan",
+    "2000-01-01",
+    "2009-06-01T12:00:00Z",
+    "2009-06-01 12:00:00.123+02:00",
+    "2009-06-01T12:00:00.123456-05:30",
+    "2020-01-01T00:00Z",
+    "2020-02-30T00:00:00Z",
+    "Jan 1 2000",
+]
+NUMBER_VALUES = [0.0, -0.0, 0.2, 2.0, 2.5, -1.0, 8.0, np.nan, np.inf]
+
+OPERATORS = [
+    ("equals", "abc"),
+    ("equals", "2"),
+    ("equals", 2),
+    ("equals", 0.2),
+    ("equals", "nan"),
+    ("contains", "b"),
+    ("contains", 2),
+    ("contains", ""),
+    ("empty", None),
+    ("not-empty", ""),
+    ("larger", 2),
+    ("larger-equal", "2"),
+    ("less", 5.1),
+    ("less-equal", ".2"),
+    ("older", "2001-01-01"),
+    ("older", "1 year"),
+    ("not-older", "1 year"),
+    ("not-older", "2009-06-01T12:00:00.123Z"),
+    ("older-than", -1),
+]
+
+
+def expected_results(values, operator, other_value):
+    """Return the results of `check` for all values or the first exception type."""
+    results = []
+    for value in values:
+        try:
+            results.append(check(value, operator, other_value))
+        except Exception as e:
+            return type(e)
+    return results
+
+
+def assert_same_results_as_check(values, operator, other_value):
+    expected = expected_results(values, operator, other_value)
+    if isinstance(expected, type):
+        with pytest.raises(expected):
+            check_many(values, operator, other_value)
+    else:
+        result = check_many(values, operator, other_value)
+        assert result.dtype == bool
+        assert result.tolist() == expected
+
+
+@freeze_time("2010-01-01")
+@pytest.mark.parametrize(("operator", "other_value"), OPERATORS)
+def test_check_many_gives_same_results_as_check_for_each_string(operator, other_value):
+    for value in STRING_VALUES:
+        assert_same_results_as_check([value], operator, other_value)
+
+
+@freeze_time("2010-01-01")
+@pytest.mark.parametrize(("operator", "other_value"), OPERATORS)
+def test_check_many_gives_same_results_as_check_for_columns(operator, other_value):
+    valid_values = [
+        v
+        for v in STRING_VALUES
+        if not isinstance(expected_results([v], operator, other_value), type)
+    ]
+    assert_same_results_as_check(
+        np.array(valid_values * 3, dtype=object), operator, other_value
+    )
+    assert_same_results_as_check(pd.Series(valid_values), operator, other_value)
+    assert_same_results_as_check(valid_values + [1.0, 2, None], operator, other_value)
+
+
+@freeze_time("2010-01-01")
+@pytest.mark.parametrize(("operator", "other_value"), OPERATORS)
+def test_check_many_gives_same_results_as_check_for_numeric_columns(operator, other_value):
+    assert_same_results_as_check(np.array(NUMBER_VALUES), operator, other_value)
+    assert_same_results_as_check(pd.Series([0, 1, 2, 8]), operator, other_value)
+    assert_same_results_as_check(np.array([True, False]), operator, other_value)
+
+
+def test_check_many_returns_empty_mask_for_empty_column():
+    assert check_many([], "equals", "x").tolist() == []
+    assert check_many(pd.Series([], dtype=object), "older", "1d").tolist() == []
+
+
+def test_check_many_validates_operator_and_value_before_checking():
+    with pytest.raises(AutopilotConfigurationError, match="Unknown operator"):
+        check_many(["a"], "invalid", "a")
+    with pytest.raises(AutopilotConfigurationError, match="Could not convert"):
+        check_many([], "larger", "abc")
+
+
+def test_check_many_raises_for_invalid_values():
+    with pytest.raises(AutopilotError, match="Could not convert `abc`"):
+        check_many(["1", "abc"], "larger", 1)
+    with pytest.raises(AutopilotError, match="is not a valid date"):
+        check_many(["2020-01-01T00:00:00Z", "2020-13-45"], "older", "1d")
+
+
+def test_check_many_rejects_multidimensional_values():
+    with pytest.raises(ValueError, match="one-dimensional"):
+        check_many(np.zeros((2, 2)), "larger", 1)
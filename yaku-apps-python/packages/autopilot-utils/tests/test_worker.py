@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: 2024 grow platform GmbH
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import multiprocessing
+import os
+import time
+
+import click
+import pytest
+from loguru import logger
+from yaku.autopilot_utils.cli_base import LazySubcommand, make_autopilot_app
+from yaku.autopilot_utils.results import DEFAULT_EVALUATOR, RESULTS, Result
+from yaku.autopilot_utils.worker import serve
+from yaku.autopilot_utils.worker_client import run
+
+
+class Append:
+    click_name = "append"
+    click_setup = [click.argument("criterion")]
+
+    @staticmethod
+    def click_command(criterion: str):
+        RESULTS.append(Result(criterion=criterion, fulfilled=True, justification="ok"))
+
+
+class Environment:
+    click_name = "environment"
+
+    @staticmethod
+    def click_command():
+        logger.info("cwd={} FOO={}", os.getcwd(), os.environ.get("FOO"))
+
+
+class Crash:
+    click_name = "crash"
+
+    @staticmethod
+    def click_command():
+        raise Exception("Crashing as requested")
+
+
+class MainProvider:
+    click_name = "main"
+    click_help_text = "help"
+    click_evaluator_callback = DEFAULT_EVALUATOR
+
+    click_subcommands = [Append, Environment, LazySubcommand("crash", lambda: Crash)]
+
+
+@pytest.fixture
+def worker_socket(tmp_path):
+    app = make_autopilot_app(MainProvider, version_callback=lambda: "1")
+    socket_path = tmp_path / "worker.sock"
+    worker = multiprocessing.get_context("fork").Process(target=serve, args=(app, socket_path))
+    worker.start()
+    for _ in range(100):
+        if socket_path.exists():
+            break
+        time.sleep(0.05)
+    yield str(socket_path)
+    worker.terminate()
+    worker.join()
+    assert not socket_path.exists()
+
+
+def result_lines(output: str):
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{"result"')]
+
+
+def test_worker_runs_commands_with_separate_results(worker_socket, capfd):
+    assert run(worker_socket, ["append", "first"]) == 0
+    assert run(worker_socket, ["append", "second", "append", "third"]) == 0
+
+    output = capfd.readouterr().out
+    assert [r["result"]["criterion"] for r in result_lines(output)] == [
+        "first",
+        "second",
+        "third",
+    ]
+    assert output.count('{"status": "GREEN"') == 2
+    assert len(RESULTS) == 0
+
+
+def test_worker_uses_environment_and_working_directory_of_client(
+    worker_socket, capfd, tmp_path
+):
+    exit_code = run(worker_socket, ["environment"], env={"FOO": "bar"}, cwd=str(tmp_path))
+
+    assert exit_code == 0
+    assert f"cwd={tmp_path} FOO=bar" in capfd.readouterr().out
+
+
+def test_worker_returns_exit_code_of_command(worker_socket, capfd):
+    assert run(worker_socket, ["crash"]) == 1
+    assert "An unexpected error has occurred." in capfd.readouterr().out
+
+    assert run(worker_socket, ["--version"]) == 0
+    assert capfd.readouterr().out == "1\n"
+
+
+def test_client_fails_if_no_worker_is_running(tmp_path):
+    with pytest.raises(OSError):
+        run(str(tmp_path / "missing.sock"), ["append", "x"])